@@ -1,6 +1,37 @@
 import streamlit as st
-import streamlit.components.v1 as components
+import plotly.graph_objects as go
+import json
 import os
+import time
+
+from dashboard.config import (
+    BASE_PATHS, VISUALIZATIONS, HEIGHT_PRESETS, HEIGHT_OPTIONS, CATEGORY_CONFIG, LAZY_NAVIGATION,
+    FIGURE_CACHE_MAX_MB, FIGURE_STORE_PATH, NATIVE_RENDERING, AUTO_DISCOVER_FIGURES, MANIFEST_WATCH_INTERVAL,
+    STATIC_FIGURE_DELIVERY, STATIC_ASSET_MAP_PATH, STATIC_ASSET_BASE_URL,
+    FIGURE_OPTIMIZATION, LOD_POINT_BUDGET, WEBGL_POINT_THRESHOLD, METRICS_HOST, METRICS_PORT, PREVIEW_PATH,
+    CLICK_TO_LOAD,
+    ENTITY_STORE_PATH, AGGREGATE_CACHE_ENTRIES, LIVE_FILTER_DIMENSIONS, LIVE_FILTER_CHARTS,
+    HIERARCHY_CUBE_PATH, HIERARCHY_NODE_BUDGET, COLLABORATION_GRAPH_PATH, COLLABORATION_NETWORK_NODES,
+    COLLABORATION_VIEWS, SEARCH_INDEX_PATH, SEARCH_RESULTS, SHARED_FIGURE_CACHE, SHARED_CACHE_DIR,
+    PREFETCH_AHEAD, PREFETCH_WORKERS, PREFETCH_MAX_PENDING, FIGURE_MINIFICATION, FIGURE_FLOAT_DIGITS,
+    BINARY_ARRAYS, BINARY_ARRAY_MIN_LENGTH
+)
+from dashboard.collaboration_graph import CollaborationGraph
+from dashboard.entity_store import AggregationEngine, EntityStore
+from dashboard.figure_cache import FigureCache
+from dashboard.figure_minify import minify_figure_html
+from dashboard.figure_optimize import optimize_figure
+from dashboard.figure_preview import load_previews
+from dashboard.figure_html import figure_container, use_shared_plotly_runtime, wrap_figure_html
+from dashboard.figure_store import FigureStore, store_key
+from dashboard.hierarchy_cube import ROOT, HierarchyCube
+from dashboard.manifest import VisualizationManifest
+from dashboard.metrics import BYTES_BUCKETS, MetricsRegistry, serve_metrics
+from dashboard.prefetch import Prefetcher
+from dashboard.search_index import SearchIndex, metadata_fields
+from dashboard.shared_cache import SharedFigureCache
+from dashboard.static_assets import load_asset_map
+from dashboard.typed_arrays import numpy_arrays
 
 # Streamlit page config for wider layout - IMPORTANT: This must be the FIRST Streamlit command
 st.set_page_config(
@@ -160,388 +191,716 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # =============================================================================
-# CONFIGURATION SECTION - EASY TO MODIFY
+# CONFIGURATION - see dashboard/config.py (EASY TO MODIFY)
 # =============================================================================
 
-# Base paths - Update these according to your directory structure
-BASE_PATHS = {
-    "country": "EDA_fig/Country",
-    "organization": "EDA_fig/organisation",
-    "paper": "EDA_fig/paper",
-    "cloud_platform": "EDA_fig/CLoud_platform",
-    "hardware": "EDA_fig/hardware",
-    "affiliation": "EDA_fig/Affiliation_Overview",
-    "software": "EDA_fig/software",
-    "topic": "EDA_fig/topic_modelling"
-}
-
-# Define your visualizations here - Add new ones by simply adding to this dictionary
-VISUALIZATIONS = {
-    # Country visualizations
-    "GPU Usage Country wise (Hierarchical)": {
-        "file_path": os.path.join(BASE_PATHS["country"], "country_gpu_usage_plotly_viz_5.html"),
-        "description": "Hierarchical visualization of GPU usage by country",
-        "icon": "🌍",
-        "category": "country"
-    },
-    
-    # Organization visualizations
-    "GPU Usage Organisation wise (Hierarchical)": {
-        "file_path": os.path.join(BASE_PATHS["organization"], "org_gpu_usage_plotly_viz_5.html"),
-        "description": "GPU Usage organisation wise (Hierarchical)",
-        "icon": "🏢",
-        "category": "organization"
-    },
-    
-    # Paper visualizations
-    "GPU vs CPU Paper Count": {
-        "file_path": os.path.join(BASE_PATHS["paper"], "total_paper_gpu_cpu_paper.html"),
-        "description": "GPU vs CPU paper count visualization",
-        "icon": "📊",
-        "category": "paper"
-    },
-    "Overall entities distribution": {
-        "file_path": os.path.join(BASE_PATHS["paper"], "overall_entity_distribution.html"),
-        "description": "Overall entities distribution",
-        "icon": "📊",
-        "category": "paper"
-    },
-    
-    # Cloud Platform visualizations
-    "Top Cloud Platform Usage past 10 years": {
-        "file_path": os.path.join(BASE_PATHS["cloud_platform"], "cloud_platform_total_usage_sunburst.html"),
-        "description": "Cloud platform usage over time",
-        "icon": "☁️",
-        "category": "cloud_platform"
-    },
-    "Top Organizations by Cloud Platform Usage": {
-        "file_path": os.path.join(BASE_PATHS["cloud_platform"], "Cloud_Platform_usage_organisation_plotly_viz_1.html"),
-        "description": "Leading organizations in cloud platform adoption",
-        "icon": "🏢",
-        "category": "cloud_platform"
-    },
-    "Top Countries by Cloud Platform Usage": {
-        "file_path": os.path.join(BASE_PATHS["cloud_platform"], "Cloud_Platform_country_usage_plotly_viz_3.html"),
-        "description": "Geographic distribution of cloud platform usage",
-        "icon": "🌍",
-        "category": "cloud_platform"
-    },
-    "AWS Services Usage Trends": {
-        "file_path": os.path.join(BASE_PATHS["cloud_platform"], "aws_base_entities_interactive_dashboard.html"),
-        "description": "Detailed analysis of AWS services adoption over time",
-        "icon": "🔶",
-        "category": "cloud_platform"
-    },
-    "Google Cloud Services Usage Trends": {
-        "file_path": os.path.join(BASE_PATHS["cloud_platform"], "google_clould_base_entities_interactive_dashboard.html"),
-        "description": "Comprehensive view of Google Cloud services utilization",
-        "icon": "🔵",
-        "category": "cloud_platform"
-    },
-    
-    # Hardware visualizations
-    "Device Memory Configuration Usage": {
-        "file_path": os.path.join(BASE_PATHS["hardware"], "device_memory_analysis.html"),
-        "description": "Analysis of device memory configurations across research papers",
-        "icon": "💾",
-        "category": "hardware"
-    },
-    "GPU Brand Distribution": {
-        "file_path": os.path.join(BASE_PATHS["hardware"], "gpu_brand_distribution.html"),
-        "description": "Market share analysis of GPU brands in research",
-        "icon": "🎮",
-        "category": "hardware"
-    },
-    "Hardware Device Categories": {
-        "file_path": os.path.join(BASE_PATHS["hardware"], "gpu_category_distribution.html"),
-        "description": "Distribution of hardware devices by category",
-        "icon": "📱",
-        "category": "hardware"
-    },
-    "GPU Generation Evolution": {
-        "file_path": os.path.join(BASE_PATHS["hardware"], "gpu_evolution_over_time.html"),
-        "description": "Timeline of GPU generation adoption in research",
-        "icon": "📈",
-        "category": "hardware"
-    },
-    "Hardware-Memory Co-occurrence": {
-        "file_path": os.path.join(BASE_PATHS["hardware"], "hardware_memory_bubble_chart.html"),
-        "description": "Correlation analysis between hardware types and memory configurations",
-        "icon": "🔗",
-        "category": "hardware"
-    },
-    "Nvidia GPU Generations": {
-        "file_path": os.path.join(BASE_PATHS["hardware"], "nvidia_gpu_generations.html"),
-        "description": "Detailed breakdown of Nvidia GPU usage by generation",
-        "icon": "🟢",
-        "category": "hardware"
-    },
-    "Top Hardware-Count Combinations": {
-        "file_path": os.path.join(BASE_PATHS["hardware"], "top_hardware_count_combinations.html"),
-        "description": "Most common hardware and device count configurations",
-        "icon": "🔢",
-        "category": "hardware"
-    },
-    "Most Used Hardware Devices": {
-        "file_path": os.path.join(BASE_PATHS["hardware"], "top_hardware_devices.html"),
-        "description": "Ranking of the 30 most frequently used hardware devices",
-        "icon": "🏆",
-        "category": "hardware"
-    },
-    "Hardware-Memory-Count Configurations": {
-        "file_path": os.path.join(BASE_PATHS["hardware"], "top_hardware_memory_count_triplets.html"),
-        "description": "Analysis of common hardware, memory, and count combinations",
-        "icon": "⚙️",
-        "category": "hardware"
-    },
-    
-    # Affiliation visualizations
-    "Collaboration Network": {
-        "file_path": os.path.join(BASE_PATHS["affiliation"], "collaboration_network.html"),
-        "description": "Interactive network visualization of top 50 research collaborations",
-        "icon": "🤝",
-        "category": "affiliation"
-    },
-    "Top Collaboration Pairs": {
-        "file_path": os.path.join(BASE_PATHS["affiliation"], "collaboration_pairs_top20.html"),
-        "description": "Most frequent organization collaboration pairs",
-        "icon": "👥",
-        "category": "affiliation"
-    },
-    "International Collaborations": {
-        "file_path": os.path.join(BASE_PATHS["affiliation"], "international_collaborations.html"),
-        "description": "Cross-border research collaboration patterns",
-        "icon": "🌐",
-        "category": "affiliation"
-    },
-    "Organization Activity": {
-        "file_path": os.path.join(BASE_PATHS["affiliation"], "organization_collaboration_activity.html"),
-        "description": "Research activity levels of top 25 organizations",
-        "icon": "📊",
-        "category": "affiliation"
-    },
-    "Collaboration Intensity": {
-        "file_path": os.path.join(BASE_PATHS["affiliation"], "collaboration_diversity_analysis.html"),
-        "description": "Analysis of collaboration intensity and diversity metrics",
-        "icon": "📈",
-        "category": "affiliation"
-    },
-    
-    # Software visualizations
-    "Entity Associations": {
-        "file_path": os.path.join(BASE_PATHS["software"], "entity_associations.html"),
-        "description": "Network of top 20 software entity associations",
-        "icon": "🔗",
-        "category": "software"
-    },
-    "Hardware-Software Heatmap": {
-        "file_path": os.path.join(BASE_PATHS["software"], "hw_sw_heatmap.html"),
-        "description": "Co-occurrence analysis of hardware and software combinations",
-        "icon": "🗺️",
-        "category": "software"
-    },
-    "Memory Distribution by Software": {
-        "file_path": os.path.join(BASE_PATHS["software"], "memory_distribution_by_software.html"),
-        "description": "Memory size patterns across different software frameworks",
-        "icon": "💿",
-        "category": "software"
-    },
-    "Software by Device Count": {
-        "file_path": os.path.join(BASE_PATHS["software"], "software_by_device_count.html"),
-        "description": "Software framework usage patterns by device count categories",
-        "icon": "📱",
-        "category": "software"
-    },
-    "Hardware-Software Co-evolution": {
-        "file_path": os.path.join(BASE_PATHS["software"], "temporal_coevolution.html"),
-        "description": "Temporal analysis of hardware-software co-occurrence patterns",
-        "icon": "🔄",
-        "category": "software"
-    },
-    "Software Evolution Timeline": {
-        "file_path": os.path.join(BASE_PATHS["software"], "temporal_evolution.html"),
-        "description": "Historical trends in software framework adoption",
-        "icon": "📅",
-        "category": "software"
-    },
-    
-    # Topic Modeling visualizations
-    "GPU Usage by Research Topic": {
-        "file_path": os.path.join(BASE_PATHS["topic"], "3_heatmap_gpu_intensity.html"),
-        "description": "Heatmap showing GPU usage intensity across different research topics",
-        "icon": "🔥",
-        "category": "topic"
-    },
-    "Device Count by Topic": {
-        "file_path": os.path.join(BASE_PATHS["topic"], "device_counts_by_topic.html"),
-        "description": "Average device utilization across research domains",
-        "icon": "📊",
-        "category": "topic"
-    },
-    "GPU Temporal Trends by Topic": {
-        "file_path": os.path.join(BASE_PATHS["topic"], "gpu_temporal_trends_clean.html"),
-        "description": "Evolution of GPU usage patterns across research topics over time",
-        "icon": "📈",
-        "category": "topic"
-    },
-    "GPU Usage Rate by Topic": {
-        "file_path": os.path.join(BASE_PATHS["topic"], "gpu_usage_by_topic_clean.html"),
-        "description": "Comparative analysis of GPU adoption rates by research area",
-        "icon": "💹",
-        "category": "topic"
-    }
-}
-
-# Height presets
-HEIGHT_PRESETS = {
-    "Compact": 600,
-    "Small": 800,
-    "Standard": 1000,
-    "Large": 1200,
-    "Extra Large": 1400,
-    "Full": 1600
-}
-
-# Category display configuration
-CATEGORY_CONFIG = {
-    "country": {"name": "Geographic Analysis", "icon": "🌍", "color": "#3498db"},
-    "organization": {"name": "Organizational Insights", "icon": "🏢", "color": "#e74c3c"},
-    "paper": {"name": "Publication Metrics", "icon": "📄", "color": "#f39c12"},
-    "cloud_platform": {"name": "Cloud Platform Analytics", "icon": "☁️", "color": "#9b59b6"},
-    "hardware": {"name": "Hardware Analysis", "icon": "🖥️", "color": "#1abc9c"},
-    "affiliation": {"name": "Collaboration Networks", "icon": "🤝", "color": "#34495e"},
-    "software": {"name": "Software Ecosystem", "icon": "💻", "color": "#16a085"},
-    "topic": {
-        "name": "Research Topics",
-        "icon": "🔬",
-        "color": "#d35400",
-        "description": (
-            "For the research topic analysis, we applied Latent Dirichlet Allocation (LDA) "
-            "to a corpus of 85,000 publications. We used the titles and abstracts of the papers "
-            "as input for topic modeling. Prior to applying LDA, we used the Gensim library "
-            "and coherence scores to determine the optimal number of topics."
-        )
-    }
-}
-
 # =============================================================================
 # CORE FUNCTIONS
 # =============================================================================
 
-def render_plotly_html_large(html_path, height=1000):
+def load_figure_html(html_path):
+    """Read a figure and wrap it in the height-independent part of the container.
+
+    The result is cached process-wide, so the height is applied later through
+    the --figure-height CSS variable set on the outer container.
+    """
+    with open(html_path, "r", encoding="utf-8") as f:
+        html_content = f.read()
+    if FIGURE_MINIFICATION or BINARY_ARRAYS:
+        html_content = minify_figure_html(html_content, FIGURE_FLOAT_DIGITS if FIGURE_MINIFICATION else None,
+                                          binary_min_length=BINARY_ARRAY_MIN_LENGTH if BINARY_ARRAYS else None)
+    return wrap_figure_html(use_shared_plotly_runtime(html_content))
+
+@st.cache_resource
+def get_figure_cache():
+    """Figure cache shared by every session and rerun in this process."""
+    return FigureCache(max_bytes=FIGURE_CACHE_MAX_MB * 1024 * 1024)
+
+@st.cache_resource
+def get_shared_cache():
+    """Host-wide payload cache shared with the other server processes, or None when disabled or unwritable."""
+    if not SHARED_FIGURE_CACHE:
+        return None
+    try:
+        return SharedFigureCache(SHARED_CACHE_DIR)
+    except OSError:
+        return None
+
+@st.cache_resource
+def get_prefetcher():
+    """Thread pool warming the figures likely to be opened next, shared by every session."""
+    return Prefetcher(max_workers=PREFETCH_WORKERS, max_pending=PREFETCH_MAX_PENDING)
+
+@st.cache_resource
+def get_manifest():
+    """Visualization manifest built once per process and refreshed by a background watcher."""
+    manifest = VisualizationManifest(
+        VISUALIZATIONS, BASE_PATHS,
+        discover=AUTO_DISCOVER_FIGURES,
+        tracked_paths=[FIGURE_STORE_PATH, STATIC_ASSET_MAP_PATH, PREVIEW_PATH, ENTITY_STORE_PATH, HIERARCHY_CUBE_PATH,
+                       COLLABORATION_GRAPH_PATH, SEARCH_INDEX_PATH]
+    )
+    manifest.start_watcher(MANIFEST_WATCH_INTERVAL)
+    return manifest
+
+@st.cache_resource
+def get_metrics():
+    """Render metrics shared by every session in this process."""
+    metrics = MetricsRegistry()
+    metrics.histogram("dashboard_render_seconds", "Wall time of one figure render")
+    metrics.histogram("dashboard_render_stage_seconds", "Wall time of one stage (read/load, wrap, emit) of a figure render")
+    metrics.histogram("dashboard_render_bytes", "Bytes sent to the browser per figure render", buckets=BYTES_BUCKETS)
+    metrics.counter("dashboard_reruns_total", "Full script reruns")
+    metrics.counter("dashboard_sessions_total", "Browser sessions started")
+    cache_stats = lambda field: lambda: {(): get_figure_cache().stats()[field]}
+    metrics.gauge("dashboard_figure_cache_hit_ratio", "Figure cache hit rate since start", cache_stats("hit_rate"))
+    metrics.gauge("dashboard_figure_cache_bytes", "Bytes held by the figure cache", cache_stats("bytes"))
+    metrics.gauge("dashboard_figure_cache_entries", "Figures held by the figure cache", cache_stats("entries"))
+    metrics.gauge("dashboard_figure_cache_evictions", "Figure cache evictions since start", cache_stats("evictions"))
+    prefetch_stats = lambda field: lambda: {(): get_prefetcher().stats()[field]}
+    metrics.gauge("dashboard_prefetch_completed", "Figures warmed in the background since start",
+                  prefetch_stats("completed"))
+    metrics.gauge("dashboard_prefetch_hit_ratio", "Share of prefetched figures that were then rendered",
+                  prefetch_stats("hit_rate"))
+    if get_shared_cache() is not None:
+        metrics.gauge("dashboard_shared_cache_bytes", "Bytes of figure payloads in the host-wide cache",
+                      lambda: {(): get_shared_cache().disk_usage()[1]})
+        metrics.gauge("dashboard_shared_cache_hit_ratio", "Host-wide cache hit rate of this process",
+                      lambda: {(): get_shared_cache().stats()["hit_rate"]})
+    return metrics
+
+@st.cache_resource
+def get_metrics_endpoint():
+    """Start the Prometheus endpoint once per process; return its URL or an error message."""
+    if not METRICS_PORT:
+        return None
+    try:
+        serve_metrics(get_metrics(), METRICS_HOST, METRICS_PORT)
+    except OSError as e:
+        # e.g. another app process already owns the port
+        return f"unavailable ({e.strerror})"
+    return f"http://{METRICS_HOST}:{METRICS_PORT}/metrics"
+
+@st.cache_resource
+def _open_figure_store(path, store_version):
+    """Map the compiled figure store once per build (keyed on its mtime and size)."""
+    return FigureStore(path)
+
+def get_figure_store():
+    """Return the compiled figure store, or None when native rendering is off or it is not built."""
+    store_version = get_manifest().file_version(FIGURE_STORE_PATH)
+    if not NATIVE_RENDERING or store_version is None:
+        return None
+    return _open_figure_store(FIGURE_STORE_PATH, store_version)
+
+def load_native_figure(store, figure_key, full_resolution=False):
+    """Build a Plotly figure from the store, sized by its container instead of the export.
+
+    Returns ``(figure, config, lod_report, payload_bytes)``; the report lists the
+    traces the level-of-detail pass reduced (empty for full resolution or small
+    figures) and ``payload_bytes`` is the size of the figure JSON sent per render.
+    """
+    spec = store.get(figure_key)
+    spec["layout"].pop("width", None)
+    spec["layout"].pop("height", None)
+    lod_report = []
+    if FIGURE_OPTIMIZATION and not full_resolution:
+        spec, lod_report = optimize_figure(spec, LOD_POINT_BUDGET, WEBGL_POINT_THRESHOLD)
+    if BINARY_ARRAYS:
+        # Plotly serializes numpy arrays as binary typed arrays
+        spec["data"] = numpy_arrays(spec["data"], BINARY_ARRAY_MIN_LENGTH,
+                                    FIGURE_FLOAT_DIGITS if FIGURE_MINIFICATION else None)
+    # Validate once per process; attributes dropped by newer Plotly versions are skipped
+    figure = go.Figure({"data": spec["data"], "layout": spec["layout"]}, skip_invalid=True)
+    return figure, spec["config"], lod_report, len(figure.to_json().encode("utf-8"))
+
+def native_cache_key(store, figure_key, full_resolution=False):
+    """Cached by content: keys sharing a blob share one Figure, across store rebuilds too."""
+    entry = store.index[store_key(figure_key)]
+    return ("native", entry["sha256"], "full" if full_resolution else "lod"), entry
+
+def get_native_figure(store, figure_key, cache, full_resolution=False):
+    """Return the cached ``load_native_figure`` result (safe to call from the prefetch threads)."""
+    key, entry = native_cache_key(store, figure_key, full_resolution)
+    return cache.get(
+        store.path,
+        lambda _: load_native_figure(store, figure_key, full_resolution),
+        key=key,
+        size=entry["size"],
+        version=entry["sha256"]
+    )
+
+def render_plotly_native(store, figure_key, height=1000, full_resolution=False, category=None):
+    """Render a compiled figure with st.plotly_chart - only its JSON is sent to the browser.
+
+    Returns the level-of-detail report of the rendered variant.
+    """
+    metrics = get_metrics()
+    labels = {"figure": store_key(figure_key), "category": category or "", "path": "native"}
+    with metrics.timer("dashboard_render_stage_seconds", stage="load", **labels):
+        figure, plot_config, lod_report, payload_bytes = get_native_figure(
+            store, figure_key, get_figure_cache(), full_resolution
+        )
+    with metrics.timer("dashboard_render_stage_seconds", stage="emit", **labels):
+        st.plotly_chart(figure, height=height, theme=None, config=plot_config)
+    metrics.observe("dashboard_render_bytes", payload_bytes, **labels)
+    return lod_report
+
+@st.cache_resource
+def _load_static_assets(path, map_version):
+    """Read the static asset map once per build (keyed on its mtime and size)."""
+    return load_asset_map(path)
+
+def get_static_assets():
+    """Return the ``{figure key: asset}`` map, or {} when static delivery is off or not built."""
+    map_version = get_manifest().file_version(STATIC_ASSET_MAP_PATH)
+    if not STATIC_FIGURE_DELIVERY or map_version is None:
+        return {}
+    return _load_static_assets(STATIC_ASSET_MAP_PATH, map_version)
+
+@st.cache_resource
+def _load_previews(path, previews_version):
+    """Read the preview cards once per build (keyed on their mtime and size)."""
+    return load_previews(path)
+
+def get_preview(html_path):
+    """Return the preview card of a figure, or None when there is no up-to-date one."""
+    previews_version = get_manifest().file_version(PREVIEW_PATH)
+    if not CLICK_TO_LOAD or previews_version is None:
+        return None
+    preview = _load_previews(PREVIEW_PATH, previews_version).get(store_key(html_path))
+    file_state = get_manifest().file_state(html_path)
+    # A preview of an older version of the figure would describe the wrong data
+    if preview is None or file_state is None or preview["content_hash"] != file_state["content_hash"]:
+        return None
+    return preview
+
+def format_total(value):
+    """Format a preview total compactly, e.g. 48189 -> '48,189', 0.123456 -> '0.1235'."""
+    if value is None:
+        return "—"
+    return f"{value:,.0f}" if float(value).is_integer() or abs(value) >= 1000 else f"{value:.4g}"
+
+def render_preview_card(preview):
+    """Show what a figure holds without loading it: traces, axes, row counts and totals."""
+    with st.container(border=True):
+        if preview["title"]:
+            st.markdown(f"**{preview['title']}**")
+        if preview["kind"] == "table":
+            st.caption(f"🧾 Table • {preview['rows']:,} rows × {len(preview['columns'])} columns")
+            st.dataframe([dict(zip(preview["columns"], row)) for row in preview["sample"]], hide_index=True)
+            if preview["totals"]:
+                st.caption(" • ".join(
+                    f"{column}: Σ {format_total(total['sum'])} ({format_total(total['min'])} – {format_total(total['max'])})"
+                    for column, total in preview["totals"].items()
+                ))
+        else:
+            st.caption(f"📈 {preview['trace_count']} traces • {preview['points']:,} data points"
+                       + (f" • axes: {', '.join(preview['axes'])}" if preview["axes"] else ""))
+            st.dataframe([
+                {"Trace": trace["name"], "Type": trace["type"], "Points": trace["points"],
+                 "Total": format_total(trace["total"])}
+                for trace in preview["traces"]
+            ], hide_index=True)
+            hidden = preview["trace_count"] - len(preview["traces"])
+            if hidden > 0:
+                st.caption(f"... and {hidden} more traces")
+        st.caption(f"Full figure: {preview['bytes'] / 1024 / 1024:.1f} MB export")
+
+@st.cache_resource
+def _open_hierarchy_cube(path, cube_version):
+    """Map the hierarchy cube once per build (keyed on its mtime and size)."""
+    return HierarchyCube(path)
+
+def get_hierarchy_cube():
+    """Return the hierarchy cube, or None when native rendering is off or it is not built."""
+    cube_version = get_manifest().file_version(HIERARCHY_CUBE_PATH)
+    if not NATIVE_RENDERING or cube_version is None:
+        return None
+    return _open_hierarchy_cube(HIERARCHY_CUBE_PATH, cube_version)
+
+def render_hierarchy_drilldown(cube, figure_key, height, drill_key, category=None):
+    """Render the levels of a hierarchical figure around the drilled-in node, with drill controls.
+
+    ``st.session_state[drill_key]`` holds the chain of nodes drilled into.
+    """
+    metrics = get_metrics()
+    labels = {"figure": store_key(figure_key), "category": category or "", "path": "cube"}
+    trail = st.session_state.setdefault(drill_key, [])
+    root = trail[-1] if trail else None
+    
+    with metrics.timer("dashboard_render_stage_seconds", stage="load", **labels):
+        spec, nodes = cube.view(figure_key, root=root, node_budget=HIERARCHY_NODE_BUDGET)
+        spec["layout"].pop("width", None)
+        spec["layout"].pop("height", None)
+        payload_bytes = len(json.dumps(spec, separators=(",", ":")))
+        figure = get_figure_cache().get(
+            cube.path,
+            lambda _: go.Figure({"data": spec["data"], "layout": spec["layout"]}, skip_invalid=True),
+            key=("cube", store_key(figure_key), ROOT if root is None else root["i"], HIERARCHY_NODE_BUDGET),
+            size=payload_bytes,
+            version=get_manifest().file_version(HIERARCHY_CUBE_PATH)
+        )
+    
+    # Nodes whose children are not loaded yet, plus the shown ones that have children
+    drillable = {index: path for index, (node, path) in nodes.items() if node["children"]}
+    controls = st.columns([3, 1])
+    with controls[0]:
+        st.selectbox(
+            "🔎 Drill into",
+            options=[None] + list(drillable),
+            format_func=lambda index: "—" if index is None else " / ".join(str(node["label"]) for node in drillable[index]),
+            key=f"{drill_key}_select",
+            on_change=lambda: drill_into(drill_key, drillable),
+            disabled=not drillable
+        )
+    with controls[1]:
+        st.button("⬆️ Up one level", key=f"{drill_key}_up", disabled=not trail,
+                  on_click=lambda: st.session_state[drill_key].pop(), use_container_width=True)
+    st.caption("📍 " + " / ".join(["All"] + [str(node["label"]) for node in trail])
+               + f" • {len(nodes)} of {cube.meta(figure_key)['nodes']} nodes loaded")
+    
+    with metrics.timer("dashboard_render_stage_seconds", stage="emit", **labels):
+        st.plotly_chart(figure, height=height, theme=None, config=spec["config"])
+    metrics.observe("dashboard_render_bytes", payload_bytes, **labels)
+
+def drill_into(drill_key, drillable):
+    """Selectbox callback: descend to the chosen node and reset the selection."""
+    index = st.session_state[f"{drill_key}_select"]
+    if index is not None:
+        st.session_state[drill_key] = st.session_state[drill_key] + drillable[index]
+    st.session_state[f"{drill_key}_select"] = None
+
+def render_visualization(html_path, height=1000, full_resolution=False, category=None, drill_key=None):
+    """Render a figure from its static asset URL, natively from the figure store, or from its HTML export.
+
+    Hierarchical figures in the hierarchy cube are drilled down level by level
+    when ``drill_key`` (the session key of the drill state) is given.
+    Returns the level-of-detail report when a reduced native figure was shown, else [].
+    """
+    metrics = get_metrics()
+    get_prefetcher().record(store_key(html_path))
+    with metrics.timer("dashboard_render_seconds", figure=store_key(html_path), category=category or ""):
+        asset = get_static_assets().get(store_key(html_path))
+        if asset is not None:
+            # The browser fetches (and caches) the content-hashed document itself
+            src = STATIC_ASSET_BASE_URL + asset["path"]
+            st.iframe(src, height=height)
+            metrics.observe("dashboard_render_bytes", len(src),
+                            figure=store_key(html_path), category=category or "", path="static")
+            return []
+        
+        cube = get_hierarchy_cube()
+        if cube is not None and drill_key is not None and html_path in cube:
+            try:
+                render_hierarchy_drilldown(cube, html_path, height, drill_key, category=category)
+                return []
+            except Exception as e:
+                st.warning(f"⚠️ Drill-down unavailable, showing the full figure instead: {str(e)}")
+        
+        store = get_figure_store()
+        if store is not None and html_path in store:
+            try:
+                return render_plotly_native(
+                    store, html_path, height=height, full_resolution=full_resolution, category=category
+                )
+            except Exception as e:
+                st.warning(f"⚠️ Native rendering failed, showing the HTML export instead: {str(e)}")
+        render_plotly_html_large(html_path, height=height, category=category)
+        return []
+
+def get_figure_html(html_path, content_hash, cache, shared_cache=None):
+    """Return a figure's prepared HTML: a mapped buffer from the host-wide cache, else a cached str.
+
+    Cached by normalized content, so duplicate exports are read and held once.
+    Safe to call from the prefetch threads.
+    """
+    if shared_cache is not None:
+        return shared_cache.get(shared_cache.key("html", content_hash),
+                                lambda: load_figure_html(html_path).encode("utf-8"))
+    return cache.get(html_path, load_figure_html, key=("html", content_hash), version=content_hash)
+
+def prefetch_figure(html_path):
+    """Queue the load (and level-of-detail pass, or HTML wrap) of a figure on the prefetch pool."""
+    file_state = get_manifest().file_state(html_path)
+    if file_state is None or store_key(html_path) in get_static_assets():
+        return  # static figures are fetched by the browser
+    cube = get_hierarchy_cube()
+    if cube is not None and html_path in cube:
+        return  # drill-down views are assembled per node on demand
+    
+    # Caches are resolved here, on the script thread, and handed to the pool
+    cache = get_figure_cache()
+    store = get_figure_store()
+    content_hash = file_state["content_hash"]
+    if store is not None and html_path in store:
+        key, _ = native_cache_key(store, html_path)
+        is_cached = lambda: cache.contains(key, key[1])
+        warm = lambda: get_native_figure(store, html_path, cache)
+    else:
+        shared_cache = get_shared_cache()
+        if shared_cache is not None:
+            shared_key = shared_cache.key("html", content_hash)
+            is_cached = lambda: shared_cache.contains(shared_key)
+        else:
+            is_cached = lambda: cache.contains(("html", content_hash), content_hash)
+        warm = lambda: get_figure_html(html_path, content_hash, cache, shared_cache)
+    get_prefetcher().schedule(store_key(html_path), warm, is_cached)
+
+def render_plotly_html_large(html_path, height=1000, category=None):
     """Load and embed Plotly HTML with full-width responsive design."""
-    if not os.path.exists(html_path):
+    file_state = get_manifest().file_state(html_path)
+    if file_state is None:
         st.error(f"⚠️ Could not find the file: {html_path}")
         return
     
+    metrics = get_metrics()
+    labels = {"figure": store_key(html_path), "category": category or "", "path": "html"}
     try:
-        with open(html_path, "r", encoding="utf-8") as f:
-            html_content = f.read()
+        # Cached by normalized content, so duplicate exports are read and held once
+        with metrics.timer("dashboard_render_stage_seconds", stage="read", **labels):
+            payload = get_figure_html(html_path, file_state["content_hash"], get_figure_cache(), get_shared_cache())
+            # Mapped from the host-wide cache: only this render's copy lives in the process
+            figure_html = payload if isinstance(payload, str) else str(payload, "utf-8")
         
-        # Enhanced styling with full-width focus
-        wrapped_html = f"""
-        <div style="width:100%; height:{height}px; margin: 0; padding: 0; border: 1px solid #e0e0e0; border-radius: 10px; background: white; box-shadow: 0 2px 8px rgba(0,0,0,0.1); overflow: hidden;">
-            <style>
-                /* Reset and base styles */
-                * {{ 
-                    box-sizing: border-box; 
-                    margin: 0; 
-                    padding: 0; 
-                }}
-                
-                html, body {{ 
-                    width: 100%; 
-                    height: 100%; 
-                    margin: 0; 
-                    padding: 0; 
-                    background: white; 
-                    overflow: hidden;
-                }}
-                
-                /* Force Plotly container to use full available space */
-                .plotly-graph-div {{ 
-                    width: 100% !important; 
-                    height: {height-20}px !important;
-                    min-height: {height-20}px !important;
-                    margin: 10px !important;
-                    padding: 0 !important;
-                }}
-                
-                /* Ensure proper scaling */
-                .plotly-graph-div > div {{ 
-                    width: calc(100% - 20px) !important;
-                    height: calc(100% - 20px) !important;
-                    margin: 10px !important;
-                }}
-                
-                /* Make sure plots are responsive */
-                .js-plotly-plot {{ 
-                    width: 100% !important;
-                    height: 100% !important;
-                }}
-                
-                /* Remove any default margins/padding from plot elements */
-                .plot-container {{ 
-                    width: 100% !important;
-                    height: 100% !important;
-                    margin: 0 !important;
-                    padding: 0 !important;
-                }}
-            </style>
-            {html_content}
-            
-            <script>
-                // Enhanced resize handling
-                function resizePlots() {{
-                    if (typeof Plotly !== 'undefined') {{
-                        var plots = document.querySelectorAll('.plotly-graph-div');
-                        plots.forEach(function(plot) {{
-                            // Force responsive sizing
-                            var update = {{
-                                width: plot.offsetWidth - 20,
-                                height: plot.offsetHeight - 20
-                            }};
-                            Plotly.relayout(plot, update);
-                            Plotly.Plots.resize(plot);
-                        }});
-                    }}
-                }}
-                
-                // Initial resize after load
-                setTimeout(resizePlots, 500);
-                setTimeout(resizePlots, 1000);
-                
-                // Resize on window resize
-                window.addEventListener('resize', resizePlots);
-            </script>
-        </div>
-        """
+        # Only the outer container depends on the requested height
+        with metrics.timer("dashboard_render_stage_seconds", stage="wrap", **labels):
+            wrapped_html = figure_container(f"{height}px") + figure_html
         
-        # Use full width for the component
-        components.html(wrapped_html, height=height, scrolling=False, width=None)
+        # Full width; an HTML string is embedded as the iframe's srcdoc (components.html is deprecated)
+        with metrics.timer("dashboard_render_stage_seconds", stage="emit", **labels):
+            st.iframe(wrapped_html, height=height)
+        metrics.observe("dashboard_render_bytes", len(wrapped_html.encode("utf-8")), **labels)
         
     except Exception as e:
         st.error(f"❌ Error loading visualization: {str(e)}")
         st.info("Please check the file format and ensure it's a valid HTML file.")
 
 def get_visualizations_by_category():
-    """Organize visualizations by category."""
-    categories = {}
-    for viz_name, config in VISUALIZATIONS.items():
-        category = config.get("category", "other")
-        if category not in categories:
-            categories[category] = []
-        categories[category].append((viz_name, config))
-    return categories
+    """Organize visualizations (registered and discovered) by category."""
+    return get_manifest().by_category()
 
-def render_category_section(category_name, visualizations):
-    """Render a category section with its visualizations using full width."""
-    # Get category configuration
-    cat_config = CATEGORY_CONFIG.get(category_name, {
+def format_height(height):
+    """Label a height option with its preset name, e.g. 'Standard (1000px)'."""
+    for preset_name, preset_height in HEIGHT_PRESETS.items():
+        if preset_height == height:
+            return f"{preset_name} ({height}px)"
+    return f"{height}px"
+
+@st.fragment
+def render_visualization_panel(unique_key_base, file_path, category=None):
+    """Preview card until the figure is requested, then size control plus figure.
+
+    Loading and resizing rerun only this fragment, not the whole app.
+    """
+    show_key = f"show_{unique_key_base}"
+    preview = get_preview(file_path)
+    if preview is not None and not st.session_state.get(show_key):
+        render_preview_card(preview)
+        st.button(
+            "▶️ Load interactive figure",
+            key=f"load_{unique_key_base}",
+            on_click=lambda: st.session_state.update({show_key: True}),
+            type="primary"
+        )
+        return
+    
+    height = st.select_slider(
+        "📐 Display size",
+        options=HEIGHT_OPTIONS,
+        value=HEIGHT_PRESETS["Standard"],
+        format_func=format_height,
+        key=f"height_{unique_key_base}"
+    )
+    full_resolution_key = f"full_res_{unique_key_base}"
+    lod_report = render_visualization(
+        file_path, height=height, full_resolution=st.session_state.get(full_resolution_key, False),
+        category=category, drill_key=f"drill_{unique_key_base}"
+    )
+    # Offered only for figures the level-of-detail pass reduced (and while showing full resolution)
+    if lod_report or st.session_state.get(full_resolution_key):
+        st.toggle(
+            "🔍 Full resolution",
+            key=full_resolution_key,
+            help="Render every data point - slower to draw, useful when zooming into dense regions"
+        )
+        if lod_report:
+            st.caption("Reduced for faster drawing: " + ", ".join(
+                f"{entry['trace']} ({entry['change']}, {entry['points_before']:,} → {entry['points_after']:,} points)"
+                for entry in lod_report
+            ))
+
+@st.cache_resource
+def _open_entity_engine(path, store_version):
+    """Load the entity store once per build (keyed on its mtime and size)."""
+    return AggregationEngine(EntityStore(path), max_entries=AGGREGATE_CACHE_ENTRIES)
+
+def get_entity_engine():
+    """Return the aggregation engine over the entity store, or None when it is not built."""
+    store_version = get_manifest().file_version(ENTITY_STORE_PATH)
+    if store_version is None:
+        return None
+    return _open_entity_engine(ENTITY_STORE_PATH, store_version)
+
+MEASURE_LABELS = {"papers": "Papers", "records": "Mentions", "devices": "Devices"}
+
+def live_figure(result, chart):
+    """Bar chart of one dimension, or one line per leading group over the second dimension."""
+    dimension = chart["group_by"][0]
+    if len(chart["group_by"]) == 1:
+        ordered = result.iloc[::-1]  # largest bar on top
+        figure = go.Figure(go.Bar(x=ordered["value"], y=ordered[dimension], orientation="h"))
+    else:
+        series = chart["group_by"][1]
+        figure = go.Figure([
+            go.Scatter(x=group[series], y=group["value"], mode="lines+markers", name=name)
+            for name, group in ((name, group.sort_values(series)) for name, group in result.groupby(dimension, sort=False))
+        ])
+    figure.update_layout(title=chart["title"], margin={"l": 10, "r": 10, "t": 50, "b": 10})
+    value_axis = "xaxis_title" if len(chart["group_by"]) == 1 else "yaxis_title"
+    figure.update_layout(**{value_axis: MEASURE_LABELS[chart.get("measure", "papers")]})
+    return figure
+
+@st.fragment
+def render_live_filters(category_name, engine):
+    """Charts recomputed from the entity store for the selected filters; filtering reruns only this panel."""
+    expander = st.expander(
+        "🎛️ Live filters - recompute charts for a year range, country, organization or topic",
+        key=f"live_filters_{category_name}",
+        on_change="rerun" if LAZY_NAVIGATION else "ignore"
+    )
+    with expander:
+        # Nothing is aggregated until the panel is opened
+        if expander.open is False:
+            return
+        
+        first_year, last_year = engine.store.year_range()
+        filters = {}
+        if first_year < last_year:
+            filters["year"] = st.slider(
+                "Years", first_year, last_year, (first_year, last_year), key=f"live_years_{category_name}"
+            )
+        for column, dimension in zip(st.columns(len(LIVE_FILTER_DIMENSIONS)), LIVE_FILTER_DIMENSIONS):
+            with column:
+                filters[dimension] = st.multiselect(
+                    dimension.replace("_", " ").title(),
+                    options=engine.store.values(dimension),
+                    key=f"live_{dimension}_{category_name}"
+                )
+        
+        start = time.perf_counter()
+        results = [
+            engine.aggregate(chart["group_by"], chart.get("measure", "papers"), filters, chart.get("top_n"))
+            for chart in LIVE_FILTER_CHARTS[category_name]
+        ]
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        for chart, result in zip(LIVE_FILTER_CHARTS[category_name], results):
+            if result.empty:
+                st.info(f"No records match the filters for {chart['title']}.")
+                continue
+            st.plotly_chart(live_figure(result, chart), height=450, theme=None)
+        
+        engine_stats = engine.stats()
+        st.caption(
+            f"⚡ Aggregated {len(engine.store):,} entity records in {elapsed_ms:.0f} ms • "
+            f"result cache: {engine_stats['entries']} results, {engine_stats['hit_rate']:.0%} hit rate"
+        )
+
+@st.cache_resource
+def _open_collaboration_graph(path, graph_version):
+    """Load the collaboration graph once per build (keyed on its mtime and size)."""
+    return CollaborationGraph(path)
+
+def get_collaboration_graph():
+    """Return the collaboration graph, or None when it is not built."""
+    graph_version = get_manifest().file_version(COLLABORATION_GRAPH_PATH)
+    if graph_version is None:
+        return None
+    return _open_collaboration_graph(COLLABORATION_GRAPH_PATH, graph_version)
+
+def ranked_bars(labels, values, title, value_title, label_title, hover=None):
+    """Horizontal bar chart, largest bar on top."""
+    figure = go.Figure(go.Bar(
+        x=list(values)[::-1], y=list(labels)[::-1], orientation="h",
+        hovertext=None if hover is None else list(hover)[::-1]
+    ))
+    figure.update_layout(title=title, xaxis_title=value_title, yaxis_title=label_title,
+                         margin={"l": 10, "r": 10, "t": 50, "b": 10})
+    return figure
+
+def collaboration_figure(graph, view, top_n):
+    """Build the figure (and the table shown under it, or None) of one collaboration view."""
+    if view == "network":
+        nodes, edges = graph.network(top_n)
+        edge_x, edge_y = [], []
+        for a, b in zip(edges["a"], edges["b"]):
+            edge_x += [nodes["x"][a], nodes["x"][b], None]
+            edge_y += [nodes["y"][a], nodes["y"][b], None]
+        figure = go.Figure([
+            go.Scatter(x=edge_x, y=edge_y, mode="lines", line={"width": 0.7, "color": "#b0b7bf"},
+                       hoverinfo="skip", showlegend=False),
+            go.Scatter(
+                x=nodes["x"], y=nodes["y"], mode="markers+text", text=nodes["organization"],
+                textposition="top center", showlegend=False,
+                marker={"size": 8 + 30 * (nodes["papers"] / max(nodes["papers"].max(), 1)) ** 0.5,
+                        "color": nodes["partners"], "colorscale": "Viridis", "showscale": True,
+                        "colorbar": {"title": {"text": "Partners"}}},
+                hovertext=[f"{row.organization} ({row.country})<br>{row.papers:,} papers • {row.partners:,} partners"
+                           for row in nodes.itertuples()],
+                hoverinfo="text"
+            ),
+        ])
+        figure.update_layout(
+            title=f"Collaboration Network (Top {len(nodes)} Organizations, {len(edges):,} Links)",
+            xaxis={"visible": False}, yaxis={"visible": False}, margin={"l": 10, "r": 10, "t": 50, "b": 10}
+        )
+        return figure, None
+    if view == "pairs":
+        pairs = graph.top_pairs(top_n)
+        return ranked_bars(pairs["organization_a"] + " <-> " + pairs["organization_b"], pairs["papers"],
+                           f"Top {len(pairs)} Organization Pairs by Collaboration Frequency",
+                           "Number of Collaborative Papers", "Organization Pairs"), None
+    if view == "international":
+        pairs = graph.country_pairs(top_n)
+        return ranked_bars(pairs["country_a"] + " - " + pairs["country_b"], pairs["papers"],
+                           f"Top {len(pairs)} International Collaborations by Country "
+                           f"({graph.international_share():.0%} of collaborative papers span countries)",
+                           "Number of International Collaborative Papers", "Country Pairs"), None
+    if view == "activity":
+        table = graph.organizations_table(top_n, by="collaborations")
+        return ranked_bars(table["organization"], table["collaborations"],
+                           f"Top {len(table)} Organizations by Collaboration Activity",
+                           "Total Collaborative Connections", "Organizations",
+                           hover=[f"{partners:,} partners" for partners in table["partners"]]), None
+    if view == "diversity":
+        table = graph.organizations_table(top_n, by="partner_countries")
+        return ranked_bars(table["organization"], table["partner_countries"],
+                           f"Top {len(table)} Organizations by Partner Country Diversity",
+                           "Foreign Partner Countries", "Organizations"), table
+    if view == "centrality":
+        table = graph.organizations_table(top_n, by="betweenness")
+        figure = go.Figure(go.Scatter(
+            x=table["partners"], y=table["betweenness"], mode="markers+text", text=table["organization"],
+            textposition="top center", marker={"size": 10}
+        ))
+        figure.update_layout(title=f"Network Centrality of the Top {len(table)} Organizations",
+                             xaxis_title="Degree (Distinct Partners)", yaxis_title="Betweenness Centrality",
+                             margin={"l": 10, "r": 10, "t": 50, "b": 10})
+        return figure, table
+    if view == "trends":
+        trends = graph.trends()
+        figure = go.Figure([
+            go.Scatter(x=trends["year"], y=trends["collaborative_papers"], mode="lines+markers",
+                       name="Collaborative Papers"),
+            go.Scatter(x=trends["year"], y=trends["papers"], mode="lines", name="All Papers",
+                       line={"dash": "dot"}),
+        ])
+        figure.update_layout(title="Inter-Organizational Collaboration Trends Over Time", xaxis_title="Year",
+                             yaxis_title="Number of Papers", margin={"l": 10, "r": 10, "t": 50, "b": 10})
+        return figure, None
+    if view == "per_paper":
+        counts = graph.organizations_per_paper_counts()
+        figure = go.Figure(go.Bar(x=counts["organizations"], y=counts["papers"]))
+        figure.update_layout(title="Distribution of Organizations per Paper", xaxis_title="Organizations per Paper",
+                             yaxis_title="Number of Papers", margin={"l": 10, "r": 10, "t": 50, "b": 10})
+        return figure, None
+    raise ValueError(f"Unknown collaboration view {view!r}")
+
+@st.fragment
+def render_collaboration_view(unique_key_base, graph, view, file_path, category=None):
+    """Render a Collaboration Networks tab from the collaboration graph; its controls rerun only this tab."""
+    if view == "network":
+        top_n = st.slider("🕸️ Organizations", 10, 200, COLLABORATION_NETWORK_NODES, step=10,
+                          key=f"graph_top_{unique_key_base}")
+    elif view in ("trends", "per_paper"):
+        top_n = None
+    else:
+        top_n = st.slider("🔢 Show top", 5, 100, 20, step=5, key=f"graph_top_{unique_key_base}")
+    
+    metrics = get_metrics()
+    labels = {"figure": store_key(file_path), "category": category or ""}
+    with metrics.timer("dashboard_render_seconds", **labels):
+        with metrics.timer("dashboard_render_stage_seconds", stage="load", path="graph", **labels):
+            figure, table = collaboration_figure(graph, view, top_n)
+        with metrics.timer("dashboard_render_stage_seconds", stage="emit", path="graph", **labels):
+            st.plotly_chart(figure, height=700, theme=None)
+            if table is not None:
+                st.dataframe(table, hide_index=True)
+    graph_stats = graph.stats()
+    st.caption(f"🤝 Computed from the collaboration graph: {graph_stats['organizations']:,} organizations, "
+               f"{graph_stats['pairs']:,} collaborating pairs")
+
+def category_config(category_name):
+    return CATEGORY_CONFIG.get(category_name, {
         "name": category_name.replace("_", " ").title(),
         "icon": "📊",
         "color": "#95a5a6"
     })
+
+def category_tab_label(category_name):
+    cat_config = category_config(category_name)
+    return f"{cat_config['icon']} {cat_config['name']}"
+
+def viz_tab_label(viz_name, config):
+    return config.get('icon', '📊') + " " + viz_name
+
+@st.cache_resource
+def _load_search_index(path, index_version, manifest_version):
+    """Read the search index once per build, adding figures registered or discovered since."""
+    index = SearchIndex.load(path)
+    category_names = {category: category_config(category)["name"] for category in CATEGORY_CONFIG}
+    for viz_name, config in get_manifest().visualizations.items():
+        if viz_name not in index:
+            index.add(viz_name, config.get("category", "other"), metadata_fields(viz_name, config, category_names))
+    return index
+
+def get_search_index():
+    """Return the search index (titles and descriptions only when it is not built)."""
+    return _load_search_index(SEARCH_INDEX_PATH, get_manifest().file_version(SEARCH_INDEX_PATH), get_manifest().version)
+
+def jump_to(category_name, viz_name):
+    """Search result callback: open the figure's category and visualization tabs."""
+    config = get_manifest().visualizations[viz_name]
+    st.session_state["category_tabs"] = category_tab_label(category_name)
+    st.session_state[f"viz_tabs_{category_name}"] = viz_tab_label(viz_name, config)
+    st.session_state["search_jump"] = True
+
+@st.fragment
+def render_search():
+    """Search box over the index; typing reruns only this fragment, picking a result reruns the app."""
+    if st.session_state.pop("search_jump", False):
+        st.rerun(scope="app")
+    
+    query = st.text_input(
+        "🔎 Search figures", key="figure_search", placeholder="e.g. H100, memory by software, Tsinghua",
+        label_visibility="collapsed"
+    )
+    if not query.strip():
+        return
+    
+    visualizations = get_manifest().visualizations
+    results = [result for result in get_search_index().search(query, limit=SEARCH_RESULTS)
+               if result["name"] in visualizations]
+    if not results:
+        st.caption(f"No figures match “{query}”.")
+        return
+    for position, result in enumerate(results):
+        config = visualizations[result["name"]]
+        columns = st.columns([2, 3])
+        with columns[0]:
+            st.button(
+                f"{viz_tab_label(result['name'], config)} · {category_config(result['category'])['name']}",
+                key=f"search_result_{position}",
+                on_click=jump_to, args=(result["category"], result["name"]),
+                use_container_width=True
+            )
+        with columns[1]:
+            st.caption(" • ".join(f"{field}: {text}" for field, text in result["matches"]) or config["description"])
+
+def render_category_section(category_name, visualizations):
+    """Render a category section with its visualizations using full width."""
+    # Get category configuration
+    cat_config = category_config(category_name)
     
     # Category header with custom styling
     st.markdown(f"""
@@ -555,20 +914,42 @@ def render_category_section(category_name, visualizations):
     </div>
     """, unsafe_allow_html=True)
     
+    # Filterable charts from the entity store, when it is built
+    engine = get_entity_engine()
+    if engine is not None and category_name in LIVE_FILTER_CHARTS:
+        render_live_filters(category_name, engine)
+    
     # Create tabs for visualizations
-    viz_names = [config.get('icon', '📊') + " " + viz_name for viz_name, config in visualizations]
-    tabs = st.tabs(viz_names)
+    viz_names = [viz_tab_label(viz_name, config) for viz_name, config in visualizations]
+    tabs = st.tabs(
+        viz_names,
+        key=f"viz_tabs_{category_name}",
+        on_change="rerun" if LAZY_NAVIGATION else "ignore"
+    )
     
     # Render each visualization
+    open_idx = None
     for tab_idx, (tab, (viz_name, config)) in enumerate(zip(tabs, visualizations)):
         with tab:
+            # Hidden tabs only hold a placeholder until they are opened
+            if tab.open is False:
+                st.caption(f"⏳ Loading {viz_name}...")
+                continue
+            if tab.open:
+                open_idx = tab_idx
+            
+            # Collaboration views are computed from the graph, export or not
+            view = COLLABORATION_VIEWS.get(config["file_path"])
+            graph = get_collaboration_graph() if view is not None else None
+            
             # Visualization header - use full width
             col1, col2 = st.columns([4, 1])
             with col1:
                 st.markdown(f"### {config['description']}")
             with col2:
-                file_exists = os.path.exists(config["file_path"])
-                if file_exists:
+                if graph is not None:
+                    st.success("✅ Live")
+                elif config["exists"]:
                     st.success("✅ Available")
                 else:
                     st.error("❌ Not Found")
@@ -578,98 +959,108 @@ def render_category_section(category_name, visualizations):
             safe_viz_name = viz_name.replace(" ", "_").replace("(", "").replace(")", "").replace("-", "_")
             unique_key_base = f"{category_name}_{tab_idx}_{safe_viz_name}"
             
-            # Use session state to track height for each visualization
-            height_key = f"height_{unique_key_base}"
-            if height_key not in st.session_state:
-                st.session_state[height_key] = HEIGHT_PRESETS["Standard"]
-            
-            # Height controls in columns - responsive layout
-            col1, col2, col3, col4, col5 = st.columns(5)
-            
-            with col1:
-                if st.button("🔹 Compact", key=f"compact_{unique_key_base}", use_container_width=True):
-                    st.session_state[height_key] = HEIGHT_PRESETS["Compact"]
-                    st.rerun()
-            
-            with col2:
-                if st.button("🔸 Standard", key=f"standard_{unique_key_base}", use_container_width=True):
-                    st.session_state[height_key] = HEIGHT_PRESETS["Standard"]
-                    st.rerun()
-            
-            with col3:
-                if st.button("🔶 Large", key=f"large_{unique_key_base}", use_container_width=True):
-                    st.session_state[height_key] = HEIGHT_PRESETS["Large"]
-                    st.rerun()
-            
-            with col4:
-                if st.button("🔷 Full", key=f"full_{unique_key_base}", use_container_width=True):
-                    st.session_state[height_key] = HEIGHT_PRESETS["Full"]
-                    st.rerun()
-            
-            with col5:
-                # Full screen toggle
-                if st.button("🖥️ Max", key=f"max_{unique_key_base}", use_container_width=True):
-                    st.session_state[height_key] = 1800
-                    st.rerun()
-            
-            # Display current height
-            st.caption(f"Current height: {st.session_state[height_key]}px")
-            
-            # Custom height expander
-            with st.expander("⚙️ Advanced Size Settings"):
-                current_height = st.session_state.get(height_key, HEIGHT_PRESETS["Standard"])
-                custom_height = st.slider(
-                    "Custom Height (pixels)", 
-                    min_value=400, 
-                    max_value=2000, 
-                    value=current_height, 
-                    step=50,
-                    key=f"slider_{unique_key_base}"
-                )
-                if st.button("Apply Custom Size", key=f"apply_{unique_key_base}"):
-                    st.session_state[height_key] = custom_height
-                    st.rerun()
-                
-                # Quick preset buttons in expander
-                preset_col1, preset_col2, preset_col3 = st.columns(3)
-                with preset_col1:
-                    if st.button("📱 Mobile (600px)", key=f"mobile_{unique_key_base}", use_container_width=True):
-                        st.session_state[height_key] = 600
-                        st.rerun()
-                with preset_col2:
-                    if st.button("💻 Desktop (1200px)", key=f"desktop_{unique_key_base}", use_container_width=True):
-                        st.session_state[height_key] = 1200
-                        st.rerun()
-                with preset_col3:
-                    if st.button("🖥️ Large (1600px)", key=f"xlarge_{unique_key_base}", use_container_width=True):
-                        st.session_state[height_key] = 1600
-                        st.rerun()
-            
-            # Add some spacing before the visualization
-            st.markdown("<br>", unsafe_allow_html=True)
-            
-            # Render visualization with session state height
-            current_height = st.session_state.get(height_key, HEIGHT_PRESETS["Standard"])
-            render_plotly_html_large(config["file_path"], height=current_height)
+            if graph is not None:
+                render_collaboration_view(unique_key_base, graph, view, config["file_path"], category_name)
+            else:
+                render_visualization_panel(unique_key_base, config["file_path"], category_name)
+    
+    # Users page through a category in order: warm the next tabs while this one is viewed
+    if open_idx is not None:
+        for _, config in visualizations[open_idx + 1:open_idx + 1 + PREFETCH_AHEAD]:
+            if config["exists"] and (COLLABORATION_VIEWS.get(config["file_path"]) is None
+                                     or get_collaboration_graph() is None):
+                prefetch_figure(config["file_path"])
+
+def render_operator_panel():
+    """Render latency, payload and rerun metrics of this process, slowest figures first."""
+    metrics = get_metrics()
+    with st.expander("📈 Operator metrics"):
+        sessions = sum(metrics.counter_series("dashboard_sessions_total").values())
+        reruns = sum(metrics.counter_series("dashboard_reruns_total").values())
+        st.caption(
+            f"This session: {st.session_state['rerun_count']} reruns • all sessions: {sessions} sessions, "
+            f"{reruns} reruns ({reruns / sessions if sessions else 0:.1f} per session)"
+        )
+        
+        render_bytes = metrics.summary("dashboard_render_bytes", by=("figure",))
+        figure_rows = [
+            {
+                "figure": figure,
+                "category": category,
+                "renders": values["count"],
+                "p50 ms": round(values["p50"] * 1000, 1),
+                "p95 ms": round(values["p95"] * 1000, 1),
+                "total s": round(values["sum"], 2),
+                "KB/render": round(render_bytes.get((figure,), {}).get("sum", 0) / max(values["count"], 1) / 1024, 1),
+            }
+            for (figure, category), values in metrics.summary("dashboard_render_seconds", by=("figure", "category")).items()
+        ]
+        if not figure_rows:
+            st.caption("No figures rendered yet.")
+            return
+        st.markdown("**Figures** (by total render time)")
+        st.dataframe(sorted(figure_rows, key=lambda row: -row["total s"]), hide_index=True)
+        
+        category_bytes = metrics.summary("dashboard_render_bytes", by=("category",))
+        st.markdown("**Categories**")
+        st.dataframe([
+            {
+                "category": category,
+                "renders": values["count"],
+                "total s": round(values["sum"], 2),
+                "MB sent": round(category_bytes.get((category,), {}).get("sum", 0) / 1024 / 1024, 2),
+            }
+            for (category,), values in metrics.summary("dashboard_render_seconds", by=("category",)).items()
+        ], hide_index=True)
+        
+        st.markdown("**Render stages**")
+        st.dataframe([
+            {"path": path, "stage": stage, "count": values["count"],
+             "p50 ms": round(values["p50"] * 1000, 1), "p95 ms": round(values["p95"] * 1000, 1)}
+            for (path, stage), values in sorted(metrics.summary("dashboard_render_stage_seconds", by=("path", "stage")).items())
+        ], hide_index=True)
+        
+        endpoint = get_metrics_endpoint()
+        if endpoint:
+            st.caption(f"Prometheus endpoint: {endpoint}")
+        st.download_button(
+            "⬇️ Prometheus metrics", data=metrics.prometheus_text(), file_name="dashboard_metrics.prom",
+            mime="text/plain", use_container_width=True
+        )
 
 # =============================================================================
 # MAIN APP LAYOUT
 # =============================================================================
 
+# Rerun accounting for the operator panel (fragment-only reruns do not pass through here)
+get_metrics_endpoint()
+if "rerun_count" not in st.session_state:
+    st.session_state["rerun_count"] = 0
+    get_metrics().inc("dashboard_sessions_total")
+st.session_state["rerun_count"] += 1
+get_metrics().inc("dashboard_reruns_total")
+
 # Get categories
 categories = get_visualizations_by_category()
 
+# Jump straight to a figure instead of clicking through the tabs
+render_search()
+
 # Create main navigation tabs
-main_tab_names = []
-for cat_key in categories.keys():
-    cat_config = CATEGORY_CONFIG.get(cat_key, {"name": cat_key, "icon": "📊"})
-    main_tab_names.append(f"{cat_config['icon']} {cat_config['name']}")
+main_tab_names = [category_tab_label(cat_key) for cat_key in categories.keys()]
 
-main_tabs = st.tabs(main_tab_names)
+main_tabs = st.tabs(
+    main_tab_names,
+    key="category_tabs",
+    on_change="rerun" if LAZY_NAVIGATION else "ignore"
+)
 
-# Render each category
-for main_tab, (category_name, visualizations) in zip(main_tabs, categories.items()):
+# Render each category - in lazy mode only the open one is built
+for main_tab, tab_name, (category_name, visualizations) in zip(main_tabs, main_tab_names, categories.items()):
     with main_tab:
+        if main_tab.open is False:
+            st.caption(f"⏳ Loading {tab_name}...")
+            continue
         render_category_section(category_name, visualizations)
 
 # =============================================================================
@@ -681,8 +1072,10 @@ with st.sidebar:
     
     # Quick stats
     st.markdown("#### 📊 Quick Stats")
-    total_viz = len(VISUALIZATIONS)
-    working_viz = sum(1 for config in VISUALIZATIONS.values() if os.path.exists(config["file_path"]))
+    manifest_viz = get_manifest().visualizations
+    total_viz = len(manifest_viz)
+    working_viz = sum(1 for config in manifest_viz.values() if config["exists"])
+    discovered_viz = sum(1 for config in manifest_viz.values() if config["source"] == "discovered")
     
     col1, col2 = st.columns(2)
     with col1:
@@ -691,6 +1084,39 @@ with st.sidebar:
         st.metric("Active", working_viz)
     
     st.progress(working_viz / total_viz if total_viz > 0 else 0)
+    if discovered_viz:
+        st.caption(f"🔍 {discovered_viz} figures auto-discovered in the figure folders")
+    dedup = get_manifest().dedup_summary()
+    if dedup["duplicate_groups"]:
+        st.caption(
+            f"♻️ {dedup['figures']} figures, {dedup['unique']} unique - duplicates share one cached copy "
+            f"({dedup['bytes_saved'] / 1024 / 1024:.1f} MB not loaded twice)"
+        )
+    
+    # Figure cache counters (process-wide)
+    cache_stats = get_figure_cache().stats()
+    st.caption(
+        f"🗄️ Cache: {cache_stats['entries']} figures, "
+        f"{cache_stats['bytes'] / 1024 / 1024:.1f}/{cache_stats['max_bytes'] / 1024 / 1024:.0f} MB • "
+        f"hits {cache_stats['hits']} • misses {cache_stats['misses']} • "
+        f"evictions {cache_stats['evictions']} ({cache_stats['hit_rate']:.0%} hit rate)"
+    )
+    prefetch_stats = get_prefetcher().stats()
+    if prefetch_stats["scheduled"]:
+        st.caption(
+            f"⏩ Prefetch: {prefetch_stats['completed']} figures warmed ahead, {prefetch_stats['hits']} opened "
+            f"({prefetch_stats['hit_rate']:.0%} hit rate) • {prefetch_stats['pending']} pending"
+        )
+    shared_cache = get_shared_cache()
+    if shared_cache is not None:
+        shared_stats = shared_cache.stats()
+        st.caption(
+            f"🧩 Host-wide cache: {shared_stats['mapped']} payloads mapped "
+            f"({shared_stats['mapped_bytes'] / 1024 / 1024:.1f} MB, shared with the other server processes) • "
+            f"{shared_stats['hit_rate']:.0%} hit rate"
+        )
+    
+    render_operator_panel()
     
     # Refresh button
     st.markdown("---")
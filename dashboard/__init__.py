@@ -0,0 +1 @@
+"""Support modules for the Computational Infrastructure Entities Usage dashboard."""
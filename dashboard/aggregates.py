@@ -0,0 +1,268 @@
+"""Incremental ingestion of new publications with delta-merged aggregate tables.
+
+The aggregate tables hold the per-year, per-country, per-organization,
+per-hardware and per-cloud-service counts behind the AGGREGATE_FIGURES (see
+dashboard/config.py): one Parquet file per dimension with a row per
+``(value, year)`` and its ``papers``, ``records`` and ``devices``.
+Ingestion is append-only - a batch holds papers the entity store has not
+seen - so a batch's own counts are a delta that is simply added to the
+tables, and a paper is counted once per group without rescanning the corpus:
+
+    python -m dashboard.aggregates build                  # full computation from the entity store
+    python -m dashboard.aggregates ingest new_records.csv # append a batch, then rebuild what changed
+
+The batch is appended to the entity store as a new Parquet part, only the
+tables of dimensions the batch mentions are rewritten, and ``dashboard.build``
+re-emits only the figures whose table changed. The tables record the store
+version they count (``store_version.json``); when it is not the store's own -
+say an ingestion stopped between appending to the store and merging the
+tables - they are recomputed from the whole store before the next merge. The collaboration graph is the
+exception: its centralities are not additive, so the build recomputes it from
+the whole store whenever a batch arrives.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import pandas as pd
+import plotly.graph_objects as go
+
+from dashboard.entity_store import (
+    EntityStore, append_entity_records, normalize_records, read_records, read_store, store_version
+)
+from dashboard.figure_html import find_plotly_runtime, shared_runtime_tag
+from dashboard.manifest import SIDECAR_SUFFIX
+
+MEASURE_COLUMNS = ["papers", "records", "devices"]
+MEASURE_TITLES = {"papers": "Papers", "records": "Mentions", "devices": "Devices"}
+VERSION_FILE = "store_version.json"
+
+
+def table_path(aggregate_dir, dimension):
+    return os.path.join(aggregate_dir, f"{dimension}.parquet")
+
+
+def _keys(dimension):
+    return ["year"] if dimension == "year" else [dimension, "year"]
+
+
+def empty_table(dimension):
+    table = pd.DataFrame({key: pd.Series(dtype="string" if key != "year" else "int16") for key in _keys(dimension)})
+    for column in MEASURE_COLUMNS:
+        table[column] = pd.Series(dtype="float64" if column == "devices" else "int64")
+    return table
+
+
+def aggregate_records(records, dimension):
+    """Counts of normalized entity ``records`` per ``(value, year)`` of ``dimension``.
+
+    ``papers`` counts each paper once per group; since every paper has one
+    year, summing a value's rows over the years still counts each paper once.
+    """
+    keys = _keys(dimension)
+    frame = records[list(dict.fromkeys(keys + ["paper_id", "count"]))].dropna(subset=keys)
+    if frame.empty:
+        return empty_table(dimension)
+    grouped = frame.groupby(keys, observed=True, sort=False)
+    table = pd.DataFrame({"papers": grouped["paper_id"].nunique(), "records": grouped.size(),
+                          "devices": grouped["count"].sum().astype("float64")}).reset_index()
+    return _typed(table, dimension)
+
+
+def _typed(table, dimension):
+    table["year"] = table["year"].astype("int16")
+    if dimension != "year":
+        table[dimension] = table[dimension].astype(str).astype("string")
+    table["papers"] = table["papers"].astype("int64")
+    table["records"] = table["records"].astype("int64")
+    table["devices"] = table["devices"].astype("float64")
+    return table
+
+
+def merge_delta(table, delta, dimension):
+    """Table with the counts of ``delta`` added to those of ``table`` (new groups are appended)."""
+    if delta.empty:
+        return table
+    merged = pd.concat([table, delta], ignore_index=True).groupby(_keys(dimension), sort=False)[MEASURE_COLUMNS].sum()
+    return _typed(merged.reset_index(), dimension).sort_values(_keys(dimension), kind="stable").reset_index(drop=True)
+
+
+def read_table(aggregate_dir, dimension):
+    path = table_path(aggregate_dir, dimension)
+    return pd.read_parquet(path) if os.path.exists(path) else empty_table(dimension)
+
+
+def write_table(table, aggregate_dir, dimension):
+    os.makedirs(aggregate_dir, exist_ok=True)
+    path = table_path(aggregate_dir, dimension)
+    table.to_parquet(path + ".tmp", engine="pyarrow", compression="zstd", index=False)
+    os.replace(path + ".tmp", path)
+
+
+def build_aggregates(records, aggregate_dir, dimensions):
+    """Compute every table from all the records (the full, non-incremental path)."""
+    for dimension in dimensions:
+        write_table(aggregate_records(records, dimension).sort_values(_keys(dimension), kind="stable"),
+                    aggregate_dir, dimension)
+
+
+def read_tables_version(aggregate_dir):
+    """The store version the tables count, or None when it was never recorded."""
+    path = os.path.join(aggregate_dir, VERSION_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_tables_version(aggregate_dir, version):
+    os.makedirs(aggregate_dir, exist_ok=True)
+    path = os.path.join(aggregate_dir, VERSION_FILE)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(version, f)
+    os.replace(path + ".tmp", path)
+
+
+def ingest(source_path, store_path, aggregate_dir, dimensions):
+    """Append a batch of entity records to the store and delta-merge the aggregate tables.
+
+    Records of papers already in the store are skipped (ingestion is
+    append-only); only the store's ``paper_id`` column is read to find them,
+    and the batch is written as a new part rather than rewriting the store.
+    The store is appended to before the tables are merged, and the tables are
+    recomputed from the store whenever they do not count its current version,
+    so a batch is never counted twice. Returns a report with the records and
+    papers added, the papers skipped and the dimensions whose table changed.
+    """
+    batch = normalize_records(read_records(source_path))
+    stored = os.path.exists(store_path)
+    rebuilt = (read_tables_version(aggregate_dir) != store_version(store_path)
+               or not all(os.path.exists(table_path(aggregate_dir, d)) for d in dimensions))
+    if rebuilt:
+        # First ingestion after the store was built, or the tables lag behind it: start from the full counts
+        build_aggregates(EntityStore(store_path).frame if stored else batch.iloc[:0], aggregate_dir, dimensions)
+        write_tables_version(aggregate_dir, store_version(store_path))
+
+    skipped = 0
+    if stored:
+        known = batch["paper_id"].isin(read_store(store_path, columns=["paper_id"])["paper_id"]).to_numpy()
+        skipped = batch.loc[known, "paper_id"].nunique()
+        batch = batch[~known].reset_index(drop=True)
+    report = {"records": len(batch), "papers": batch["paper_id"].nunique(), "skipped_papers": skipped,
+              "changed": list(dimensions) if rebuilt else []}
+    if batch.empty:
+        return report
+
+    # Stored first: the live filters and the collaboration graph see the batch, and
+    # if the merge below does not finish the tables' version no longer matches
+    os.makedirs(os.path.dirname(store_path) or ".", exist_ok=True)
+    append_entity_records(batch, store_path)
+    for dimension in dimensions:
+        delta = aggregate_records(batch, dimension)
+        if delta.empty:
+            continue
+        write_table(merge_delta(read_table(aggregate_dir, dimension), delta, dimension), aggregate_dir, dimension)
+        if dimension not in report["changed"]:
+            report["changed"].append(dimension)
+    write_tables_version(aggregate_dir, store_version(store_path))
+    return report
+
+
+def top_values(table, dimension, measure, top_n):
+    """Totals of ``measure`` per value of ``dimension`` (summed over the years), largest first."""
+    totals = table.groupby(dimension, sort=False)[measure].sum()
+    totals = totals[totals > 0].sort_values(ascending=False, kind="stable")
+    return totals if top_n is None else totals.head(top_n)
+
+
+def aggregate_figure(table, dimension, title, measure="papers", top_n=None, over_time=False):
+    """Bar chart of the largest values, one line per leading value over the years, or the yearly totals."""
+    value_title = MEASURE_TITLES[measure]
+    if dimension == "year":
+        yearly = table.sort_values("year")
+        figure = go.Figure(go.Bar(x=yearly["year"].astype(int).tolist(), y=yearly[measure].tolist()))
+        figure.update_layout(xaxis_title="Year", yaxis_title=value_title)
+    elif over_time:
+        leading = top_values(table, dimension, measure, top_n).index
+        figure = go.Figure([
+            go.Scatter(x=rows["year"].astype(int).tolist(), y=rows[measure].tolist(), mode="lines+markers", name=value)
+            for value, rows in ((value, table[table[dimension] == value].sort_values("year")) for value in leading)
+        ])
+        figure.update_layout(xaxis_title="Year", yaxis_title=value_title)
+    else:
+        totals = top_values(table, dimension, measure, top_n).iloc[::-1]  # largest bar on top
+        figure = go.Figure(go.Bar(x=totals.tolist(), y=totals.index.tolist(), orientation="h"))
+        figure.update_layout(xaxis_title=value_title)
+    figure.update_layout(title=title, template="plotly_white", margin={"l": 10, "r": 10, "t": 60, "b": 10})
+    return figure
+
+
+def emit_figure(inputs, output_path, dimension, title, measure="papers", top_n=None, over_time=False,
+                description=None, icon="📊"):
+    """Figure builder (see FIGURE_BUILDERS): write an aggregate figure's HTML export and its sidecar."""
+    figure = aggregate_figure(pd.read_parquet(inputs[0]), dimension, title, measure, top_n, over_time)
+    # A fixed div id keeps re-emitted figures byte-identical when their counts are
+    div_id = os.path.splitext(os.path.basename(output_path))[0]
+    # Loads the pinned local runtime; plotly.py's own CDN tag points at its newer plotly.js
+    html_content = figure.to_html(include_plotlyjs=False, full_html=True, div_id=div_id)
+    html_content = html_content.replace("<body>", "<body>\n    " + shared_runtime_tag(), 1)
+    if "cdn.plot.ly" in html_content or find_plotly_runtime(html_content) is None:
+        raise ValueError(f"{output_path} would not load the shared Plotly.js runtime")
+    with open(output_path + ".tmp", "w", encoding="utf-8") as f:
+        f.write(html_content)
+    os.replace(output_path + ".tmp", output_path)
+    with open(os.path.splitext(output_path)[0] + SIDECAR_SUFFIX, "w", encoding="utf-8") as f:
+        json.dump({"title": title, "description": description or title, "icon": icon}, f, indent=1,
+                  ensure_ascii=False)
+
+
+def figure_builders(figures, aggregate_dir):
+    """FIGURE_BUILDERS entries for the aggregate figures whose table has been built."""
+    builders = {}
+    for output_path, spec in figures.items():
+        path = table_path(aggregate_dir, spec["dimension"])
+        if os.path.exists(path):
+            builders[output_path] = {"builder": "dashboard.aggregates:emit_figure", "inputs": [path],
+                                     "options": dict(spec)}
+    return builders
+
+
+def main(argv=None):
+    from dashboard.config import AGGREGATE_DIMENSIONS, AGGREGATE_DIR, ENTITY_STORE_PATH
+
+    parser = argparse.ArgumentParser(description="Build the aggregate tables or ingest new entity records.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build_parser = subparsers.add_parser("build", help="compute the tables from the whole entity store")
+    ingest_parser = subparsers.add_parser("ingest", help="append new records and delta-merge the tables")
+    ingest_parser.add_argument("source", help="records of new papers as .csv, .jsonl or .parquet")
+    ingest_parser.add_argument("--no-build", action="store_true",
+                               help="skip `python -m dashboard.build` for the figures that changed")
+    for subparser in (build_parser, ingest_parser):
+        subparser.add_argument("--store", default=ENTITY_STORE_PATH)
+        subparser.add_argument("--output", default=AGGREGATE_DIR, help="directory of the aggregate tables")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    if args.command == "build":
+        store = EntityStore(args.store)
+        build_aggregates(store.frame, args.output, AGGREGATE_DIMENSIONS)
+        write_tables_version(args.output, store_version(args.store))
+        print(f"Aggregated {len(store):,} entity records into {len(AGGREGATE_DIMENSIONS)} tables in {args.output} "
+              f"({time.perf_counter() - start:.1f}s)")
+        return 0
+
+    report = ingest(args.source, args.store, args.output, AGGREGATE_DIMENSIONS)
+    print(f"Ingested {report['records']:,} records of {report['papers']:,} new papers "
+          f"({report['skipped_papers']:,} already stored papers skipped) in {time.perf_counter() - start:.1f}s; "
+          f"changed tables: {', '.join(report['changed']) or 'none'}")
+    if not report["changed"] or args.no_build:
+        return 0
+    from dashboard import build
+    return build.main([])
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,244 @@
+"""Headless benchmark of what a dashboard page view costs.
+
+Drives ``app.py`` with Streamlit's AppTest from the repository root and
+records, for a cold start, warm full reruns, every category and every
+figure (first view, click-to-load and warm reruns): wall time, bytes of
+element data emitted, figure payload bytes per render path and the number
+of widgets created, plus the peak RSS of the process. The report is JSON and can be
+checked against a saved baseline (cold and first-view timings are reported
+but, being dominated by one-off loading noise, not compared):
+
+    python -m dashboard.benchmark --save-baseline     # record benchmarks/baseline.json
+    python -m dashboard.benchmark                     # exit status 1 on regressions
+
+Render paths: ``html`` (the HTML export sent by render_plotly_html_large),
+``native`` (st.plotly_chart from the figure store) and ``static`` (iframe src).
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import statistics
+import sys
+import time
+
+BASELINE_PATH = os.path.join("benchmarks", "baseline.json")
+REPORT_PATH = os.path.join("build", "benchmark.json")
+
+# A metric regresses when it exceeds the baseline by more than its relative
+# tolerance and, for timings and memory, by more than the noise floor in
+# seconds or MB (peak RSS moves with the allocator and the Python build)
+DEFAULT_TIME_TOLERANCE = 0.25
+DEFAULT_BYTES_TOLERANCE = 0.05
+DEFAULT_MEMORY_TOLERANCE = 0.15
+TIME_NOISE_FLOOR = 0.05
+MEMORY_NOISE_FLOOR_MB = 20
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far, in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+def measure_elements(app_test):
+    """Return ``{"bytes", "widgets", "figure_bytes": {render path: bytes}}`` of the last run's elements."""
+    from streamlit.testing.v1.element_tree import Block, Widget
+
+    total_bytes = 0
+    widgets = 0
+    figure_bytes = {}
+    for node in app_test:  # every element of the main area, sidebar and dialogs
+        if isinstance(node, Block):
+            continue
+        size = node.proto.ByteSize() if hasattr(node.proto, "ByteSize") else 0
+        total_bytes += size
+        widgets += isinstance(node, Widget)
+        path = None
+        if node.type == "plotly_chart":
+            path = "native"
+        elif node.type == "iframe":
+            path = "html" if node.proto.srcdoc else "static"
+        if path is not None:
+            figure_bytes[path] = figure_bytes.get(path, 0) + size
+    return {"bytes": total_bytes, "widgets": widgets, "figure_bytes": figure_bytes}
+
+
+def timed_run(app_test):
+    """Rerun the app; return its wall time and element measurements."""
+    start = time.perf_counter()
+    app_test.run()
+    wall_s = time.perf_counter() - start
+    if app_test.exception:
+        raise RuntimeError(f"App raised during the benchmark: {app_test.exception[0].message}")
+    return dict(wall_s=round(wall_s, 4), **measure_elements(app_test))
+
+
+def run_benchmark(app_path, warm_runs=3, timeout=120):
+    """Benchmark ``app_path`` and return the report dict."""
+    from streamlit.testing.v1 import AppTest
+
+    from dashboard.config import CATEGORY_CONFIG, VISUALIZATIONS, BASE_PATHS, AUTO_DISCOVER_FIGURES
+    from dashboard.manifest import VisualizationManifest
+
+    app_test = AppTest.from_file(app_path, default_timeout=timeout)
+    cold = timed_run(app_test)
+    warm = [timed_run(app_test) for _ in range(warm_runs)]
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "warm_runs": warm_runs,
+        },
+        "full_run": {
+            "cold_s": cold["wall_s"],
+            "warm_s": statistics.median(run["wall_s"] for run in warm) if warm else cold["wall_s"],
+            "bytes": cold["bytes"],
+            "widgets": cold["widgets"],
+        },
+        "categories": {},
+        "figures": {},
+    }
+
+    manifest = VisualizationManifest(VISUALIZATIONS, BASE_PATHS, discover=AUTO_DISCOVER_FIGURES)
+    for category, visualizations in manifest.by_category().items():
+        cat_config = CATEGORY_CONFIG.get(category, {"name": category, "icon": "📊"})
+        # Tab labels as built by app.py
+        app_test.session_state["category_tabs"] = f"{cat_config['icon']} {cat_config['name']}"
+        category_run = timed_run(app_test)
+        first_view_total = category_run["wall_s"]
+        for viz_name, config in visualizations:
+            app_test.session_state[f"viz_tabs_{category}"] = config.get("icon", "📊") + " " + viz_name
+            figure_run = timed_run(app_test)
+            first_view_total += figure_run["wall_s"]
+            first_view_s = figure_run.pop("wall_s")
+            # With click-to-load the first view is a preview card; load the figure itself too
+            load_buttons = [button for button in app_test.button if (button.key or "").startswith("load_")]
+            load_s = None
+            if load_buttons:
+                load_buttons[0].click()
+                figure_run = timed_run(app_test)
+                load_s = figure_run.pop("wall_s")
+            # Single first views are noisy; regressions are judged on the warm median
+            warm_s = statistics.median(timed_run(app_test)["wall_s"] for _ in range(warm_runs)) \
+                if warm_runs else load_s or first_view_s
+            report["figures"][viz_name] = dict(figure_run, category=category, first_view_s=first_view_s,
+                                               preview=bool(load_buttons), load_s=load_s, warm_s=warm_s)
+        report["categories"][category] = {
+            "figures": len(visualizations),
+            "first_view_s": category_run["wall_s"],
+            "first_view_total_s": round(first_view_total, 4),
+            "warm_s": round(sum(report["figures"][viz_name]["warm_s"] for viz_name, _ in visualizations), 4),
+            "bytes": sum(report["figures"][viz_name]["bytes"] for viz_name, _ in visualizations),
+            "widgets": max([category_run["widgets"]] + [report["figures"][viz_name]["widgets"]
+                                                        for viz_name, _ in visualizations]),
+        }
+
+    figure_bytes = {}
+    for figure in report["figures"].values():
+        for path, size in figure["figure_bytes"].items():
+            figure_bytes.setdefault(path, []).append(size)
+    report["figure_bytes_per_call"] = {
+        path: {"calls": len(sizes), "mean": round(statistics.mean(sizes)), "max": max(sizes)}
+        for path, sizes in figure_bytes.items()
+    }
+    report["peak_rss_mb"] = round(peak_rss_mb(), 1)
+    return report
+
+
+def _metrics(report):
+    """Flatten a report into ``{metric name: (value, kind)}`` for comparison."""
+    metrics = {
+        "full_run.warm_s": (report["full_run"]["warm_s"], "time"),
+        "full_run.bytes": (report["full_run"]["bytes"], "bytes"),
+        "full_run.widgets": (report["full_run"]["widgets"], "count"),
+        "peak_rss_mb": (report["peak_rss_mb"], "memory"),
+    }
+    for category, values in report["categories"].items():
+        metrics[f"categories.{category}.warm_s"] = (values["warm_s"], "time")
+        metrics[f"categories.{category}.bytes"] = (values["bytes"], "bytes")
+        metrics[f"categories.{category}.widgets"] = (values["widgets"], "count")
+    for viz_name, values in report["figures"].items():
+        metrics[f"figures.{viz_name}.warm_s"] = (values["warm_s"], "time")
+        metrics[f"figures.{viz_name}.bytes"] = (values["bytes"], "bytes")
+    return metrics
+
+
+def compare_reports(report, baseline, time_tolerance=DEFAULT_TIME_TOLERANCE,
+                    bytes_tolerance=DEFAULT_BYTES_TOLERANCE, memory_tolerance=DEFAULT_MEMORY_TOLERANCE):
+    """Return ``[(metric, baseline value, current value)]`` for every regressed metric."""
+    current = _metrics(report)
+    regressions = []
+    for name, (base_value, kind) in _metrics(baseline).items():
+        if name not in current:
+            continue
+        value = current[name][0]
+        if kind == "time":
+            regressed = value > base_value * (1 + time_tolerance) and value - base_value > TIME_NOISE_FLOOR
+        elif kind == "bytes":
+            regressed = value > base_value * (1 + bytes_tolerance)
+        elif kind == "memory":
+            regressed = value > base_value * (1 + memory_tolerance) and value - base_value > MEMORY_NOISE_FLOOR_MB
+        else:
+            regressed = value > base_value
+        if regressed:
+            regressions.append((name, base_value, value))
+    return regressions
+
+
+def _write_json(report, path):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=1, ensure_ascii=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the dashboard's render cost headlessly.")
+    parser.add_argument("--app", default="app.py", help="Streamlit script to benchmark")
+    parser.add_argument("--runs", type=int, default=3, help="warm full reruns to time")
+    parser.add_argument("--output", default=REPORT_PATH, help="where to write the JSON report")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="baseline report to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="write this run as the new baseline")
+    parser.add_argument("--time-tolerance", type=float, default=DEFAULT_TIME_TOLERANCE)
+    parser.add_argument("--bytes-tolerance", type=float, default=DEFAULT_BYTES_TOLERANCE)
+    parser.add_argument("--memory-tolerance", type=float, default=DEFAULT_MEMORY_TOLERANCE)
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(os.path.abspath(args.app), warm_runs=args.runs)
+    _write_json(report, args.output)
+    full_run = report["full_run"]
+    print(f"Full run: cold {full_run['cold_s']:.2f}s, warm {full_run['warm_s']:.2f}s, "
+          f"{full_run['bytes'] / 1024:.0f} KB, {full_run['widgets']} widgets; peak RSS {report['peak_rss_mb']:.0f} MB")
+    for category, values in report["categories"].items():
+        print(f"  {category}: {values['figures']} figures, first views {values['first_view_total_s']:.2f}s, "
+              f"warm {values['warm_s']:.2f}s, {values['bytes'] / 1024:.0f} KB")
+    for path, values in report["figure_bytes_per_call"].items():
+        print(f"  {path} figures: {values['calls']} calls, {values['mean'] / 1024:.0f} KB mean, "
+              f"{values['max'] / 1024:.0f} KB max")
+    print(f"Report written to {args.output}")
+
+    if args.save_baseline:
+        _write_json(report, args.baseline)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline to record one")
+        return 0
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions = compare_reports(report, baseline, args.time_tolerance, args.bytes_tolerance,
+                                  args.memory_tolerance)
+    for name, base_value, value in regressions:
+        print(f"REGRESSION {name}: {base_value} -> {value}")
+    if not regressions:
+        print(f"No regressions against {args.baseline}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,271 @@
+"""Incremental, parallel build of the figures and everything derived from them.
+
+    python -m dashboard.build                # rebuild what changed
+    python -m dashboard.build --dry-run      # list what would be rebuilt
+    python -m dashboard.build --force -j 8   # rebuild everything on 8 processes
+
+The build runs in two stages, each on a process pool:
+
+1. Figures - every output registered in ``FIGURE_BUILDERS`` (see
+   dashboard/config.py) is regenerated by its builder function from its
+   declared dataset inputs, and every ``AGGREGATE_FIGURES`` output from its
+   aggregate table once the tables exist (see dashboard/aggregates.py).
+2. Derived artifacts - the figure store, the preview cards, the hierarchy
+   cubes, the search index and (with ``--static``) the static figure
+   assets, built from the figure files, and the collaboration graph, built
+   from the entity store once one exists.
+
+Each target is fingerprinted from the content of its inputs, the source of
+the code that builds it and its outputs' presence; targets whose fingerprint
+matches the one recorded in ``build/build_state.json`` are skipped. Builders
+run in fresh processes with ``PYTHONHASHSEED=0`` so reruns are reproducible.
+"""
+
+import argparse
+import hashlib
+import importlib
+import inspect
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+BUILD_STATE_PATH = os.path.join("build", "build_state.json")
+
+# Modules whose source is part of every derived artifact's fingerprint
+_ARTIFACT_CODE = {
+    "figure_store": ["dashboard.figure_store", "dashboard.figure_minify"],
+    "previews": ["dashboard.figure_preview", "dashboard.figure_optimize", "dashboard.figure_store",
+                 "dashboard.figure_html"],
+    "static_assets": ["dashboard.static_assets", "dashboard.figure_html", "dashboard.figure_minify",
+                      "dashboard.typed_arrays"],
+    "hierarchy_cube": ["dashboard.hierarchy_cube", "dashboard.figure_store", "dashboard.figure_minify"],
+    "collaboration_graph": ["dashboard.collaboration_graph", "dashboard.entity_store"],
+    # Titles and descriptions are indexed too, so config edits rebuild the index
+    "search_index": ["dashboard.search_index", "dashboard.figure_preview", "dashboard.figure_store",
+                     "dashboard.manifest", "dashboard.config"],
+}
+
+
+def file_digest(path):
+    """sha256 of a file's bytes (or of a directory's files), or None when it is missing."""
+    if os.path.isdir(path):
+        digest = hashlib.sha256()
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                file_path = os.path.join(root, name)
+                digest.update(os.path.relpath(file_path, path).encode("utf-8"))
+                digest.update((file_digest(file_path) or "").encode("ascii"))
+        return digest.hexdigest()
+    if not os.path.exists(path):
+        return None
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def module_digest(module_name):
+    """sha256 of a module's source file."""
+    module = importlib.import_module(module_name)
+    return file_digest(inspect.getsourcefile(module))
+
+
+def resolve_builder(builder):
+    """Import a ``"package.module:function"`` builder reference."""
+    module_name, _, function_name = builder.partition(":")
+    return getattr(importlib.import_module(module_name), function_name)
+
+
+def fingerprint(target):
+    """Fingerprint of everything a target's outputs depend on."""
+    parts = {
+        "inputs": {path: file_digest(path) for path in target["inputs"]},
+        "code": {module: module_digest(module) for module in target["code"]},
+        "args": target["args"],
+        "outputs_present": all(os.path.exists(path) for path in target["outputs"]),
+    }
+    return hashlib.sha256(json.dumps(parts, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def figure_targets(figure_builders):
+    """Targets that regenerate registered figures from the dataset."""
+    targets = {}
+    for output_path, spec in figure_builders.items():
+        module_name = spec["builder"].partition(":")[0]
+        targets[output_path] = {
+            "inputs": list(spec.get("inputs", [])),
+            "outputs": [output_path],
+            "code": [module_name],
+            "args": {"builder": spec["builder"], "options": spec.get("options", {})},
+        }
+    return targets
+
+
+def artifact_targets(file_paths, static):
+    """Targets derived from the figure files (and from the entity store, when it is built)."""
+    from dashboard.config import (
+        BINARY_ARRAY_MIN_LENGTH, BINARY_ARRAYS, COLLABORATION_GRAPH_PATH, ENTITY_STORE_PATH, FIGURE_FLOAT_DIGITS,
+        FIGURE_MINIFICATION, FIGURE_STORE_PATH, HIERARCHY_CUBE_PATH, PREVIEW_PATH, SEARCH_INDEX_PATH, STATIC_ASSET_DIR,
+        STATIC_ASSET_MAP_PATH
+    )
+    from dashboard.manifest import SIDECAR_SUFFIX
+
+    float_digits = FIGURE_FLOAT_DIGITS if FIGURE_MINIFICATION else None
+    targets = {
+        "figure_store": {"outputs": [FIGURE_STORE_PATH],
+                         "args": {"output": FIGURE_STORE_PATH, "float_digits": float_digits}},
+        "previews": {"outputs": [PREVIEW_PATH], "args": {"output": PREVIEW_PATH}},
+        "hierarchy_cube": {"outputs": [HIERARCHY_CUBE_PATH], "args": {"output": HIERARCHY_CUBE_PATH}},
+        "search_index": {"outputs": [SEARCH_INDEX_PATH], "args": {"output": SEARCH_INDEX_PATH},
+                         "inputs": list(file_paths) + [
+                             sidecar for sidecar in (os.path.splitext(path)[0] + SIDECAR_SUFFIX for path in file_paths)
+                             if os.path.exists(sidecar)
+                         ]},
+    }
+    if static:
+        targets["static_assets"] = {"outputs": [STATIC_ASSET_MAP_PATH],
+                                    "args": {"asset_dir": STATIC_ASSET_DIR, "float_digits": float_digits,
+                                             "binary_min_length": BINARY_ARRAY_MIN_LENGTH if BINARY_ARRAYS else None}}
+    if os.path.exists(ENTITY_STORE_PATH):
+        targets["collaboration_graph"] = {"inputs": [ENTITY_STORE_PATH], "outputs": [COLLABORATION_GRAPH_PATH],
+                                          "args": {"output": COLLABORATION_GRAPH_PATH}}
+    for name, target in targets.items():
+        target.setdefault("inputs", list(file_paths))
+        target["code"] = _ARTIFACT_CODE[name]
+    return targets
+
+
+def _build_figure(output_path, args, inputs):
+    """Run one figure builder (in a worker process); return its wall time."""
+    start = time.perf_counter()
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    resolve_builder(args["builder"])(inputs, output_path, **args["options"])
+    return time.perf_counter() - start
+
+
+def _build_artifact(name, args, inputs):
+    """Build one derived artifact (in a worker process); return its wall time."""
+    start = time.perf_counter()
+    if name == "figure_store":
+        from dashboard.figure_store import compile_figures
+        compile_figures(inputs, args["output"], float_digits=args["float_digits"])
+    elif name == "previews":
+        from dashboard.figure_preview import build_previews
+        build_previews(inputs, args["output"])
+    elif name == "hierarchy_cube":
+        from dashboard.hierarchy_cube import build_cubes
+        build_cubes(inputs, args["output"])
+    elif name == "collaboration_graph":
+        from dashboard.collaboration_graph import build_graph
+        from dashboard.config import BETWEENNESS_SAMPLES, COLLABORATION_NETWORK_NODES, MAX_ORGANIZATIONS_PER_PAPER
+        from dashboard.entity_store import EntityStore
+        build_graph(EntityStore(inputs[0]).frame, args["output"], max_organizations=MAX_ORGANIZATIONS_PER_PAPER,
+                    betweenness_samples=BETWEENNESS_SAMPLES, layout_nodes=COLLABORATION_NETWORK_NODES)
+    elif name == "search_index":
+        from dashboard.config import AUTO_DISCOVER_FIGURES, BASE_PATHS, CATEGORY_CONFIG, VISUALIZATIONS
+        from dashboard.manifest import VisualizationManifest
+        from dashboard.search_index import build_index
+        manifest = VisualizationManifest(VISUALIZATIONS, BASE_PATHS, discover=AUTO_DISCOVER_FIGURES)
+        build_index(manifest.visualizations, {category: config["name"] for category, config in CATEGORY_CONFIG.items()},
+                    args["output"])
+    elif name == "static_assets":
+        from dashboard.config import PLOTLY_JS_PATH
+        from dashboard.static_assets import build_assets
+        build_assets(inputs, args["asset_dir"], os.path.basename(PLOTLY_JS_PATH), float_digits=args["float_digits"],
+                     binary_min_length=args["binary_min_length"])
+    return time.perf_counter() - start
+
+
+def load_state(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_state(state, path):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=1, sort_keys=True)
+    os.replace(path + ".tmp", path)
+
+
+def run_stage(targets, work, state, jobs, force=False, dry_run=False, log=print):
+    """Rebuild the stale ``targets`` with ``work(name, args, inputs)`` on a process pool.
+
+    Updates ``state`` with the fingerprints of targets built successfully and
+    returns the names of targets that failed.
+    """
+    fingerprints = {name: fingerprint(target) for name, target in targets.items()}
+    stale = [name for name in targets if force or state.get(name) != fingerprints[name]]
+    for name in targets:
+        if name not in stale:
+            log(f"  up to date  {name}")
+    if dry_run or not stale:
+        for name in stale:
+            log(f"  would build {name}")
+        return []
+
+    failed = []
+    # Spawned workers start clean and inherit the fixed hash seed
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=min(jobs, len(stale)), mp_context=context) as pool:
+        futures = {pool.submit(work, name, targets[name]["args"], targets[name]["inputs"]): name for name in stale}
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                elapsed = future.result()
+            except Exception as e:
+                failed.append(name)
+                state.pop(name, None)
+                log(f"  FAILED      {name}: {type(e).__name__}: {e}")
+                continue
+            # Fingerprint again: outputs now exist
+            state[name] = fingerprint(targets[name])
+            log(f"  built       {name} ({elapsed:.2f}s)")
+    return failed
+
+
+def main(argv=None):
+    from dashboard.aggregates import figure_builders
+    from dashboard.config import AGGREGATE_DIR, AGGREGATE_FIGURES, AUTO_DISCOVER_FIGURES, BASE_PATHS, FIGURE_BUILDERS, \
+        VISUALIZATIONS
+    from dashboard.manifest import VisualizationManifest
+
+    parser = argparse.ArgumentParser(description="Rebuild the figures and derived artifacts that changed.")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1, help="worker processes")
+    parser.add_argument("--force", action="store_true", help="rebuild every target")
+    parser.add_argument("--dry-run", action="store_true", help="only list the targets that would be rebuilt")
+    parser.add_argument("--static", action="store_true", help="also build the static figure assets")
+    parser.add_argument("--state", default=BUILD_STATE_PATH, help="where build fingerprints are recorded")
+    args = parser.parse_args(argv)
+
+    os.environ["PYTHONHASHSEED"] = "0"
+    state = load_state(args.state)
+    start = time.perf_counter()
+
+    builders = dict(FIGURE_BUILDERS, **figure_builders(AGGREGATE_FIGURES, AGGREGATE_DIR))
+    print(f"Figures ({len(builders)} with a registered builder)")
+    failed = run_stage(figure_targets(builders), _build_figure, state, args.jobs,
+                       force=args.force, dry_run=args.dry_run)
+
+    manifest = VisualizationManifest(VISUALIZATIONS, BASE_PATHS, discover=AUTO_DISCOVER_FIGURES)
+    file_paths = list(dict.fromkeys(config["file_path"] for config in manifest.visualizations.values()
+                                    if config["exists"]))
+    print(f"Derived artifacts ({len(file_paths)} figure files)")
+    failed += run_stage(artifact_targets(file_paths, args.static), _build_artifact, state, args.jobs,
+                        force=args.force, dry_run=args.dry_run)
+
+    if not args.dry_run:
+        save_state(state, args.state)
+    print(f"Done in {time.perf_counter() - start:.1f}s" + (f", {len(failed)} failed" if failed else ""))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
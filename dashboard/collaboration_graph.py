@@ -0,0 +1,368 @@
+"""Organization collaboration graph computed from the entity store.
+
+Two organizations collaborate when they appear on the same paper. The graph
+is the upper triangle of ``BᵀB`` for the sparse paper-by-organization
+incidence matrix ``B``: pair counts are computed in one vectorized pass over
+the incidence (papers with more than ``max_organizations`` organizations are
+left out, their pairs would swamp everything else). The graph file also
+holds the per-country pairs, per-organization degree, sampled betweenness
+centrality and the force-directed layout of the most connected
+organizations, so the app only slices precomputed arrays.
+
+Build it from the entity store (see dashboard/entity_store.py):
+
+    python -m dashboard.collaboration_graph build     # writes build/collaboration.npz
+    python -m dashboard.collaboration_graph pairs --top 20
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+
+def incidence_pairs(groups, members, n_members, max_group_size=None):
+    """Count how often two members share a group.
+
+    ``groups`` and ``members`` are the integer row and column codes of the
+    incidence matrix (duplicates allowed). Returns ``(a, b, counts, sizes)``:
+    the pairs ``a < b`` with their shared-group counts, and the number of
+    distinct members of every group (in group order).
+    """
+    codes = np.unique(groups.astype(np.int64) * n_members + members)
+    groups, members = codes // n_members, codes % n_members
+    if not len(codes):
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, empty, empty
+    starts = np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]])
+    sizes = np.diff(np.r_[starts, len(codes)])
+
+    # Each member pairs with the members after it in its group
+    position = np.arange(len(codes)) - np.repeat(starts, sizes)
+    fan = np.repeat(sizes, sizes) - 1 - position
+    if max_group_size is not None:
+        fan[np.repeat(sizes > max_group_size, sizes)] = 0
+    left = np.repeat(np.arange(len(codes)), fan)
+    right = left + 1 + np.arange(len(left)) - np.repeat(np.cumsum(fan) - fan, fan)
+    pair_codes, counts = np.unique(members[left] * n_members + members[right], return_counts=True)
+    return pair_codes // n_members, pair_codes % n_members, counts, sizes
+
+
+def adjacency(n_nodes, a, b):
+    """CSR ``(indptr, indices)`` of the undirected graph with edges ``a - b``."""
+    sources = np.concatenate([a, b])
+    targets = np.concatenate([b, a])
+    order = np.argsort(sources, kind="stable")
+    indptr = np.r_[0, np.cumsum(np.bincount(sources, minlength=n_nodes))]
+    return indptr, targets[order]
+
+
+def _neighbors(indptr, indices, nodes):
+    """Every ``(node, neighbor)`` edge out of ``nodes``."""
+    starts = indptr[nodes]
+    lengths = indptr[nodes + 1] - starts
+    offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    return np.repeat(nodes, lengths), indices[np.repeat(starts, lengths) + offsets]
+
+
+def betweenness_centrality(n_nodes, a, b, samples=None, seed=0):
+    """Normalized betweenness centrality of the unweighted graph with edges ``a - b``.
+
+    Brandes' algorithm with level-synchronous breadth-first searches, so each
+    level is a few array operations. With ``samples`` fewer than the nodes,
+    only that many random source nodes are searched and the result is
+    extrapolated (Brandes & Pich).
+    """
+    centrality = np.zeros(n_nodes)
+    if n_nodes < 3 or not len(a):
+        return centrality
+    indptr, indices = adjacency(n_nodes, a, b)
+    sources = np.arange(n_nodes)
+    if samples is not None and samples < n_nodes:
+        sources = np.random.default_rng(seed).choice(n_nodes, samples, replace=False)
+
+    for source in sources:
+        distance = np.full(n_nodes, -1)
+        distance[source] = 0
+        paths = np.zeros(n_nodes)
+        paths[source] = 1
+        levels = []
+        frontier = np.array([source])
+        depth = 0
+        while len(frontier):
+            parents, children = _neighbors(indptr, indices, frontier)
+            reached = np.zeros(n_nodes, dtype=bool)
+            reached[children[distance[children] == -1]] = True
+            reached = np.flatnonzero(reached)
+            distance[reached] = depth + 1
+            on_path = distance[children] == depth + 1
+            parents, children = parents[on_path], children[on_path]
+            paths += np.bincount(children, weights=paths[parents], minlength=n_nodes)
+            levels.append((parents, children))
+            frontier = reached
+            depth += 1
+
+        dependency = np.zeros(n_nodes)
+        for parents, children in reversed(levels):
+            dependency += np.bincount(parents, weights=paths[parents] / paths[children] * (1 + dependency[children]),
+                                      minlength=n_nodes)
+        dependency[source] = 0
+        centrality += dependency
+
+    # Each path was counted from both ends
+    return centrality * (n_nodes / len(sources)) / ((n_nodes - 1) * (n_nodes - 2))
+
+
+def force_layout(n_nodes, a, b, weights=None, iterations=150, seed=0):
+    """Fruchterman-Reingold positions of the graph with edges ``a - b``, scaled into [-1, 1]."""
+    rng = np.random.default_rng(seed)
+    position = rng.uniform(-1, 1, (n_nodes, 2))
+    if n_nodes < 2:
+        return position * 0
+    weights = np.ones(len(a)) if weights is None else weights / weights.max()
+    spacing = np.sqrt(4.0 / n_nodes)
+    temperature = 0.1
+    for step in range(iterations):
+        delta = position[:, None, :] - position[None, :, :]
+        distance = np.maximum(np.linalg.norm(delta, axis=2), 0.01)
+        displacement = (delta * (spacing ** 2 / distance ** 2)[:, :, None]).sum(axis=1)
+        edge_delta = position[a] - position[b]
+        edge_length = np.maximum(np.linalg.norm(edge_delta, axis=1), 0.01)
+        pull = edge_delta * (edge_length * weights / spacing)[:, None]
+        np.subtract.at(displacement, a, pull)
+        np.add.at(displacement, b, pull)
+        length = np.maximum(np.linalg.norm(displacement, axis=1), 0.01)
+        position += displacement / length[:, None] * np.minimum(length, temperature * (1 - step / iterations))[:, None]
+    position -= position.mean(axis=0)
+    return position / max(np.abs(position).max(), 1e-9)
+
+
+def _categorical_codes(frame, column):
+    """``(codes, categories)`` of a categorical column; missing values get code -1."""
+    values = frame[column].astype("category")
+    return values.cat.codes.to_numpy(np.int64), np.asarray(values.cat.categories, dtype=str)
+
+
+def build_graph(frame, output_path, max_organizations=50, betweenness_samples=256, layout_nodes=50):
+    """Compute the collaboration graph of an entity-record frame and write it; return the pair count."""
+    papers, _ = _categorical_codes(frame, "paper_id")
+    organizations, organization_names = _categorical_codes(frame, "organization")
+    countries, country_names = _categorical_codes(frame, "country")
+    years = frame["year"].to_numpy(dtype=np.float64, na_value=np.nan)
+    n_papers = int(papers.max()) + 1 if len(papers) else 0
+    n_organizations, n_countries = len(organization_names), max(len(country_names), 1)
+
+    affiliated = organizations >= 0
+    a, b, pair_papers, sizes = incidence_pairs(papers[affiliated], organizations[affiliated], n_organizations,
+                                               max_organizations)
+    order = np.lexsort((b, a, -pair_papers))  # most frequent first, so top-k is a slice
+    a, b, pair_papers = a[order], b[order], pair_papers[order]
+
+    # Every paper counted once per organization / country
+    organization_papers = np.bincount(np.unique(papers[affiliated] * n_organizations + organizations[affiliated])
+                                      % n_organizations, minlength=n_organizations)
+    located = affiliated & (countries >= 0)
+    ranked = pd.DataFrame({"organization": organizations[located], "country": countries[located]}).value_counts()
+    home = ranked.reset_index().drop_duplicates("organization")  # most frequent country first
+    organization_country = np.full(n_organizations, -1)
+    organization_country[home["organization"].to_numpy()] = home["country"].to_numpy()
+
+    located_papers = countries >= 0
+    country_a, country_b, country_pair_papers, country_sizes = incidence_pairs(
+        papers[located_papers], countries[located_papers], n_countries)
+    order = np.lexsort((country_b, country_a, -country_pair_papers))
+
+    # Collaborative papers per year (a paper's records share its year)
+    paper_year = np.full(n_papers, np.nan)
+    paper_year[papers] = years
+    paper_organizations = np.bincount(np.unique(papers[affiliated] * n_organizations + organizations[affiliated])
+                                      // n_organizations, minlength=n_papers)
+    paper_countries = np.bincount(np.unique(papers[located_papers] * n_countries + countries[located_papers])
+                                  // n_countries, minlength=n_papers)
+    known = ~np.isnan(paper_year)
+    year_values = np.unique(paper_year[known]).astype(int)
+    year_index = np.searchsorted(year_values, paper_year[known])
+    year_papers = np.bincount(year_index, minlength=len(year_values))
+    year_collaborative = np.bincount(year_index, weights=paper_organizations[known] >= 2, minlength=len(year_values))
+
+    betweenness = betweenness_centrality(n_organizations, a, b, samples=betweenness_samples)
+    layout_a, layout_b, layout_weights, nodes = _top_subgraph(n_organizations, a, b, pair_papers, layout_nodes)
+    layout = force_layout(len(nodes), layout_a, layout_b, layout_weights)
+
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    tmp_path = output_path + ".tmp.npz"
+    np.savez_compressed(
+        tmp_path,
+        organizations=organization_names, organization_country=organization_country,
+        organization_papers=organization_papers, countries=country_names,
+        pair_a=a.astype(np.int32), pair_b=b.astype(np.int32), pair_papers=pair_papers.astype(np.int32),
+        country_pair_a=country_a[order].astype(np.int32), country_pair_b=country_b[order].astype(np.int32),
+        country_pair_papers=country_pair_papers[order].astype(np.int32),
+        organizations_per_paper=np.bincount(paper_organizations[paper_organizations > 0]),
+        international_papers=np.array([(paper_countries >= 2).sum(), (paper_organizations >= 2).sum()]),
+        years=year_values, year_papers=year_papers, year_collaborative=year_collaborative.astype(np.int64),
+        betweenness=betweenness, betweenness_samples=np.array([min(betweenness_samples or n_organizations,
+                                                                   n_organizations)]),
+        layout_nodes=nodes.astype(np.int32), layout=layout.astype(np.float32),
+    )
+    os.replace(tmp_path, output_path)
+    return len(a)
+
+
+def _top_subgraph(n_nodes, a, b, weights, count):
+    """The subgraph of the ``count`` nodes with the largest weighted degree, renumbered from 0."""
+    strength = np.bincount(a, weights=weights, minlength=n_nodes) + np.bincount(b, weights=weights, minlength=n_nodes)
+    nodes = np.argsort(-strength, kind="stable")[:min(count, n_nodes)]
+    nodes = nodes[strength[nodes] > 0]
+    local = np.full(n_nodes, -1)
+    local[nodes] = np.arange(len(nodes))
+    inside = (local[a] >= 0) & (local[b] >= 0)
+    return local[a[inside]], local[b[inside]], weights[inside].astype(np.float64), nodes
+
+
+class CollaborationGraph:
+    """Read-only collaboration graph file with the queries behind the Collaboration Networks tabs."""
+
+    def __init__(self, path):
+        self.path = path
+        with np.load(path, allow_pickle=False) as arrays:
+            for name in arrays.files:
+                setattr(self, name, arrays[name])
+        n = len(self.organizations)
+        a, b, weights = self.pair_a, self.pair_b, self.pair_papers
+        self.degree = np.bincount(a, minlength=n) + np.bincount(b, minlength=n)
+        self.strength = np.bincount(a, weights=weights, minlength=n) + np.bincount(b, weights=weights, minlength=n)
+        self._layouts = {len(self.layout_nodes): (self.layout_nodes, self.layout)}
+        self._partner_countries = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.pair_a)
+
+    def _country(self, organizations):
+        codes = self.organization_country[organizations]
+        return np.where(codes >= 0, self.countries[np.maximum(codes, 0)] if len(self.countries) else "", "")
+
+    def top_pairs(self, k):
+        """The ``k`` most frequent organization pairs."""
+        a, b = self.pair_a[:k], self.pair_b[:k]
+        return pd.DataFrame({"organization_a": self.organizations[a], "organization_b": self.organizations[b],
+                             "country_a": self._country(a), "country_b": self._country(b),
+                             "papers": self.pair_papers[:k]})
+
+    def country_pairs(self, k):
+        """The ``k`` most frequent pairs of countries on the same paper."""
+        return pd.DataFrame({"country_a": self.countries[self.country_pair_a[:k]],
+                             "country_b": self.countries[self.country_pair_b[:k]],
+                             "papers": self.country_pair_papers[:k]})
+
+    def international_share(self):
+        """Share of the multi-organization papers that span more than one country."""
+        international, collaborative = self.international_papers
+        return international / collaborative if collaborative else 0.0
+
+    def partner_countries(self):
+        """Number of distinct foreign countries among each organization's partners."""
+        if self._partner_countries is not None:
+            return self._partner_countries
+        n, n_countries = len(self.organizations), max(len(self.countries), 1)
+        partners = np.concatenate([self.pair_a, self.pair_b])
+        partner_country = self.organization_country[np.concatenate([self.pair_b, self.pair_a])]
+        foreign = (partner_country >= 0) & (partner_country != self.organization_country[partners])
+        distinct = np.unique(partners[foreign].astype(np.int64) * n_countries + partner_country[foreign])
+        self._partner_countries = np.bincount(distinct // n_countries, minlength=n)
+        return self._partner_countries
+
+    def organizations_table(self, k, by="collaborations"):
+        """The top ``k`` organizations by one of the table's columns, with their centrality metrics."""
+        columns = {
+            "papers": self.organization_papers,
+            "partners": self.degree,
+            "collaborations": self.strength,
+            "betweenness": self.betweenness,
+        }
+        if by == "partner_countries":
+            columns["partner_countries"] = self.partner_countries()
+        values = columns[by]
+        k = min(k, len(values))
+        top = np.argpartition(-values, k - 1)[:k] if k else np.zeros(0, dtype=int)
+        top = top[np.lexsort((top, -values[top]))]
+        table = pd.DataFrame({"organization": self.organizations[top], "country": self._country(top)})
+        for name, column in columns.items():
+            table[name] = column[top]
+        table["collaborations"] = table["collaborations"].astype(int)
+        return table
+
+    def trends(self):
+        """Papers and multi-organization papers per year."""
+        return pd.DataFrame({"year": self.years, "papers": self.year_papers,
+                             "collaborative_papers": self.year_collaborative})
+
+    def organizations_per_paper_counts(self):
+        """Number of papers by their number of organizations."""
+        counts = self.organizations_per_paper
+        return pd.DataFrame({"organizations": np.arange(len(counts)), "papers": counts})[counts > 0]
+
+    def network(self, count):
+        """Nodes (with layout positions) and edges of the ``count`` most connected organizations.
+
+        The build stores the layout for the configured node count; other
+        counts are laid out on first use and kept.
+        """
+        with self._lock:
+            layout = self._layouts.get(count)
+        local_a, local_b, weights, nodes = _top_subgraph(len(self.organizations), self.pair_a, self.pair_b,
+                                                         self.pair_papers, count)
+        if layout is None or not np.array_equal(layout[0], nodes):
+            layout = (nodes, force_layout(len(nodes), local_a, local_b, weights))
+            with self._lock:
+                self._layouts[count] = layout
+        positions = layout[1]
+        node_table = pd.DataFrame({"organization": self.organizations[nodes], "country": self._country(nodes),
+                                   "papers": self.organization_papers[nodes], "partners": self.degree[nodes],
+                                   "x": positions[:, 0], "y": positions[:, 1]})
+        edge_table = pd.DataFrame({"a": local_a, "b": local_b, "papers": weights.astype(int)})
+        return node_table, edge_table
+
+    def stats(self):
+        return {"organizations": len(self.organizations), "pairs": len(self),
+                "betweenness_samples": int(self.betweenness_samples[0])}
+
+
+def main(argv=None):
+    from dashboard.config import (
+        BETWEENNESS_SAMPLES, COLLABORATION_GRAPH_PATH, COLLABORATION_NETWORK_NODES, ENTITY_STORE_PATH,
+        MAX_ORGANIZATIONS_PER_PAPER
+    )
+    from dashboard.entity_store import EntityStore
+
+    parser = argparse.ArgumentParser(description="Build or query the organization collaboration graph.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build_parser = subparsers.add_parser("build", help="compute the graph from the entity store")
+    build_parser.add_argument("--store", default=ENTITY_STORE_PATH)
+    build_parser.add_argument("--output", default=COLLABORATION_GRAPH_PATH)
+    pairs_parser = subparsers.add_parser("pairs", help="print the most frequent organization pairs")
+    pairs_parser.add_argument("--top", type=int, default=20)
+    pairs_parser.add_argument("--graph", default=COLLABORATION_GRAPH_PATH)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    if args.command == "build":
+        pairs = build_graph(EntityStore(args.store).frame, args.output, max_organizations=MAX_ORGANIZATIONS_PER_PAPER,
+                            betweenness_samples=BETWEENNESS_SAMPLES, layout_nodes=COLLABORATION_NETWORK_NODES)
+        print(f"Stored {pairs:,} organization pairs in {args.output} ({os.path.getsize(args.output) / 1024:.0f} KB, "
+              f"{time.perf_counter() - start:.1f}s)")
+        return 0
+
+    result = CollaborationGraph(args.graph).top_pairs(args.top)
+    print(result.to_string(index=False))
+    print(f"({time.perf_counter() - start:.2f}s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
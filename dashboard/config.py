@@ -0,0 +1,458 @@
+"""Dashboard configuration - shared by the Streamlit app and the offline build tools."""
+
+import os
+
+# =============================================================================
+# CONFIGURATION SECTION - EASY TO MODIFY
+# =============================================================================
+
+# Base paths - Update these according to your directory structure
+BASE_PATHS = {
+    "country": "EDA_fig/Country",
+    "organization": "EDA_fig/organisation",
+    "paper": "EDA_fig/paper",
+    "cloud_platform": "EDA_fig/CLoud_platform",
+    "hardware": "EDA_fig/hardware",
+    "affiliation": "EDA_fig/Affiliation_Overview",
+    "software": "EDA_fig/software",
+    "topic": "EDA_fig/topic_modelling"
+}
+
+# Define your visualizations here - Add new ones by simply adding to this dictionary
+VISUALIZATIONS = {
+    # Country visualizations
+    "GPU Usage Country wise (Hierarchical)": {
+        "file_path": os.path.join(BASE_PATHS["country"], "country_gpu_usage_plotly_viz_5.html"),
+        "description": "Hierarchical visualization of GPU usage by country",
+        "icon": "🌍",
+        "category": "country"
+    },
+    
+    # Organization visualizations
+    "GPU Usage Organisation wise (Hierarchical)": {
+        "file_path": os.path.join(BASE_PATHS["organization"], "org_gpu_usage_plotly_viz_5.html"),
+        "description": "GPU Usage organisation wise (Hierarchical)",
+        "icon": "🏢",
+        "category": "organization"
+    },
+    
+    # Paper visualizations
+    "GPU vs CPU Paper Count": {
+        "file_path": os.path.join(BASE_PATHS["paper"], "total_paper_gpu_cpu_paper.html"),
+        "description": "GPU vs CPU paper count visualization",
+        "icon": "📊",
+        "category": "paper"
+    },
+    "Overall entities distribution": {
+        "file_path": os.path.join(BASE_PATHS["paper"], "overall_entity_distribution.html"),
+        "description": "Overall entities distribution",
+        "icon": "📊",
+        "category": "paper"
+    },
+    
+    # Cloud Platform visualizations
+    "Top Cloud Platform Usage past 10 years": {
+        "file_path": os.path.join(BASE_PATHS["cloud_platform"], "cloud_platform_total_usage_sunburst.html"),
+        "description": "Cloud platform usage over time",
+        "icon": "☁️",
+        "category": "cloud_platform"
+    },
+    "Top Organizations by Cloud Platform Usage": {
+        "file_path": os.path.join(BASE_PATHS["cloud_platform"], "Cloud_Platform_usage_organisation_plotly_viz_1.html"),
+        "description": "Leading organizations in cloud platform adoption",
+        "icon": "🏢",
+        "category": "cloud_platform"
+    },
+    "Top Countries by Cloud Platform Usage": {
+        "file_path": os.path.join(BASE_PATHS["cloud_platform"], "Cloud_Platform_country_usage_plotly_viz_3.html"),
+        "description": "Geographic distribution of cloud platform usage",
+        "icon": "🌍",
+        "category": "cloud_platform"
+    },
+    "AWS Services Usage Trends": {
+        "file_path": os.path.join(BASE_PATHS["cloud_platform"], "aws_base_entities_interactive_dashboard.html"),
+        "description": "Detailed analysis of AWS services adoption over time",
+        "icon": "🔶",
+        "category": "cloud_platform"
+    },
+    "Google Cloud Services Usage Trends": {
+        "file_path": os.path.join(BASE_PATHS["cloud_platform"], "google_clould_base_entities_interactive_dashboard.html"),
+        "description": "Comprehensive view of Google Cloud services utilization",
+        "icon": "🔵",
+        "category": "cloud_platform"
+    },
+    
+    # Hardware visualizations
+    "Device Memory Configuration Usage": {
+        "file_path": os.path.join(BASE_PATHS["hardware"], "device_memory_analysis.html"),
+        "description": "Analysis of device memory configurations across research papers",
+        "icon": "💾",
+        "category": "hardware"
+    },
+    "GPU Brand Distribution": {
+        "file_path": os.path.join(BASE_PATHS["hardware"], "gpu_brand_distribution.html"),
+        "description": "Market share analysis of GPU brands in research",
+        "icon": "🎮",
+        "category": "hardware"
+    },
+    "Hardware Device Categories": {
+        "file_path": os.path.join(BASE_PATHS["hardware"], "gpu_category_distribution.html"),
+        "description": "Distribution of hardware devices by category",
+        "icon": "📱",
+        "category": "hardware"
+    },
+    "GPU Generation Evolution": {
+        "file_path": os.path.join(BASE_PATHS["hardware"], "gpu_evolution_over_time.html"),
+        "description": "Timeline of GPU generation adoption in research",
+        "icon": "📈",
+        "category": "hardware"
+    },
+    "Hardware-Memory Co-occurrence": {
+        "file_path": os.path.join(BASE_PATHS["hardware"], "hardware_memory_bubble_chart.html"),
+        "description": "Correlation analysis between hardware types and memory configurations",
+        "icon": "🔗",
+        "category": "hardware"
+    },
+    "Nvidia GPU Generations": {
+        "file_path": os.path.join(BASE_PATHS["hardware"], "nvidia_gpu_generations.html"),
+        "description": "Detailed breakdown of Nvidia GPU usage by generation",
+        "icon": "🟢",
+        "category": "hardware"
+    },
+    "Top Hardware-Count Combinations": {
+        "file_path": os.path.join(BASE_PATHS["hardware"], "top_hardware_count_combinations.html"),
+        "description": "Most common hardware and device count configurations",
+        "icon": "🔢",
+        "category": "hardware"
+    },
+    "Most Used Hardware Devices": {
+        "file_path": os.path.join(BASE_PATHS["hardware"], "top_hardware_devices.html"),
+        "description": "Ranking of the 30 most frequently used hardware devices",
+        "icon": "🏆",
+        "category": "hardware"
+    },
+    "Hardware-Memory-Count Configurations": {
+        "file_path": os.path.join(BASE_PATHS["hardware"], "top_hardware_memory_count_triplets.html"),
+        "description": "Analysis of common hardware, memory, and count combinations",
+        "icon": "⚙️",
+        "category": "hardware"
+    },
+    
+    # Affiliation visualizations
+    "Collaboration Network": {
+        "file_path": os.path.join(BASE_PATHS["affiliation"], "collaboration_network.html"),
+        "description": "Interactive network visualization of top 50 research collaborations",
+        "icon": "🤝",
+        "category": "affiliation"
+    },
+    "Top Collaboration Pairs": {
+        "file_path": os.path.join(BASE_PATHS["affiliation"], "collaboration_pairs_top20.html"),
+        "description": "Most frequent organization collaboration pairs",
+        "icon": "👥",
+        "category": "affiliation"
+    },
+    "International Collaborations": {
+        "file_path": os.path.join(BASE_PATHS["affiliation"], "international_collaborations.html"),
+        "description": "Cross-border research collaboration patterns",
+        "icon": "🌐",
+        "category": "affiliation"
+    },
+    "Organization Activity": {
+        "file_path": os.path.join(BASE_PATHS["affiliation"], "organization_collaboration_activity.html"),
+        "description": "Research activity levels of top 25 organizations",
+        "icon": "📊",
+        "category": "affiliation"
+    },
+    "Collaboration Intensity": {
+        "file_path": os.path.join(BASE_PATHS["affiliation"], "collaboration_diversity_analysis.html"),
+        "description": "Analysis of collaboration intensity and diversity metrics",
+        "icon": "📈",
+        "category": "affiliation"
+    },
+    
+    # Software visualizations
+    "Entity Associations": {
+        "file_path": os.path.join(BASE_PATHS["software"], "entity_associations.html"),
+        "description": "Network of top 20 software entity associations",
+        "icon": "🔗",
+        "category": "software"
+    },
+    "Hardware-Software Heatmap": {
+        "file_path": os.path.join(BASE_PATHS["software"], "hw_sw_heatmap.html"),
+        "description": "Co-occurrence analysis of hardware and software combinations",
+        "icon": "🗺️",
+        "category": "software"
+    },
+    "Memory Distribution by Software": {
+        "file_path": os.path.join(BASE_PATHS["software"], "memory_distribution_by_software.html"),
+        "description": "Memory size patterns across different software frameworks",
+        "icon": "💿",
+        "category": "software"
+    },
+    "Software by Device Count": {
+        "file_path": os.path.join(BASE_PATHS["software"], "software_by_device_count.html"),
+        "description": "Software framework usage patterns by device count categories",
+        "icon": "📱",
+        "category": "software"
+    },
+    "Hardware-Software Co-evolution": {
+        "file_path": os.path.join(BASE_PATHS["software"], "temporal_coevolution.html"),
+        "description": "Temporal analysis of hardware-software co-occurrence patterns",
+        "icon": "🔄",
+        "category": "software"
+    },
+    "Software Evolution Timeline": {
+        "file_path": os.path.join(BASE_PATHS["software"], "temporal_evolution.html"),
+        "description": "Historical trends in software framework adoption",
+        "icon": "📅",
+        "category": "software"
+    },
+    
+    # Topic Modeling visualizations
+    "GPU Usage by Research Topic": {
+        "file_path": os.path.join(BASE_PATHS["topic"], "3_heatmap_gpu_intensity.html"),
+        "description": "Heatmap showing GPU usage intensity across different research topics",
+        "icon": "🔥",
+        "category": "topic"
+    },
+    "Device Count by Topic": {
+        "file_path": os.path.join(BASE_PATHS["topic"], "device_counts_by_topic.html"),
+        "description": "Average device utilization across research domains",
+        "icon": "📊",
+        "category": "topic"
+    },
+    "GPU Temporal Trends by Topic": {
+        "file_path": os.path.join(BASE_PATHS["topic"], "gpu_temporal_trends_clean.html"),
+        "description": "Evolution of GPU usage patterns across research topics over time",
+        "icon": "📈",
+        "category": "topic"
+    },
+    "GPU Usage Rate by Topic": {
+        "file_path": os.path.join(BASE_PATHS["topic"], "gpu_usage_by_topic_clean.html"),
+        "description": "Comparative analysis of GPU adoption rates by research area",
+        "icon": "💹",
+        "category": "topic"
+    }
+}
+
+# Height presets
+HEIGHT_PRESETS = {
+    "Compact": 600,
+    "Small": 800,
+    "Standard": 1000,
+    "Large": 1200,
+    "Extra Large": 1400,
+    "Full": 1600,
+    "Max": 1800
+}
+
+# Every height offered by the per-figure size control (presets and custom sizes)
+HEIGHT_OPTIONS = list(range(400, 2001, 50))
+
+# Figures found under BASE_PATHS but missing from VISUALIZATIONS are added
+# automatically (titles come from an optional <name>.meta.json sidecar)
+AUTO_DISCOVER_FIGURES = True
+
+# Seconds between background rescans of the figure directories (0 disables)
+MANIFEST_WATCH_INTERVAL = 5
+
+# Lazy navigation - only the selected category and visualization tab are read
+# and sent to the browser; set to False to render every tab on each rerun
+LAZY_NAVIGATION = True
+
+# Memory budget for the process-wide figure cache (shared by all sessions)
+FIGURE_CACHE_MAX_MB = int(os.environ.get("FIGURE_CACHE_MAX_MB", "256"))
+
+# Host-wide figure payload cache: prepared HTML payloads are written once to
+# SHARED_CACHE_DIR and memory-mapped by every server process on the host, so
+# replicas share one copy in the page cache (point it at /dev/shm to keep it
+# in memory). Set SHARED_FIGURE_CACHE to False to cache per process instead.
+SHARED_FIGURE_CACHE = True
+SHARED_CACHE_DIR = os.environ.get("SHARED_CACHE_DIR", os.path.join("build", "shared_cache"))
+
+# Background prefetch: while a figure tab is open, the next PREFETCH_AHEAD tabs
+# of its category are loaded into the caches on PREFETCH_WORKERS threads, so
+# paging through a category is served warm (0 disables prefetching).
+PREFETCH_AHEAD = int(os.environ.get("PREFETCH_AHEAD", "2"))
+PREFETCH_WORKERS = 2
+PREFETCH_MAX_PENDING = 8
+
+# Shared Plotly.js runtime - served once from ./static/ (see .streamlit/config.toml)
+# and cached by the browser instead of being shipped inside every figure
+PLOTLY_JS_VERSION = "2.9.0"
+PLOTLY_JS_PATH = os.path.join("static", f"plotly-{PLOTLY_JS_VERSION}.min.js")
+PLOTLY_JS_URL = os.environ.get("PLOTLY_JS_URL", f"app/static/plotly-{PLOTLY_JS_VERSION}.min.js")
+
+# Category display configuration
+CATEGORY_CONFIG = {
+    "country": {"name": "Geographic Analysis", "icon": "🌍", "color": "#3498db"},
+    "organization": {"name": "Organizational Insights", "icon": "🏢", "color": "#e74c3c"},
+    "paper": {"name": "Publication Metrics", "icon": "📄", "color": "#f39c12"},
+    "cloud_platform": {"name": "Cloud Platform Analytics", "icon": "☁️", "color": "#9b59b6"},
+    "hardware": {"name": "Hardware Analysis", "icon": "🖥️", "color": "#1abc9c"},
+    "affiliation": {"name": "Collaboration Networks", "icon": "🤝", "color": "#34495e"},
+    "software": {"name": "Software Ecosystem", "icon": "💻", "color": "#16a085"},
+    "topic": {
+        "name": "Research Topics",
+        "icon": "🔬",
+        "color": "#d35400",
+        "description": (
+            "For the research topic analysis, we applied Latent Dirichlet Allocation (LDA) "
+            "to a corpus of 85,000 publications. We used the titles and abstracts of the papers "
+            "as input for topic modeling. Prior to applying LDA, we used the Gensim library "
+            "and coherence scores to determine the optimal number of topics."
+        )
+    }
+}
+
+# Compiled figure store (build with: python -m dashboard.figure_store).
+# When present, figures are rendered natively with st.plotly_chart instead of
+# being embedded as HTML; figures missing from the store still use HTML.
+FIGURE_STORE_PATH = os.environ.get("FIGURE_STORE_PATH", os.path.join("build", "figures.store"))
+NATIVE_RENDERING = True
+
+# Static figure delivery - figures are embedded by iframe src from content-hashed,
+# precompressed assets (build with: python -m dashboard.static_assets build).
+# Serve STATIC_ASSET_DIR with the bundled asset server (or any static server) and
+# point STATIC_ASSET_BASE_URL at it; the default uses Streamlit's /app/static/.
+STATIC_FIGURE_DELIVERY = os.environ.get("STATIC_FIGURE_DELIVERY", "0") == "1"
+STATIC_ASSET_DIR = "static"
+STATIC_ASSET_MAP_PATH = os.path.join(STATIC_ASSET_DIR, "figures", "assets.json")
+STATIC_ASSET_BASE_URL = os.environ.get("STATIC_ASSET_BASE_URL", "/app/static/")
+
+# Level-of-detail pass for natively rendered figures (see dashboard/figure_optimize.py).
+# Line series above LOD_POINT_BUDGET points are decimated (marker-only traces keep
+# every point; raw-sample histograms are pre-binned) and scatter traces above
+# WEBGL_POINT_THRESHOLD points use WebGL.
+# Optimized figures get a "Full resolution" toggle that renders the original.
+FIGURE_OPTIMIZATION = True
+LOD_POINT_BUDGET = int(os.environ.get("LOD_POINT_BUDGET", "2000"))
+WEBGL_POINT_THRESHOLD = int(os.environ.get("WEBGL_POINT_THRESHOLD", "1000"))
+
+# Figure minification (see dashboard/figure_minify.py) - floats in the figure
+# store, the HTML payloads and the static assets are rounded to
+# FIGURE_FLOAT_DIGITS significant digits and attributes equal to their
+# plotly.js default are dropped. Report the savings with:
+# python -m dashboard.figure_minify
+FIGURE_MINIFICATION = True
+FIGURE_FLOAT_DIGITS = int(os.environ.get("FIGURE_FLOAT_DIGITS", "6"))
+
+# Binary typed arrays (see dashboard/typed_arrays.py) - numeric trace arrays and
+# heatmap z matrices of BINARY_ARRAY_MIN_LENGTH or more values are sent to the
+# browser as base64 binary instead of JSON number literals.
+BINARY_ARRAYS = True
+BINARY_ARRAY_MIN_LENGTH = int(os.environ.get("BINARY_ARRAY_MIN_LENGTH", "128"))
+
+# Render metrics - shown in the sidebar operator panel and served in Prometheus
+# text format on http://METRICS_HOST:METRICS_PORT/metrics. The endpoint is off unless
+# METRICS_PORT is set; it has no authentication, so it listens on the loopback
+# interface only unless METRICS_HOST says otherwise. Each app process behind a load
+# balancer needs its own METRICS_PORT.
+METRICS_HOST = os.environ.get("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.environ.get("METRICS_PORT", "0"))
+
+# Click-to-load previews (build with: python -m dashboard.figure_preview).
+# Each tab first shows a preview card - trace names, axis titles, point counts
+# and totals - and loads the interactive figure only when the user asks for it.
+PREVIEW_PATH = os.environ.get("PREVIEW_PATH", os.path.join("build", "previews.json"))
+CLICK_TO_LOAD = True
+
+# Figure builders for `python -m dashboard.build` - output file -> builder and
+# the dataset files it reads. A builder is a "package.module:function" called as
+# function(inputs, output_path, **options) that writes the figure's HTML export;
+# a figure is rebuilt only when its inputs or its builder's source change, e.g.
+#   os.path.join(BASE_PATHS["hardware"], "gpu_brand_distribution.html"): {
+#       "builder": "figures.hardware:gpu_brand_distribution",
+#       "inputs": ["data/publication_entities.parquet"],
+#   },
+# None are registered here: the notebooks and datasets behind the EDA_fig exports
+# are not part of this repository, so the build treats those exports as inputs
+# only. The figures it does generate are the AGGREGATE_FIGURES (below), which
+# `python -m dashboard.build` registers itself once their tables exist.
+FIGURE_BUILDERS = {}
+
+# Columnar entity store (build with: python -m dashboard.entity_store build <records>).
+# When present, the categories below get a "Live filters" panel whose charts are
+# recomputed from the per-paper entity records for the selected filters.
+ENTITY_STORE_PATH = os.environ.get("ENTITY_STORE_PATH", os.path.join("build", "entities.parquet"))
+AGGREGATE_CACHE_ENTRIES = 256
+LIVE_FILTER_DIMENSIONS = ["country", "organization", "topic"]
+LIVE_FILTER_CHARTS = {
+    "hardware": [
+        {"title": "Most Used Hardware Devices", "group_by": ["hardware"], "top_n": 15},
+        {"title": "Hardware Usage Over Time", "group_by": ["hardware", "year"], "top_n": 6},
+        {"title": "Device Memory Configurations", "group_by": ["memory"], "top_n": 15},
+    ],
+    "cloud_platform": [
+        {"title": "Cloud Platform Usage", "group_by": ["cloud_platform"], "top_n": 10},
+        {"title": "Cloud Platform Usage Over Time", "group_by": ["cloud_platform", "year"], "top_n": 5},
+        {"title": "Top Cloud Services", "group_by": ["cloud_service"], "top_n": 15},
+    ],
+    "software": [
+        {"title": "Most Used Software", "group_by": ["software"], "top_n": 15},
+        {"title": "Software Usage Over Time", "group_by": ["software", "year"], "top_n": 6},
+        {"title": "Software by Device Count", "group_by": ["software"], "measure": "devices", "top_n": 15},
+    ],
+}
+
+# Incremental ingestion (see dashboard/aggregates.py) - new papers are appended with
+# python -m dashboard.aggregates ingest <records>. The per-dimension count tables in
+# AGGREGATE_DIR are updated by delta merge, and `python -m dashboard.build` re-emits
+# only the AGGREGATE_FIGURES whose table changed (options as in LIVE_FILTER_CHARTS).
+AGGREGATE_DIR = os.environ.get("AGGREGATE_DIR", os.path.join("build", "aggregates"))
+AGGREGATE_DIMENSIONS = ["year", "country", "organization", "hardware", "cloud_service"]
+AGGREGATE_FIGURES = {
+    os.path.join(BASE_PATHS["paper"], "papers_per_year.html"): {
+        "dimension": "year", "title": "Papers per Year", "icon": "📅",
+        "description": "Publications per year, updated as new papers are ingested",
+    },
+    os.path.join(BASE_PATHS["country"], "papers_by_country.html"): {
+        "dimension": "country", "title": "Top Countries by Papers", "top_n": 20, "icon": "🌍",
+    },
+    os.path.join(BASE_PATHS["organization"], "papers_by_organization.html"): {
+        "dimension": "organization", "title": "Top Organizations by Papers", "top_n": 20, "icon": "🏢",
+    },
+    os.path.join(BASE_PATHS["hardware"], "hardware_papers_over_time.html"): {
+        "dimension": "hardware", "title": "Hardware Usage Over Time", "top_n": 8, "over_time": True, "icon": "📈",
+    },
+    os.path.join(BASE_PATHS["hardware"], "hardware_device_counts.html"): {
+        "dimension": "hardware", "title": "Hardware by Device Count", "measure": "devices", "top_n": 20,
+        "icon": "🖥️",
+    },
+    os.path.join(BASE_PATHS["cloud_platform"], "cloud_services_by_papers.html"): {
+        "dimension": "cloud_service", "title": "Top Cloud Services by Papers", "top_n": 15, "icon": "☁️",
+    },
+}
+
+# Hierarchy cubes (build with: python -m dashboard.hierarchy_cube). Sunbursts in the
+# cube load only the levels that fit HIERARCHY_NODE_BUDGET nodes around the node
+# being viewed; deeper levels are read when the user drills in.
+HIERARCHY_CUBE_PATH = os.environ.get("HIERARCHY_CUBE_PATH", os.path.join("build", "hierarchy.store"))
+HIERARCHY_NODE_BUDGET = int(os.environ.get("HIERARCHY_NODE_BUDGET", "500"))
+
+# Collaboration graph (build with: python -m dashboard.collaboration_graph build, after
+# the entity store). When present, the Collaboration Networks tabs listed in
+# COLLABORATION_VIEWS are computed from it instead of showing the static exports.
+COLLABORATION_GRAPH_PATH = os.environ.get("COLLABORATION_GRAPH_PATH", os.path.join("build", "collaboration.npz"))
+MAX_ORGANIZATIONS_PER_PAPER = 50  # larger consortium papers are left out of the pair counts
+BETWEENNESS_SAMPLES = 256  # source nodes searched for betweenness centrality (None = exact)
+COLLABORATION_NETWORK_NODES = 50  # organizations in the network view (its layout is precomputed)
+COLLABORATION_VIEWS = {
+    os.path.join(BASE_PATHS["affiliation"], "collaboration_network.html"): "network",
+    os.path.join(BASE_PATHS["affiliation"], "collaboration_pairs_top20.html"): "pairs",
+    os.path.join(BASE_PATHS["affiliation"], "international_collaborations.html"): "international",
+    os.path.join(BASE_PATHS["affiliation"], "organization_collaboration_activity.html"): "activity",
+    os.path.join(BASE_PATHS["affiliation"], "collaboration_diversity_analysis.html"): "diversity",
+    os.path.join(BASE_PATHS["affiliation"], "network_centrality_metrics.html"): "centrality",
+    os.path.join(BASE_PATHS["affiliation"], "collaboration_trends_over_time.html"): "trends",
+    os.path.join(BASE_PATHS["affiliation"], "organization_distribution_per_paper.html"): "per_paper",
+}
+
+# Search index over titles, descriptions and figure contents (build with:
+# python -m dashboard.search_index). Without it, search covers titles and
+# descriptions only.
+SEARCH_INDEX_PATH = os.environ.get("SEARCH_INDEX_PATH", os.path.join("build", "search_index.json"))
+SEARCH_RESULTS = 8
+
+# Static-site export for read-only audiences (build with: python -m dashboard.static_site)
+STATIC_SITE_DIR = os.environ.get("STATIC_SITE_DIR", os.path.join("build", "site"))
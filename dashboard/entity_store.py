@@ -0,0 +1,292 @@
+"""Columnar store of per-paper entity records with a cached aggregation engine.
+
+The store is a Parquet file with one row per entity record of a paper: the
+paper's ``paper_id``, ``year``, ``country``, ``organization`` and ``topic``
+plus the ``hardware``, ``memory``, ``count``, ``software``,
+``cloud_platform`` and ``cloud_service`` it mentions (unused fields are
+empty). Text columns are dictionary-encoded and loaded as pandas
+categoricals, so filters and group-bys run on integer codes. Batches appended
+by ``python -m dashboard.aggregates ingest`` turn the file into a directory of
+Parquet parts (``part-00000.parquet``, ...), one per batch, which is read as
+one store.
+
+Build it from the record export of the extraction pipeline (CSV, JSON Lines
+or Parquet with the columns above; only ``paper_id`` and ``year`` are
+required):
+
+    python -m dashboard.entity_store build records.csv    # writes build/entities.parquet
+    python -m dashboard.entity_store query hardware --year 2018 2023 --top 10
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+DIMENSIONS = ["country", "organization", "topic", "hardware", "memory", "software", "cloud_platform",
+              "cloud_service"]
+COLUMNS = ["paper_id", "year"] + DIMENSIONS + ["count"]
+REQUIRED_COLUMNS = ("paper_id", "year")
+
+# Measures: papers counts each paper once per group, however many records it has
+MEASURES = ("papers", "records", "devices")
+
+
+def read_records(source_path):
+    """Read a record export (.csv, .jsonl/.json or .parquet) into a DataFrame."""
+    extension = os.path.splitext(source_path)[1].lower()
+    if extension == ".parquet":
+        return pd.read_parquet(source_path)
+    if extension in (".jsonl", ".json"):
+        return pd.read_json(source_path, lines=extension == ".jsonl")
+    return pd.read_csv(source_path)
+
+
+def normalize_records(frame):
+    """Return ``frame`` restricted to the store columns with their storage types."""
+    missing = [column for column in REQUIRED_COLUMNS if column not in frame.columns]
+    if missing:
+        raise ValueError(f"Entity records lack required columns: {', '.join(missing)}")
+    records = pd.DataFrame(index=frame.index)
+    records["paper_id"] = frame["paper_id"].astype(str).astype("category")
+    records["year"] = pd.to_numeric(frame["year"], errors="coerce").astype("Int16")
+    for column in DIMENSIONS:
+        values = frame[column] if column in frame.columns else pd.Series(pd.NA, index=frame.index)
+        records[column] = values.astype("string").str.strip().replace("", pd.NA).astype("category")
+    counts = frame["count"] if "count" in frame.columns else pd.Series(pd.NA, index=frame.index)
+    records["count"] = pd.to_numeric(counts, errors="coerce").astype("Float32")
+    # Sorted by year, so year-range filters touch contiguous row groups
+    return records.dropna(subset=["year"]).sort_values(["year", "paper_id"], kind="stable").reset_index(drop=True)
+
+
+def _write_records(records, path):
+    records.to_parquet(path + ".tmp", engine="pyarrow", compression="zstd", index=False, row_group_size=1 << 17)
+    if os.path.isdir(path):
+        shutil.rmtree(path)  # a rebuilt store replaces the appended parts
+    os.replace(path + ".tmp", path)
+
+
+def build_entity_store(source_path, output_path):
+    """Convert a record export into the Parquet entity store; return the number of records."""
+    records = normalize_records(read_records(source_path))
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    _write_records(records, output_path)
+    return len(records)
+
+
+def store_parts(path):
+    """The Parquet files of a store: the file itself, or the parts of a store directory in order."""
+    if not os.path.isdir(path):
+        return [path]
+    return [os.path.join(path, name) for name in sorted(os.listdir(path)) if name.endswith(".parquet")]
+
+
+def read_store(path, columns=None):
+    """Read the records of a store file or directory (only ``columns`` when given)."""
+    return pd.read_parquet(store_parts(path), engine="pyarrow", columns=columns)
+
+
+def store_version(path):
+    """``[[size, mtime_ns], ...]`` of the store's parts, or [] when there is no store.
+
+    Parts are never rewritten and moving a store file into a directory keeps
+    its size and mtime, so the version changes exactly when records are added
+    or the store is rebuilt.
+    """
+    if not os.path.exists(path):
+        return []
+    return [[stat.st_size, stat.st_mtime_ns] for stat in map(os.stat, store_parts(path))]
+
+
+def append_entity_records(records, path):
+    """Write normalized ``records`` as a new part of the store at ``path``; return the part's path.
+
+    Only the new part is written: a store file is first moved, unchanged,
+    into a directory of the same name as its first part.
+    """
+    if os.path.isfile(path):
+        os.replace(path, path + ".base")
+        os.makedirs(path)
+        os.replace(path + ".base", os.path.join(path, "part-00000.parquet"))
+    os.makedirs(path, exist_ok=True)
+    part_path = os.path.join(path, f"part-{len(store_parts(path)):05d}.parquet")
+    _write_records(records, part_path)
+    return part_path
+
+
+class EntityStore:
+    """The entity records of a store file or directory, loaded once as categorical columns."""
+
+    def __init__(self, path):
+        self.path = path
+        self._values = {}
+        self.frame = read_store(path)
+        for column in ["paper_id"] + DIMENSIONS:
+            if not isinstance(self.frame[column].dtype, pd.CategoricalDtype):
+                self.frame[column] = self.frame[column].astype("category")
+
+    def __len__(self):
+        return len(self.frame)
+
+    def values(self, column):
+        """Distinct values of a dimension, most frequent first."""
+        if column not in self._values:
+            counts = self.frame[column].value_counts(sort=True)
+            self._values[column] = counts[counts > 0].index.tolist()
+        return self._values[column]
+
+    def year_range(self):
+        years = self.frame["year"].dropna()
+        return (int(years.min()), int(years.max())) if len(years) else (0, 0)
+
+
+class AggregationEngine:
+    """Vectorized group-by aggregation over an EntityStore with an LRU result cache."""
+
+    def __init__(self, store, max_entries=256):
+        self.store = store
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._results = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _filter_key(filters):
+        key = []
+        for column, value in sorted((filters or {}).items()):
+            if value is None or (column != "year" and not value):
+                continue  # no restriction
+            key.append((column, tuple(value) if column == "year" else tuple(sorted(value))))
+        return tuple(key)
+
+    def _mask(self, filter_key):
+        frame = self.store.frame
+        mask = None
+        for column, value in filter_key:
+            if column == "year":
+                condition = frame["year"].between(value[0], value[1]).fillna(False).to_numpy(dtype=bool)
+            else:
+                condition = frame[column].isin(value).to_numpy()
+            mask = condition if mask is None else mask & condition
+        return mask
+
+    def aggregate(self, group_by, measure="papers", filters=None, top_n=None):
+        """Aggregate ``measure`` by the ``group_by`` dimensions under ``filters``.
+
+        ``filters`` maps dimensions to the accepted values and ``"year"`` to an
+        inclusive ``(first, last)`` range. Returns a DataFrame with the
+        group-by columns and a ``value`` column, largest first; ``top_n`` keeps
+        the leading groups of the first dimension (all of their rows).
+        Records with no value for a group-by dimension are left out.
+        """
+        if measure not in MEASURES:
+            raise ValueError(f"Unknown measure {measure!r}; expected one of {', '.join(MEASURES)}")
+        group_by = tuple(group_by)
+        key = (group_by, measure, self._filter_key(filters), top_n)
+        with self._lock:
+            if key in self._results:
+                self._results.move_to_end(key)
+                self.hits += 1
+                return self._results[key]
+            self.misses += 1
+
+        result = self._compute(group_by, measure, key[2], top_n)
+        with self._lock:
+            self._results[key] = result
+            while len(self._results) > self.max_entries:
+                self._results.popitem(last=False)
+        return result
+
+    def _compute(self, group_by, measure, filter_key, top_n):
+        # Copy only the columns this query reads
+        columns = list(dict.fromkeys(list(group_by) + ["paper_id"] + (["count"] if measure == "devices" else [])))
+        frame = self.store.frame[columns]
+        mask = self._mask(filter_key)
+        for column in group_by:
+            present = frame[column].notna().to_numpy()
+            mask = present if mask is None else mask & present
+        if mask is not None:
+            frame = frame[mask]
+        if not group_by:
+            return pd.DataFrame({"value": [self._measure(frame, measure)]})
+
+        leading = group_by[0]
+        if top_n is not None and leading != "year":
+            # Rank the leading groups first, then aggregate only their records
+            totals = self._group_values(frame, [leading], measure)
+            keep = totals.nlargest(top_n).index
+            if len(group_by) == 1:
+                return self._result(totals[totals.index.isin(keep)], group_by)
+            frame = frame[frame[leading].isin(keep).to_numpy()]
+        return self._result(self._group_values(frame, list(group_by), measure), group_by)
+
+    @staticmethod
+    def _group_values(frame, group_by, measure):
+        grouped = frame.groupby(group_by, observed=True, sort=False)
+        if measure == "papers":
+            return grouped["paper_id"].nunique()
+        if measure == "records":
+            return grouped.size()
+        return grouped["count"].sum()
+
+    @staticmethod
+    def _result(values, group_by):
+        result = values.rename("value").reset_index()
+        result = result[result["value"] > 0]
+        for column in group_by:
+            # Plain labels; categoricals would drag every unused category along
+            result[column] = result[column].astype(str) if column != "year" else result[column].astype(int)
+        return result.sort_values("value", ascending=False, kind="stable").reset_index(drop=True)
+
+    @staticmethod
+    def _measure(frame, measure):
+        if measure == "papers":
+            return frame["paper_id"].nunique()
+        if measure == "records":
+            return len(frame)
+        return float(frame["count"].sum())
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {"entries": len(self._results), "hits": self.hits, "misses": self.misses,
+                    "hit_rate": self.hits / lookups if lookups else 0.0}
+
+
+def main(argv=None):
+    from dashboard.config import ENTITY_STORE_PATH
+
+    parser = argparse.ArgumentParser(description="Build or query the columnar entity store.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build_parser = subparsers.add_parser("build", help="convert a record export into the store")
+    build_parser.add_argument("source", help="records as .csv, .jsonl or .parquet")
+    build_parser.add_argument("--output", default=ENTITY_STORE_PATH)
+    query_parser = subparsers.add_parser("query", help="aggregate the store from the command line")
+    query_parser.add_argument("group_by", nargs="*", help="dimensions to group by")
+    query_parser.add_argument("--measure", choices=MEASURES, default="papers")
+    query_parser.add_argument("--year", type=int, nargs=2, metavar=("FIRST", "LAST"))
+    query_parser.add_argument("--top", type=int)
+    query_parser.add_argument("--store", default=ENTITY_STORE_PATH)
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        records = build_entity_store(args.source, args.output)
+        print(f"Stored {records} entity records in {args.output} ({os.path.getsize(args.output) / 1024:.0f} KB)")
+        return 0
+
+    engine = AggregationEngine(EntityStore(args.store))
+    start = time.perf_counter()
+    result = engine.aggregate(args.group_by, args.measure, {"year": args.year}, args.top)
+    print(result.to_string(index=False))
+    print(f"({len(result)} rows in {(time.perf_counter() - start) * 1000:.1f} ms)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
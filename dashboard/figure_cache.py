@@ -0,0 +1,92 @@
+"""Process-wide, byte-budgeted LRU cache for prepared figure content."""
+
+import os
+import threading
+from collections import OrderedDict
+
+
+class FigureCache:
+    """LRU cache of prepared figure content keyed on file path.
+
+    Entries are invalidated when the source file's mtime or size changes, and the
+    least recently used entries are evicted once the total cached size goes
+    over ``max_bytes``. One instance is shared by every session and rerun.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # key -> (version, size, content)
+        self._lock = threading.Lock()
+
+    def get(self, path, loader, key=None, size=None, version=None):
+        """Return the cached content for ``path``, calling ``loader(path)`` on a miss.
+
+        ``key`` lets several derived entries share one source file (it defaults
+        to ``path``). ``size`` is the entry's cost in bytes for content that is
+        not a str or bytes. ``version`` is the file's ``(mtime_ns, size)`` when
+        the caller already knows it (e.g. from the manifest); otherwise the
+        file is stat'ed.
+        """
+        key = path if key is None else key
+        if version is None:
+            stat = os.stat(path)
+            version = (stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[2]
+            self.misses += 1
+
+        content = loader(path)
+        if size is None:
+            size = len(content.encode("utf-8")) if isinstance(content, str) else len(content)
+
+        with self._lock:
+            self._discard(key)
+            # Content larger than the whole budget is served but never cached
+            if size <= self.max_bytes:
+                self._entries[key] = (version, size, content)
+                self.current_bytes += size
+                while self.current_bytes > self.max_bytes:
+                    _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                    self.current_bytes -= evicted_size
+                    self.evictions += 1
+        return content
+
+    def contains(self, key, version):
+        """Whether ``key`` is cached at ``version``, without counting a lookup."""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and entry[0] == version
+
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.current_bytes -= entry[1]
+
+    def clear(self):
+        """Drop every entry; counters are kept."""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        """Return a snapshot of the cache counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
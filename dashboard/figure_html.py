@@ -0,0 +1,176 @@
+"""HTML processing for the exported Plotly figures: shared runtime and responsive wrapper."""
+
+import hashlib
+import os
+import re
+
+from dashboard.config import PLOTLY_JS_PATH, PLOTLY_JS_URL, PLOTLY_JS_VERSION
+
+# Start of the runtime written by Plotly's write_html, either inlined
+# (include_plotlyjs=True) or loaded from the CDN (include_plotlyjs="cdn").
+# The inlined bundle's end is located with str.find: a lazy ".*?</script>"
+# regex over the 3.5 MB bundle is ~50x slower.
+_INLINE_RUNTIME_START = re.compile(r'<script type="text/javascript">/\*\*\s*\* plotly\.js v(?P<version>[\d.]+)')
+# Newer plotly.py versions add charset, integrity and crossorigin attributes to the CDN tag.
+_CDN_RUNTIME = re.compile(
+    r'<script[^>]*\ssrc="https://cdn\.plot\.ly/plotly-(?P<version>[\d.]+)\.min\.js"[^>]*></script>'
+)
+# The shared local runtime tag (see shared_runtime_tag)
+_SHARED_RUNTIME = re.compile(r'<script type="text/javascript" src="[^"]*plotly-(?P<version>[\d.]+)\.min\.js"></script>')
+# Plotly names each figure's div with a random UUID, so otherwise identical exports differ
+_FIGURE_DIV_UUID = re.compile(r'"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}"')
+
+
+def find_plotly_runtime(html_content):
+    """Return ``(start, end, version)`` of the Plotly.js runtime script tag, or None."""
+    match = _INLINE_RUNTIME_START.search(html_content)
+    if match is not None:
+        end = html_content.find("</script>", match.end())
+        if end >= 0:
+            return match.start(), end + len("</script>"), match.group("version")
+    for pattern in (_CDN_RUNTIME, _SHARED_RUNTIME):
+        match = pattern.search(html_content)
+        if match is not None:
+            return match.start(), match.end(), match.group("version")
+    return None
+
+
+def shared_runtime_tag(runtime_url=PLOTLY_JS_URL):
+    """Script tag loading the shared Plotly.js bundle."""
+    return f'<script type="text/javascript" src="{runtime_url}"></script>'
+
+
+def use_shared_plotly_runtime(html_content, runtime_url=PLOTLY_JS_URL):
+    """Replace an inlined, CDN or shared Plotly.js runtime tag with one loading ``runtime_url``.
+
+    Only runtimes matching PLOTLY_JS_VERSION are swapped; figures exported
+    with another version keep their own runtime.
+    """
+    if not os.path.exists(PLOTLY_JS_PATH):
+        return html_content
+
+    runtime = find_plotly_runtime(html_content)
+    if runtime is None or runtime[2] != PLOTLY_JS_VERSION:
+        return html_content
+    start, end, _ = runtime
+    return html_content[:start] + shared_runtime_tag(runtime_url) + html_content[end:]
+
+
+def normalized_content_hash(html_content):
+    """SHA-256 of a figure with its runtime and random div UUIDs stripped.
+
+    Exports of the same figure hash equally even when written separately,
+    so the asset layer can load, cache and ship each unique figure once.
+    """
+    runtime = find_plotly_runtime(html_content)
+    if runtime is not None:
+        start, end, version = runtime
+        html_content = html_content[:start] + f"<plotly.js {version}>" + html_content[end:]
+    normalized = _FIGURE_DIV_UUID.sub('""', html_content)
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def figure_container(height_css):
+    """Opening tag of the figure container; ``height_css`` is e.g. '1000px' or '100vh'."""
+    return (
+        f'<div style="--figure-height:{height_css}; width:100%; height:{height_css}; margin: 0; padding: 0; '
+        'border: 1px solid #e0e0e0; border-radius: 10px; background: white; '
+        'box-shadow: 0 2px 8px rgba(0,0,0,0.1); overflow: hidden;">'
+    )
+
+
+def wrap_figure_html(html_content):
+    """Wrap figure HTML in the height-independent part of the responsive container.
+
+    The container is closed but not opened here: prepend ``figure_container()``,
+    whose --figure-height CSS variable sizes the plot.
+    """
+    return f"""
+            <style>
+                /* Reset and base styles */
+                * {{ 
+                    box-sizing: border-box; 
+                    margin: 0; 
+                    padding: 0; 
+                }}
+                
+                html, body {{ 
+                    width: 100%; 
+                    height: 100%; 
+                    margin: 0; 
+                    padding: 0; 
+                    background: white; 
+                    overflow: hidden;
+                }}
+                
+                /* Force Plotly container to use full available space */
+                .plotly-graph-div {{ 
+                    width: 100% !important; 
+                    height: calc(var(--figure-height) - 20px) !important;
+                    min-height: calc(var(--figure-height) - 20px) !important;
+                    margin: 10px !important;
+                    padding: 0 !important;
+                }}
+                
+                /* Ensure proper scaling */
+                .plotly-graph-div > div {{ 
+                    width: calc(100% - 20px) !important;
+                    height: calc(100% - 20px) !important;
+                    margin: 10px !important;
+                }}
+                
+                /* Make sure plots are responsive */
+                .js-plotly-plot {{ 
+                    width: 100% !important;
+                    height: 100% !important;
+                }}
+                
+                /* Remove any default margins/padding from plot elements */
+                .plot-container {{ 
+                    width: 100% !important;
+                    height: 100% !important;
+                    margin: 0 !important;
+                    padding: 0 !important;
+                }}
+            </style>
+            {html_content}
+            
+            <script>
+                // Enhanced resize handling
+                function resizePlots() {{
+                    if (typeof Plotly !== 'undefined') {{
+                        var plots = document.querySelectorAll('.plotly-graph-div');
+                        plots.forEach(function(plot) {{
+                            // Force responsive sizing
+                            var update = {{
+                                width: plot.offsetWidth - 20,
+                                height: plot.offsetHeight - 20
+                            }};
+                            Plotly.relayout(plot, update);
+                            Plotly.Plots.resize(plot);
+                        }});
+                    }}
+                }}
+                
+                // Initial resize after load
+                setTimeout(resizePlots, 500);
+                setTimeout(resizePlots, 1000);
+                
+                // Resize on window resize
+                window.addEventListener('resize', resizePlots);
+            </script>
+        </div>
+        """
+
+
+def figure_document(html_content, runtime_url):
+    """Standalone HTML document for a figure that fills its iframe."""
+    body = figure_container("100vh") + wrap_figure_html(use_shared_plotly_runtime(html_content, runtime_url))
+    return f"""<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8" /></head>
+<body style="margin: 0;">
+{body}
+</body>
+</html>
+"""
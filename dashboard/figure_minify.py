@@ -0,0 +1,331 @@
+"""Minification pass over extracted figure specs (see ``figure_store.extract_figure``).
+
+Plotly's exports carry more than the browser needs:
+
+* every figure embeds the full default layout template (about a third of
+  the figure store's JSON), identical across figures;
+* coordinates are written with 15-17 significant digits;
+* attributes are written out even where they equal plotly.js' own default
+  (``xaxis: "x"``, ``marker.symbol: "circle"``, ``line.dash: "solid"`` ...);
+* the same array is often repeated, e.g. the shared x values of every trace.
+
+``minify_figure`` rounds floats and drops defaulted attributes - both apply
+to whatever is sent to the browser. ``split_template`` and ``share_arrays``
+are lossless storage transforms: the figure store keeps each template once
+and repeated arrays once per figure, and expands them again on read.
+
+    python -m dashboard.figure_minify     # report the bytes saved per figure
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import re
+import sys
+
+from dashboard.typed_arrays import DECODE_FUNCTION, DECODER_SCRIPT, encode_typed_arrays
+
+DEFAULT_FLOAT_DIGITS = 6
+# Shorter arrays (in JSON bytes) cost less inline than as a reference
+MIN_SHARED_ARRAY_BYTES = 32
+
+TEMPLATE_REF = "$template"
+ARRAY_REF = "$array"
+
+# Attribute paths and the value plotly.js uses when they are absent. Values
+# set by the figure's template are kept, since the template would override them.
+TRACE_DEFAULTS = {
+    ("visible",): True,
+    ("opacity",): 1,
+    ("xaxis",): "x",
+    ("yaxis",): "y",
+    ("legendgroup",): "",
+    ("showlegend",): True,
+    ("marker", "symbol"): "circle",
+    ("marker", "pattern", "shape"): "",
+    ("line", "dash"): "solid",
+}
+AXIS_DEFAULTS = {
+    ("domain",): [0, 1],
+    ("visible",): True,
+}
+LAYOUT_DEFAULTS = {
+    ("autosize",): True,
+}
+_AXIS = re.compile(r"^[xy]axis\d*$")
+_MISSING = object()
+
+
+def _compact_json(value):
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+
+def json_size(value):
+    """Bytes of ``value`` as compact JSON."""
+    return len(_compact_json(value).encode("utf-8"))
+
+
+def round_floats(value, digits):
+    """Copy of ``value`` with floats rounded to ``digits`` significant digits.
+
+    Integral floats become ints ('2019.0' -> '2019'); NaN and infinities are
+    left alone.
+    """
+    if isinstance(value, float):
+        if not math.isfinite(value):
+            return value
+        if value.is_integer() and abs(value) < 2 ** 53:
+            return int(value)
+        return float(f"{value:.{digits}g}")
+    if isinstance(value, list):
+        return [round_floats(item, digits) for item in value]
+    if isinstance(value, dict):
+        return {key: round_floats(item, digits) for key, item in value.items()}
+    return value
+
+
+def _has_path(tree, path):
+    for key in path:
+        if not isinstance(tree, dict) or key not in tree:
+            return False
+        tree = tree[key]
+    return True
+
+
+def _drop_defaults(tree, defaults, overridden):
+    """Copy of the dict ``tree`` without the ``defaults`` it matches; dicts left empty are dropped.
+
+    ``overridden(path)`` tells whether the template sets ``path``.
+    """
+    tree = dict(tree)
+    for path, default in defaults.items():
+        parents = [tree]
+        for key in path[:-1]:
+            child = parents[-1].get(key)
+            if not isinstance(child, dict):
+                break
+            parents.append(child)
+        else:
+            value = parents[-1].get(path[-1], _MISSING)
+            if value is _MISSING or value != default or type(value) is not type(default) or overridden(path):
+                continue
+            # Copy the chain down to the attribute before deleting it
+            for depth in range(1, len(parents)):
+                parents[depth] = parents[depth - 1][path[depth - 1]] = dict(parents[depth])
+            del parents[-1][path[-1]]
+            for depth in range(len(parents) - 1, 0, -1):
+                if not parents[depth]:
+                    del parents[depth - 1][path[depth - 1]]
+    return tree
+
+
+def strip_defaults(spec):
+    """Copy of a figure spec without the attributes that equal their plotly.js default."""
+    layout = spec.get("layout", {})
+    template = layout.get("template") if isinstance(layout.get("template"), dict) else {}
+    template_data = template.get("data", {})
+    template_layout = template.get("layout", {})
+
+    data = []
+    for trace in spec.get("data", []):
+        templated = template_data.get(trace.get("type", "scatter"), [])
+        data.append(_drop_defaults(
+            trace, TRACE_DEFAULTS, lambda path: any(_has_path(entry, path) for entry in templated)
+        ))
+
+    layout = _drop_defaults(layout, LAYOUT_DEFAULTS, lambda path: _has_path(template_layout, path))
+    for name in list(layout):
+        if _AXIS.match(name) and isinstance(layout[name], dict):
+            # Template axis settings apply to every axis of its direction
+            template_axis = template_layout.get(name[0] + "axis", {})
+            layout[name] = _drop_defaults(layout[name], AXIS_DEFAULTS,
+                                          lambda path: _has_path(template_axis, path))
+    return dict(spec, data=data, layout=layout)
+
+
+def minify_figure(spec, digits=DEFAULT_FLOAT_DIGITS):
+    """Return ``(minified_spec, report)``: floats rounded, defaulted attributes dropped.
+
+    ``report`` holds the compact-JSON ``bytes`` before and after and the
+    bytes each step saved (``floats``, ``defaults``). The input is not mutated.
+    """
+    before = json_size(spec)
+    rounded = dict(spec, data=round_floats(spec.get("data", []), digits),
+                   layout=round_floats(spec.get("layout", {}), digits))
+    rounded_size = json_size(rounded)
+    minified = strip_defaults(rounded)
+    after = json_size(minified)
+    return minified, {"bytes_before": before, "bytes_after": after,
+                      "floats": before - rounded_size, "defaults": rounded_size - after}
+
+
+def template_hash(template):
+    return hashlib.sha256(_compact_json(template).encode("utf-8")).hexdigest()
+
+
+def split_template(spec):
+    """Return ``(spec, template)`` with the layout template replaced by a ``{"$template": sha256}`` reference.
+
+    ``template`` is None when the figure has none.
+    """
+    template = spec.get("layout", {}).get("template")
+    if not isinstance(template, dict):
+        return spec, None
+    layout = dict(spec["layout"], template={TEMPLATE_REF: template_hash(template)})
+    return dict(spec, layout=layout), template
+
+
+def template_ref(spec):
+    """sha256 of the template a split spec refers to, or None."""
+    template = spec.get("layout", {}).get("template")
+    return template.get(TEMPLATE_REF) if isinstance(template, dict) else None
+
+
+def share_arrays(spec, min_bytes=MIN_SHARED_ARRAY_BYTES):
+    """Copy of a spec whose repeated arrays are stored once in ``spec["arrays"]``.
+
+    Every occurrence of an array found more than once (and at least
+    ``min_bytes`` long as JSON) becomes ``{"$array": index}``.
+    """
+    counts = {}
+
+    def count(value):
+        if isinstance(value, list):
+            encoded = _compact_json(value)
+            if len(encoded) >= min_bytes:
+                counts[encoded] = counts.get(encoded, 0) + 1
+            for item in value:
+                count(item)
+        elif isinstance(value, dict):
+            for item in value.values():
+                count(item)
+
+    count(spec)
+    repeated = {encoded: None for encoded, n in counts.items() if n > 1}
+    if not repeated:
+        return spec
+    arrays = []
+
+    def replace(value):
+        if isinstance(value, list):
+            encoded = _compact_json(value)
+            if encoded in repeated:
+                if repeated[encoded] is None:
+                    repeated[encoded] = len(arrays)
+                    arrays.append(value)
+                return {ARRAY_REF: repeated[encoded]}
+            return [replace(item) for item in value]
+        if isinstance(value, dict):
+            return {key: replace(item) for key, item in value.items()}
+        return value
+
+    return dict(replace(spec), arrays=arrays)
+
+
+def expand_arrays(spec):
+    """Inverse of ``share_arrays`` (mutates and returns ``spec``)."""
+    arrays = spec.pop("arrays", None)
+    if not arrays:
+        return spec
+
+    def expand(value):
+        if isinstance(value, dict):
+            if len(value) == 1 and ARRAY_REF in value:
+                return arrays[value[ARRAY_REF]]
+            for key, item in value.items():
+                value[key] = expand(item)
+        elif isinstance(value, list):
+            for index, item in enumerate(value):
+                value[index] = expand(item)
+        return value
+
+    return expand(spec)
+
+
+def _script_json(value):
+    # "</" would close the surrounding <script> element
+    return _compact_json(value).replace("</", "<\\/")
+
+
+def minify_figure_html(html_content, digits=DEFAULT_FLOAT_DIGITS, template_expression=None, binary_min_length=None):
+    """Rewrite the figure of a Plotly HTML export with its minified spec.
+
+    ``digits=None`` skips the rounding and default stripping. With
+    ``template_expression`` (JavaScript evaluating to the template, e.g. a
+    global defined by a shared script) the inline template is replaced by it.
+    With ``binary_min_length`` numeric arrays of that many values or more are
+    shipped as binary typed arrays and decoded before plotting (see
+    dashboard/typed_arrays.py). HTML without a Plotly figure is returned
+    unchanged.
+    """
+    from dashboard.figure_store import find_newplot_call
+
+    call = find_newplot_call(html_content)
+    if call is None:
+        return html_content
+    (div_id, data, layout, config), start, end = call
+    spec = {"data": data, "layout": layout}
+    if digits is not None:
+        spec, _ = minify_figure(spec, digits)
+    layout_source = _script_json(spec["layout"])
+    if template_expression is not None and "template" in spec["layout"]:
+        layout = {key: value for key, value in spec["layout"].items() if key != "template"}
+        layout_source = f'Object.assign({_script_json(layout)}, {{"template": {template_expression}}})'
+    data_source = _script_json(spec["data"])
+    decoder = ""
+    if binary_min_length is not None:
+        encoded = encode_typed_arrays(spec["data"], binary_min_length, digits)
+        encoded_source = f"{DECODE_FUNCTION}({_script_json(encoded)})"
+        # Only worth it when the savings pay for the inlined decoder
+        if len(encoded_source) + len(DECODER_SCRIPT) < len(data_source):
+            data_source = encoded_source
+            # Defined ahead of the figure's own script
+            decoder = DECODER_SCRIPT
+    args = ", ".join([_script_json(div_id), data_source, layout_source, _script_json(config)])
+    return decoder + html_content[:start] + args + html_content[end:]
+
+
+def main(argv=None):
+    from dashboard.config import AUTO_DISCOVER_FIGURES, BASE_PATHS, FIGURE_FLOAT_DIGITS, VISUALIZATIONS
+    from dashboard.figure_store import extract_figure, store_key
+    from dashboard.manifest import VisualizationManifest
+
+    parser = argparse.ArgumentParser(description="Report the bytes the minification pass saves per figure.")
+    parser.add_argument("--digits", type=int, default=FIGURE_FLOAT_DIGITS, help="significant digits kept")
+    args = parser.parse_args(argv)
+
+    manifest = VisualizationManifest(VISUALIZATIONS, BASE_PATHS, discover=AUTO_DISCOVER_FIGURES)
+    file_paths = list(dict.fromkeys(config["file_path"] for config in manifest.visualizations.values()
+                                    if config["exists"]))
+    templates = set()
+    total_before = total_after = 0
+    print(f"{'figure':60} {'before':>9} {'after':>9}  floats defaults template arrays (KB saved)")
+    for file_path in file_paths:
+        with open(file_path, "r", encoding="utf-8") as f:
+            spec = extract_figure(f.read())
+        if spec is None:
+            continue
+        minified, report = minify_figure(spec, args.digits)
+        split, template = split_template(minified)
+        shared = share_arrays(split)
+        # A template is paid for once across all figures
+        if template is not None and template_ref(split) not in templates:
+            templates.add(template_ref(split))
+            total_after += json_size(template)
+        after = json_size(shared)
+        template_saved = report["bytes_after"] - json_size(split)
+        arrays_saved = json_size(split) - after
+        total_before += report["bytes_before"]
+        total_after += after
+        print(f"{store_key(file_path)[-60:]:60} {report['bytes_before'] / 1024:8.0f}K {after / 1024:8.0f}K  "
+              f"{report['floats'] / 1024:6.0f} {report['defaults'] / 1024:8.0f} {template_saved / 1024:8.0f} "
+              f"{arrays_saved / 1024:6.0f}")
+    saved = total_before - total_after
+    print(f"Total: {total_before / 1024 / 1024:.2f} MB -> {total_after / 1024 / 1024:.2f} MB "
+          f"({saved / max(total_before, 1):.0%} saved, {len(templates)} shared templates)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,239 @@
+"""Level-of-detail pass over extracted figure specs (see ``figure_store.extract_figure``).
+
+Large traces are made cheaper for the browser to draw:
+
+* SVG ``scatter`` traces above ``webgl_threshold`` points become ``scattergl``.
+* Line series above ``point_budget`` points whose x is in order are
+  decimated with Largest-Triangle-Three-Buckets, which keeps peaks, troughs
+  and the overall shape of the line. Marker-only traces (scatter and bubble
+  charts) keep every point; every point there is data, not a line vertex.
+* ``histogram`` traces carrying more than ``point_budget`` raw samples are
+  binned here and shipped as the equivalent ``bar`` trace.
+
+The pass never mutates its input, so the full-resolution spec stays available
+(the app renders it when a user asks for full resolution).
+
+    python -m dashboard.figure_optimize     # report what the pass changes per figure
+"""
+
+import argparse
+import math
+import sys
+
+DEFAULT_POINT_BUDGET = 2000
+DEFAULT_WEBGL_THRESHOLD = 1000
+
+# Per-point attributes that must be decimated together with x/y
+_POINT_ARRAYS = ("x", "y", "text", "hovertext", "customdata", "ids")
+_MARKER_ARRAYS = ("size", "color", "symbol", "opacity")
+
+# scattergl has no equivalent for these
+_NON_GL_FILLS = ("tonextx", "tonexty", "tonext")
+
+
+def trace_points(trace):
+    """Number of points in a trace (length of its longest data array)."""
+    return max((len(trace[key]) for key in ("x", "y", "z", "values", "labels") if isinstance(trace.get(key), list)),
+               default=0)
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def lttb_indices(xs, ys, threshold):
+    """Indices of ``threshold`` points chosen by Largest-Triangle-Three-Buckets."""
+    n = len(ys)
+    if threshold >= n or threshold < 3:
+        return list(range(n))
+    bucket_size = (n - 2) / (threshold - 2)
+    indices = [0]
+    a = 0
+    for bucket in range(threshold - 2):
+        start = int(math.floor(bucket * bucket_size)) + 1
+        end = int(math.floor((bucket + 1) * bucket_size)) + 1
+        next_start, next_end = end, min(int(math.floor((bucket + 2) * bucket_size)) + 1, n)
+        # Average of the next bucket is the third triangle vertex
+        next_count = max(next_end - next_start, 1)
+        avg_x = sum(xs[next_start:next_end]) / next_count if next_end > next_start else xs[n - 1]
+        avg_y = sum(ys[next_start:next_end]) / next_count if next_end > next_start else ys[n - 1]
+        best, best_area = start, -1.0
+        for i in range(start, min(end, n - 1)):
+            area = abs((xs[a] - avg_x) * (ys[i] - ys[a]) - (xs[a] - xs[i]) * (avg_y - ys[a]))
+            if area > best_area:
+                best, best_area = i, area
+        indices.append(best)
+        a = best
+    indices.append(n - 1)
+    return indices
+
+
+def _is_ordered(values):
+    return (all(a <= b for a, b in zip(values, values[1:]))
+            or all(a >= b for a, b in zip(values, values[1:])))
+
+
+def decimate_trace(trace, point_budget):
+    """Return a copy of a line trace reduced to ``point_budget`` points, or None if not applicable."""
+    ys = trace.get("y")
+    if not isinstance(ys, list) or len(ys) <= point_budget or not all(_is_number(y) for y in ys):
+        return None
+    # plotly.js draws scatter traces of more than 20 points as lines unless a mode is set
+    if "lines" not in trace.get("mode", "lines"):
+        return None
+    xs = trace.get("x")
+    if xs is None:
+        numeric_x = list(range(len(ys)))
+    elif not isinstance(xs, list) or len(xs) != len(ys):
+        return None
+    elif all(_is_number(x) for x in xs):
+        numeric_x = xs
+    elif all(isinstance(x, str) for x in xs):
+        numeric_x = list(range(len(ys)))  # dates, decimated by position
+    else:
+        return None
+    # A line over unsorted x doubles back on itself; dropping its vertices changes what is drawn
+    if not _is_ordered(xs if xs is not None else numeric_x):
+        return None
+    keep = lttb_indices(numeric_x, ys, point_budget)
+
+    decimated = dict(trace)
+    for key in _POINT_ARRAYS:
+        values = trace.get(key)
+        if isinstance(values, list) and len(values) == len(ys):
+            decimated[key] = [values[i] for i in keep]
+    marker = trace.get("marker")
+    if isinstance(marker, dict):
+        decimated["marker"] = dict(marker)
+        for key in _MARKER_ARRAYS:
+            values = marker.get(key)
+            if isinstance(values, list) and len(values) == len(ys):
+                decimated["marker"][key] = [values[i] for i in keep]
+    return decimated
+
+
+def _nice_bin_size(span, max_bins):
+    """Smallest 1/2/5 x 10^k bin size giving at most ``max_bins`` bins over ``span``."""
+    if span <= 0:
+        return 1.0
+    raw = span / max_bins
+    magnitude = 10 ** math.floor(math.log10(raw))
+    for step in (1, 2, 5, 10):
+        if step * magnitude >= raw:
+            return step * magnitude
+    return 10 * magnitude
+
+
+def bin_histogram(trace, point_budget):
+    """Return a ``bar`` trace equivalent to a large sample histogram, or None if not applicable."""
+    samples = trace.get("x")
+    if (not isinstance(samples, list) or len(samples) <= point_budget or "y" in trace
+            or trace.get("histfunc", "count") != "count" or trace.get("cumulative", {}).get("enabled")
+            or trace.get("histnorm", "") not in ("", "percent", "probability")):
+        return None
+
+    if all(_is_number(value) for value in samples):
+        xbins = trace.get("xbins") or {}
+        start = xbins.get("start", min(samples))
+        end = xbins.get("end", max(samples))
+        size = xbins.get("size") or _nice_bin_size(end - start, trace.get("nbinsx") or int(math.sqrt(len(samples))) or 1)
+        if "start" not in xbins:
+            start = math.floor(start / size) * size
+        bin_count = max(int(math.ceil((end - start) / size)), 1)
+        counts = [0] * bin_count
+        for value in samples:
+            if start <= value < start + bin_count * size or value == end:
+                counts[min(int((value - start) // size), bin_count - 1)] += 1
+        centers = [start + (i + 0.5) * size for i in range(bin_count)]
+        width = size
+    else:
+        # Categorical histogram: one bar per category, in first-seen order
+        category_counts = {}
+        for value in samples:
+            category_counts[value] = category_counts.get(value, 0) + 1
+        centers, counts, width = list(category_counts), list(category_counts.values()), None
+
+    total = sum(counts) or 1
+    histnorm = trace.get("histnorm", "")
+    if histnorm == "percent":
+        counts = [100.0 * count / total for count in counts]
+    elif histnorm == "probability":
+        counts = [count / total for count in counts]
+
+    bar = {key: value for key, value in trace.items()
+           if key not in ("x", "xbins", "nbinsx", "autobinx", "histnorm", "histfunc", "bingroup", "cumulative")}
+    bar.update(type="bar", x=centers, y=counts)
+    if width is not None:
+        bar["width"] = width
+    return bar
+
+
+def optimize_figure(spec, point_budget=DEFAULT_POINT_BUDGET, webgl_threshold=DEFAULT_WEBGL_THRESHOLD):
+    """Return ``(optimized_spec, report)`` for a ``{"data", "layout", "config"}`` figure spec.
+
+    ``report`` lists one ``{"trace", "change", "points_before", "points_after"}``
+    entry per modified trace; an empty report means the spec was returned as is.
+    """
+    data = []
+    report = []
+    for index, trace in enumerate(spec["data"]):
+        points = trace_points(trace)
+        trace_type = trace.get("type", "scatter")
+        new_trace = trace
+        changes = []
+
+        if trace_type == "histogram":
+            binned = bin_histogram(trace, point_budget)
+            if binned is not None:
+                new_trace = binned
+                changes.append("pre-binned")
+        elif trace_type in ("scatter", "scattergl"):
+            decimated = decimate_trace(trace, point_budget)
+            if decimated is not None:
+                new_trace = decimated
+                changes.append("decimated")
+            if (trace_type == "scatter" and points >= webgl_threshold
+                    and trace.get("fill") not in _NON_GL_FILLS and "stackgroup" not in trace
+                    and trace.get("line", {}).get("shape") != "spline"):
+                new_trace = dict(new_trace, type="scattergl")
+                changes.append("webgl")
+
+        if changes:
+            report.append({"trace": trace.get("name", index), "change": "+".join(changes),
+                           "points_before": points, "points_after": trace_points(new_trace)})
+        data.append(new_trace)
+
+    if not report:
+        return spec, report
+    # Unchanged traces are shared with ``spec``; neither side is mutated afterwards
+    return dict(spec, data=data), report
+
+
+def main(argv=None):
+    import json
+
+    from dashboard.config import FIGURE_STORE_PATH, LOD_POINT_BUDGET, WEBGL_POINT_THRESHOLD
+    from dashboard.figure_store import FigureStore
+
+    parser = argparse.ArgumentParser(description="Report what the level-of-detail pass changes per figure.")
+    parser.add_argument("--store", default=FIGURE_STORE_PATH, help="compiled figure store to read")
+    parser.add_argument("--point-budget", type=int, default=LOD_POINT_BUDGET)
+    parser.add_argument("--webgl-threshold", type=int, default=WEBGL_POINT_THRESHOLD)
+    args = parser.parse_args(argv)
+
+    store = FigureStore(args.store)
+    for key in sorted(store.keys()):
+        spec = store.get(key)
+        optimized, report = optimize_figure(spec, args.point_budget, args.webgl_threshold)
+        if not report:
+            continue
+        before = len(json.dumps(spec, separators=(",", ":")))
+        after = len(json.dumps(optimized, separators=(",", ":")))
+        print(f"{key}: {before / 1024:.0f} KB -> {after / 1024:.0f} KB")
+        for entry in report:
+            print(f"  {entry['trace']}: {entry['change']} {entry['points_before']} -> {entry['points_after']} points")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,171 @@
+"""Lightweight figure previews, extracted offline from the figure JSON.
+
+A preview lists what a figure holds - its title, axis titles, one row per
+trace with its point count and total - so the app can show a card right away
+and load the interactive figure only when the user asks for it. Exported
+pandas tables get their columns, row count, first rows and column totals.
+
+Build the previews from the repository root (next to the figure store):
+
+    python -m dashboard.figure_preview     # writes build/previews.json
+
+Each preview records the normalized content hash of its source file, so
+the app ignores previews of figures that changed since the last build.
+"""
+
+import argparse
+import html
+import json
+import os
+import re
+import sys
+
+from dashboard.figure_html import normalized_content_hash
+from dashboard.figure_optimize import trace_points
+from dashboard.figure_store import extract_figure, store_key
+
+MAX_TRACES = 12
+TABLE_SAMPLE_ROWS = 5
+
+_TABLE_ROW = re.compile(r"<tr[^>]*>(.*?)</tr>", re.S)
+_TABLE_CELL = re.compile(r"<t[hd][^>]*>(.*?)</t[hd]>", re.S)
+_TAG = re.compile(r"<[^>]+>")
+
+
+def _title_text(title):
+    """Plotly titles are either a string or ``{"text": ...}``; strip markup from either."""
+    text = title.get("text", "") if isinstance(title, dict) else title or ""
+    return _TAG.sub(" ", str(text)).replace("  ", " ").strip()
+
+
+def _number_sum(values):
+    if not isinstance(values, list):
+        return None
+    numbers = [value for value in values if isinstance(value, (int, float)) and not isinstance(value, bool)]
+    return sum(numbers) if numbers else None
+
+
+def trace_total(trace):
+    """A headline total for a trace - the sum of its values, where one makes sense."""
+    trace_type = trace.get("type", "scatter")
+    if trace_type in ("pie", "funnelarea"):
+        return _number_sum(trace.get("values"))
+    if trace_type in ("sunburst", "treemap", "icicle"):
+        values, parents = trace.get("values"), trace.get("parents")
+        if isinstance(values, list) and isinstance(parents, list):
+            # Roots only; "total" branch values would double count their children
+            return _number_sum([value for value, parent in zip(values, parents) if parent in ("", None)])
+        return _number_sum(values)
+    if trace_type in ("bar", "funnel", "waterfall"):
+        return _number_sum(trace.get("x") if trace.get("orientation") == "h" else trace.get("y"))
+    if trace_type in ("heatmap", "heatmapgl", "contour"):
+        z = trace.get("z")
+        return _number_sum([value for row in z for value in row]) if isinstance(z, list) and z and \
+            isinstance(z[0], list) else None
+    if trace_type == "histogram":
+        return trace_points(trace)
+    return None
+
+
+def summarize_figure(spec):
+    """Return the preview of a ``{"data", "layout", "config"}`` figure spec."""
+    layout = spec.get("layout", {})
+    axes = []
+    for name in sorted(key for key in layout if re.match(r"^[xy]axis\d*$", key)):
+        title = _title_text(layout[name].get("title"))
+        if title and title not in axes:
+            axes.append(title)
+
+    traces = []
+    for index, trace in enumerate(spec.get("data", [])):
+        traces.append({
+            "name": _title_text(trace.get("name")) or f"trace {index}",
+            "type": trace.get("type", "scatter"),
+            "points": trace_points(trace),
+            "total": trace_total(trace),
+        })
+    return {
+        "kind": "figure",
+        "title": _title_text(layout.get("title")),
+        "axes": axes,
+        "trace_count": len(traces),
+        "points": sum(trace["points"] for trace in traces),
+        "traces": traces[:MAX_TRACES],
+    }
+
+
+def summarize_table(html_content):
+    """Return the preview of an exported pandas table, or None for HTML without one."""
+    rows = [[html.unescape(_TAG.sub("", cell)).strip() for cell in _TABLE_CELL.findall(row)]
+            for row in _TABLE_ROW.findall(html_content)]
+    if not rows:
+        return None
+    columns, body = rows[0], rows[1:]
+
+    totals = {}
+    for column_index, column in enumerate(columns):
+        try:
+            values = [float(row[column_index]) for row in body if row[column_index]]
+        except (ValueError, IndexError):
+            continue  # text column
+        if values:
+            totals[column] = {"sum": sum(values), "min": min(values), "max": max(values)}
+    return {
+        "kind": "table",
+        "title": "",
+        "columns": columns,
+        "rows": len(body),
+        "sample": body[:TABLE_SAMPLE_ROWS],
+        "totals": totals,
+    }
+
+
+def build_previews(file_paths, output_path):
+    """Write ``{key: preview}`` for every figure or table in ``file_paths``; return it."""
+    previews = {}
+    for file_path in file_paths:
+        if not os.path.exists(file_path):
+            continue
+        with open(file_path, "r", encoding="utf-8") as f:
+            html_content = f.read()
+        spec = extract_figure(html_content)
+        preview = summarize_figure(spec) if spec is not None else summarize_table(html_content)
+        if preview is None:
+            continue
+        preview["content_hash"] = normalized_content_hash(html_content)
+        preview["bytes"] = len(html_content.encode("utf-8"))
+        previews[store_key(file_path)] = preview
+
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    with open(output_path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(previews, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(output_path + ".tmp", output_path)
+    return previews
+
+
+def load_previews(path):
+    """Return the ``{key: preview}`` map, or {} when previews are not built."""
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main(argv=None):
+    from dashboard.config import AUTO_DISCOVER_FIGURES, BASE_PATHS, PREVIEW_PATH, VISUALIZATIONS
+    from dashboard.manifest import VisualizationManifest
+
+    parser = argparse.ArgumentParser(description="Extract preview cards for the registered figures.")
+    parser.add_argument("--output", default=PREVIEW_PATH, help="preview file to write")
+    args = parser.parse_args(argv)
+
+    manifest = VisualizationManifest(VISUALIZATIONS, BASE_PATHS, discover=AUTO_DISCOVER_FIGURES)
+    file_paths = list(dict.fromkeys(config["file_path"] for config in manifest.visualizations.values()))
+    previews = build_previews(file_paths, args.output)
+    print(f"Extracted {len(previews)} previews into {args.output} "
+          f"({os.path.getsize(args.output) / 1024:.0f} KB)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
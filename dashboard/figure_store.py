@@ -0,0 +1,215 @@
+"""Compact, memory-mapped store of Plotly figure specs extracted from the HTML exports.
+
+Build it offline from the repository root:
+
+    python -m dashboard.figure_store
+
+Store layout: an 8-byte magic, the offset and length of the JSON index (two
+little-endian uint64), then one zlib-compressed JSON blob per figure and per
+layout template, then the index itself. The index maps each figure key (its
+HTML path, as listed in the visualization manifest) to the blob's offset and
+length, so a single figure can be read from the mapped file without touching
+the others. Blobs are content-addressed: keys whose figure spec is identical
+share one blob, and figures refer to their layout template, stored once, by
+its hash (see dashboard/figure_minify.py). ``FigureStore.get`` returns the
+complete spec.
+"""
+
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import zlib
+
+from dashboard.figure_minify import expand_arrays, json_size, minify_figure, share_arrays, split_template, \
+    template_ref
+
+MAGIC = b"FIGSTOR1"
+HEADER = struct.Struct("<8sQQ")
+
+_NEWPLOT_CALL = "Plotly.newPlot("
+_DECODER = json.JSONDecoder()
+
+
+def find_newplot_call(html_content):
+    """Return ``(args, start, end)`` of the first ``Plotly.newPlot(id, data, layout, config)`` call.
+
+    ``args`` are the four decoded arguments and ``html_content[start:end]``
+    is their source text. Returns None for HTML without a Plotly figure.
+    """
+    pos = 0
+    while True:
+        start = html_content.find(_NEWPLOT_CALL, pos)
+        if start < 0:
+            return None
+        try:
+            end = start + len(_NEWPLOT_CALL)
+            args = []
+            for _ in range(4):
+                while html_content[end] in " \t\r\n,":
+                    end += 1
+                value, end = _DECODER.raw_decode(html_content, end)
+                args.append(value)
+        except (ValueError, IndexError):
+            # A mention of Plotly.newPlot inside the bundled runtime, not a call
+            pos = start + 1
+            continue
+        return args, start + len(_NEWPLOT_CALL), end
+
+
+def extract_figure(html_content):
+    """Return the ``{"data", "layout", "config"}`` spec of the figure in ``html_content``.
+
+    Parses the arguments of the first ``Plotly.newPlot(id, data, layout, config)``
+    call written by Plotly's ``write_html``. Returns None for HTML without a
+    Plotly figure (e.g. exported pandas tables).
+    """
+    call = find_newplot_call(html_content)
+    if call is None:
+        return None
+    _, data, layout, config = call[0]
+    return {"data": data, "layout": layout, "config": config}
+
+
+def store_key(file_path):
+    """Normalize a figure file path into its store key."""
+    return os.path.normpath(file_path).replace(os.sep, "/")
+
+
+def write_store(figures, output_path):
+    """Write ``{key: spec}`` to ``output_path`` atomically and return the index."""
+    index = {}
+    templates = {}
+    blobs = {}  # sha256 -> index entry of the blob already written
+    tmp_path = output_path + ".tmp"
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+
+    def write_blob(f, raw):
+        sha256 = hashlib.sha256(raw).hexdigest()
+        if sha256 not in blobs:
+            blob = zlib.compress(raw, 9)
+            blobs[sha256] = {"offset": f.tell(), "length": len(blob), "size": len(raw), "sha256": sha256}
+            f.write(blob)
+        return blobs[sha256]
+
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, 0, 0))
+        for key, spec in figures.items():
+            packed, template = split_template(spec)
+            if template is not None and template_ref(packed) not in templates:
+                raw = json.dumps(template, separators=(",", ":")).encode("utf-8")
+                templates[template_ref(packed)] = write_blob(f, raw)
+            packed = share_arrays(packed)
+            entry = write_blob(f, json.dumps(packed, separators=(",", ":")).encode("utf-8"))
+            # "size" is what the decoded figure weighs, template included
+            index[key] = dict(entry, size=json_size(spec))
+        index_offset = f.tell()
+        index_raw = json.dumps({"figures": index, "templates": templates}, separators=(",", ":")).encode("utf-8")
+        f.write(index_raw)
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, index_offset, len(index_raw)))
+    # Readers that already mapped the old file keep their (unlinked) copy
+    os.replace(tmp_path, output_path)
+    return index
+
+
+class FigureStore:
+    """Read-only, memory-mapped view of a compiled figure store."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, index_offset, index_length = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            self._mmap.close()
+            raise ValueError(f"Not a figure store: {path}")
+        index = json.loads(self._mmap[index_offset:index_offset + index_length])
+        self.index = index["figures"]
+        self.templates = index.get("templates", {})
+        self._template_raw = {}  # sha256 -> decompressed template JSON
+
+    def __contains__(self, key):
+        return store_key(key) in self.index
+
+    def __len__(self):
+        return len(self.index)
+
+    def keys(self):
+        return self.index.keys()
+
+    def _read(self, entry):
+        return zlib.decompress(self._mmap[entry["offset"]:entry["offset"] + entry["length"]])
+
+    def get(self, key):
+        """Return the decoded figure spec stored under ``key``, template and shared arrays expanded."""
+        spec = expand_arrays(json.loads(self._read(self.index[store_key(key)])))
+        ref = template_ref(spec)
+        if ref is not None:
+            raw = self._template_raw.get(ref)
+            if raw is None:
+                raw = self._template_raw[ref] = self._read(self.templates[ref])
+            # Parsed per call: callers may modify the spec they get
+            spec["layout"]["template"] = json.loads(raw)
+        return spec
+
+    def close(self):
+        self._mmap.close()
+
+
+def compile_figures(file_paths, output_path, float_digits=None):
+    """Extract every Plotly figure in ``file_paths`` into a store at ``output_path``.
+
+    With ``float_digits`` the figures are minified first (``minify_figure``).
+    Returns ``(index, skipped)`` where ``skipped`` lists files that are missing
+    or hold no Plotly figure; the app keeps embedding those as HTML.
+    """
+    figures = {}
+    skipped = []
+    for file_path in file_paths:
+        if not os.path.exists(file_path):
+            skipped.append(file_path)
+            continue
+        with open(file_path, "r", encoding="utf-8") as f:
+            spec = extract_figure(f.read())
+        if spec is None:
+            skipped.append(file_path)
+            continue
+        if float_digits is not None:
+            spec, _ = minify_figure(spec, float_digits)
+        figures[store_key(file_path)] = spec
+    return write_store(figures, output_path), skipped
+
+
+def main(argv=None):
+    from dashboard.config import AUTO_DISCOVER_FIGURES, BASE_PATHS, FIGURE_FLOAT_DIGITS, FIGURE_MINIFICATION, \
+        FIGURE_STORE_PATH, VISUALIZATIONS
+    from dashboard.manifest import VisualizationManifest
+
+    parser = argparse.ArgumentParser(description="Compile the registered figures into a figure store.")
+    parser.add_argument("--output", default=FIGURE_STORE_PATH, help="store file to write")
+    args = parser.parse_args(argv)
+
+    manifest = VisualizationManifest(VISUALIZATIONS, BASE_PATHS, discover=AUTO_DISCOVER_FIGURES)
+    file_paths = list(dict.fromkeys(config["file_path"] for config in manifest.visualizations.values()))
+    index, skipped = compile_figures(file_paths, args.output,
+                                     float_digits=FIGURE_FLOAT_DIGITS if FIGURE_MINIFICATION else None)
+
+    source_bytes = sum(os.path.getsize(store_key(key)) for key in index)
+    store_bytes = os.path.getsize(args.output)
+    unique = len({entry["sha256"] for entry in index.values()})
+    store = FigureStore(args.output)
+    templates = len(store.templates)
+    store.close()
+    print(f"Compiled {len(index)} figures ({unique} unique, {templates} shared templates) into {args.output}")
+    print(f"  {source_bytes / 1024 / 1024:.1f} MB of HTML -> {store_bytes / 1024:.0f} KB store")
+    for file_path in skipped:
+        print(f"  skipped (no Plotly figure): {file_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
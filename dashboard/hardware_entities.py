@@ -0,0 +1,458 @@
+"""Batch extraction of hardware mentions ("8x V100", "A100 80GB", "RTX 3090") from paper text.
+
+Every alias of the canonical device table below is compiled into one token
+trie. A document is lowercased and split into letter and digit runs
+("A100-80GB" -> ``a 100 80 gb``), so spellings such as "A100", "a-100",
+"RTX3090" and "rtx 3090" meet in the same trie path. The gaps between tokens
+decide what may follow ("a100" never matches "a 100-fold"). The longest
+alias from the leftmost token wins ("RTX 3090 Ti" over "RTX 3090"). Then the
+tokens around the match are read for a memory size ("80GB", "32 GB") and a
+device count ("8x", "x8", "8 NVIDIA", "dual").
+
+A match is normalized to its canonical model, brand, generation and device
+type. The result is one record per distinct ``(hardware, memory, count)``
+of a paper, with the paper's ``year``, ``country``, ``organization`` and
+``topic`` passed through, so the output can go straight into the entity
+store:
+
+    python -m dashboard.hardware_entities extract papers.jsonl --output build/hardware_records.csv -j 8
+    python -m dashboard.entity_store build build/hardware_records.csv
+    python -m dashboard.hardware_entities match "trained on 8x A100 80GB and an RTX 3090"
+
+Documents are streamed (JSON Lines, CSV or Parquet with ``paper_id`` and the
+``--text`` fields) in batches across a process pool.
+"""
+
+import argparse
+import csv
+import json
+import os
+import re
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+# Canonical model, brand, generation, device type and the aliases it is written as.
+# NVIDIA and AMD aliases are also matched with the brand name in front.
+DEVICES = [
+    ("NVIDIA H200", "NVIDIA", "Hopper", "GPU", ["h200"]),
+    ("NVIDIA H100", "NVIDIA", "Hopper", "GPU", ["h100", "h100 sxm", "h100 sxm5", "h100 pcie", "h100 nvl"]),
+    ("NVIDIA L40S", "NVIDIA", "Ada Lovelace", "GPU", ["l40s"]),
+    ("NVIDIA L40", "NVIDIA", "Ada Lovelace", "GPU", ["l40"]),
+    ("NVIDIA L4", "NVIDIA", "Ada Lovelace", "GPU", ["nvidia l4", "l4 gpu", "l4 gpus"]),
+    ("NVIDIA RTX 4090", "NVIDIA", "Ada Lovelace", "GPU", ["rtx 4090", "geforce rtx 4090", "4090 gpu", "4090 gpus"]),
+    ("NVIDIA RTX 4080", "NVIDIA", "Ada Lovelace", "GPU", ["rtx 4080", "geforce rtx 4080"]),
+    ("NVIDIA RTX 6000 Ada", "NVIDIA", "Ada Lovelace", "GPU", ["rtx 6000 ada"]),
+    ("NVIDIA A100", "NVIDIA", "Ampere", "GPU", ["a100", "a100 sxm", "a100 sxm4", "a100 pcie", "tesla a100"]),
+    ("NVIDIA A800", "NVIDIA", "Ampere", "GPU", ["a800"]),
+    ("NVIDIA A40", "NVIDIA", "Ampere", "GPU", ["a40", "nvidia a40"]),
+    ("NVIDIA A30", "NVIDIA", "Ampere", "GPU", ["a30 gpu", "a30 gpus", "nvidia a30"]),
+    ("NVIDIA A10G", "NVIDIA", "Ampere", "GPU", ["a10g"]),
+    ("NVIDIA A10", "NVIDIA", "Ampere", "GPU", ["nvidia a10", "a10 gpu", "a10 gpus"]),
+    ("NVIDIA RTX A6000", "NVIDIA", "Ampere", "GPU", ["a6000", "rtx a6000", "quadro rtx a6000"]),
+    ("NVIDIA RTX A5000", "NVIDIA", "Ampere", "GPU", ["a5000", "rtx a5000"]),
+    ("NVIDIA RTX A4000", "NVIDIA", "Ampere", "GPU", ["a4000", "rtx a4000"]),
+    ("NVIDIA RTX 3090 Ti", "NVIDIA", "Ampere", "GPU", ["rtx 3090 ti", "geforce rtx 3090 ti"]),
+    ("NVIDIA RTX 3090", "NVIDIA", "Ampere", "GPU", ["rtx 3090", "geforce rtx 3090", "geforce 3090", "3090 gpu",
+                                                    "3090 gpus"]),
+    ("NVIDIA RTX 3080 Ti", "NVIDIA", "Ampere", "GPU", ["rtx 3080 ti", "geforce rtx 3080 ti"]),
+    ("NVIDIA RTX 3080", "NVIDIA", "Ampere", "GPU", ["rtx 3080", "geforce rtx 3080"]),
+    ("NVIDIA RTX 3070", "NVIDIA", "Ampere", "GPU", ["rtx 3070", "geforce rtx 3070"]),
+    ("NVIDIA RTX 3060", "NVIDIA", "Ampere", "GPU", ["rtx 3060", "geforce rtx 3060"]),
+    ("NVIDIA Titan RTX", "NVIDIA", "Turing", "GPU", ["titan rtx"]),
+    ("NVIDIA RTX 2080 Ti", "NVIDIA", "Turing", "GPU", ["rtx 2080 ti", "geforce rtx 2080 ti", "2080 ti", "2080ti"]),
+    ("NVIDIA RTX 2080", "NVIDIA", "Turing", "GPU", ["rtx 2080", "geforce rtx 2080"]),
+    ("NVIDIA RTX 2070", "NVIDIA", "Turing", "GPU", ["rtx 2070", "geforce rtx 2070"]),
+    ("NVIDIA Quadro RTX 8000", "NVIDIA", "Turing", "GPU", ["quadro rtx 8000", "rtx 8000"]),
+    ("NVIDIA Quadro RTX 6000", "NVIDIA", "Turing", "GPU", ["quadro rtx 6000"]),
+    ("NVIDIA T4", "NVIDIA", "Turing", "GPU", ["tesla t4", "nvidia t4", "t4 gpu", "t4 gpus"]),
+    ("NVIDIA V100", "NVIDIA", "Volta", "GPU", ["v100", "v100s", "tesla v100", "v100 sxm2", "v100 pcie"]),
+    ("NVIDIA Titan V", "NVIDIA", "Volta", "GPU", ["titan v"]),
+    ("NVIDIA P100", "NVIDIA", "Pascal", "GPU", ["p100", "tesla p100"]),
+    ("NVIDIA P40", "NVIDIA", "Pascal", "GPU", ["p40", "tesla p40"]),
+    ("NVIDIA Titan Xp", "NVIDIA", "Pascal", "GPU", ["titan xp", "titan x pascal"]),
+    ("NVIDIA Titan X", "NVIDIA", "Maxwell", "GPU", ["titan x", "gtx titan x"]),
+    ("NVIDIA GTX 1080 Ti", "NVIDIA", "Pascal", "GPU", ["gtx 1080 ti", "geforce gtx 1080 ti", "1080 ti", "1080ti"]),
+    ("NVIDIA GTX 1080", "NVIDIA", "Pascal", "GPU", ["gtx 1080", "geforce gtx 1080"]),
+    ("NVIDIA GTX 1070", "NVIDIA", "Pascal", "GPU", ["gtx 1070", "geforce gtx 1070"]),
+    ("NVIDIA GTX 1060", "NVIDIA", "Pascal", "GPU", ["gtx 1060", "geforce gtx 1060"]),
+    ("NVIDIA M40", "NVIDIA", "Maxwell", "GPU", ["m40", "tesla m40"]),
+    ("NVIDIA K80", "NVIDIA", "Kepler", "GPU", ["k80", "tesla k80"]),
+    ("NVIDIA K40", "NVIDIA", "Kepler", "GPU", ["k40", "tesla k40", "k40c"]),
+    ("NVIDIA Jetson AGX Orin", "NVIDIA", "Ampere", "Embedded GPU", ["jetson agx orin", "jetson orin"]),
+    ("NVIDIA Jetson AGX Xavier", "NVIDIA", "Volta", "Embedded GPU", ["jetson agx xavier", "jetson xavier"]),
+    ("NVIDIA Jetson TX2", "NVIDIA", "Pascal", "Embedded GPU", ["jetson tx2"]),
+    ("NVIDIA Jetson Nano", "NVIDIA", "Maxwell", "Embedded GPU", ["jetson nano"]),
+    ("AMD Instinct MI300X", "AMD", "CDNA 3", "GPU", ["mi300x", "instinct mi300x"]),
+    ("AMD Instinct MI250X", "AMD", "CDNA 2", "GPU", ["mi250x", "instinct mi250x"]),
+    ("AMD Instinct MI250", "AMD", "CDNA 2", "GPU", ["mi250", "instinct mi250"]),
+    ("AMD Instinct MI100", "AMD", "CDNA", "GPU", ["mi100", "instinct mi100"]),
+    ("AMD Instinct MI50", "AMD", "GCN 5", "GPU", ["mi50", "instinct mi50", "radeon instinct mi50"]),
+    ("AMD Radeon RX 6900 XT", "AMD", "RDNA 2", "GPU", ["rx 6900 xt", "radeon rx 6900 xt"]),
+    ("AMD Radeon VII", "AMD", "GCN 5", "GPU", ["radeon vii"]),
+    ("Google TPU v5e", "Google", "TPU v5", "TPU", ["tpu v5e", "tpuv5e", "cloud tpu v5e"]),
+    ("Google TPU v4", "Google", "TPU v4", "TPU", ["tpu v4", "tpuv4", "cloud tpu v4"]),
+    ("Google TPU v3", "Google", "TPU v3", "TPU", ["tpu v3", "tpuv3", "cloud tpu v3"]),
+    ("Google TPU v2", "Google", "TPU v2", "TPU", ["tpu v2", "tpuv2", "cloud tpu v2"]),
+    ("Google TPU", "Google", None, "TPU", ["tpu", "tpus", "cloud tpu", "cloud tpus"]),
+    ("Intel Gaudi2", "Intel", "Gaudi", "Accelerator", ["gaudi2", "habana gaudi2"]),
+    ("Intel Gaudi", "Intel", "Gaudi", "Accelerator", ["habana gaudi", "gaudi accelerator", "gaudi accelerators"]),
+    ("Intel Xeon", "Intel", None, "CPU", ["xeon", "intel xeon"]),
+    ("AMD EPYC", "AMD", None, "CPU", ["epyc", "amd epyc"]),
+    ("Apple M1", "Apple", "Apple M1", "SoC", ["apple m1", "m1 max", "m1 pro", "m1 ultra"]),
+    ("Apple M2", "Apple", "Apple M2", "SoC", ["apple m2", "m2 max", "m2 pro", "m2 ultra"]),
+]
+BRAND_PREFIXES = {"NVIDIA": "nvidia", "AMD": "amd"}
+
+# Letter runs, digit runs (with decimals) and the multiplication sign
+TOKEN = re.compile(r"[a-z]+|\d+(?:\.\d+)?|×")
+# Gap classes between two tokens: joined, hyphenated, spaced, opening bracket or comma, anything else
+JOINED, HYPHEN, SPACE, OPEN, BREAK = "", "-", " ", "(", "|"
+# Gaps an alias allows where it is written joined ("a100") or spaced ("rtx 3090")
+TIGHT = frozenset((JOINED, HYPHEN))
+LOOSE = frozenset((JOINED, HYPHEN, SPACE))
+
+MEMORY_UNITS = {"gb": 1, "gib": 1, "tb": 1024}
+TIMES = ("x", "×")
+NUMBER_WORDS = {"single": 1, "one": 1, "dual": 2, "two": 2, "three": 3, "quad": 4, "four": 4, "five": 5, "six": 6,
+                "seven": 7, "eight": 8, "ten": 10, "twelve": 12, "sixteen": 16}
+MAX_COUNT = 16384
+# A bare number after these words numbers the reference, not devices ("Table 1 V100", "Section 4 T4 GPUs")
+REFERENCE_WORDS = frozenset(("table", "tab", "figure", "fig", "section", "sec", "eq", "equation", "appendix",
+                             "chapter", "algorithm", "alg", "step", "stage", "phase", "version", "ver",
+                             "experiment", "exp", "setting", "case", "row", "column", "line", "page", "no", "id"))
+MAX_MEMORY_GB = 4096
+
+RECORD_FIELDS = ["paper_id", "year", "country", "organization", "topic", "hardware", "brand", "generation",
+                 "device_type", "memory", "count"]
+PASSTHROUGH_FIELDS = ["year", "country", "organization", "topic"]
+DEFAULT_TEXT_FIELDS = ["title", "abstract", "text"]
+
+
+def _gap(text, end, start):
+    """Gap class of the text between two tokens."""
+    if start == end:
+        return JOINED
+    gap = text[end:start]
+    stripped = gap.strip()
+    if not stripped:
+        return SPACE
+    if len(gap) == 1 and gap in "-–_/":
+        return HYPHEN
+    if stripped in ("(", "[", ","):
+        return OPEN
+    return BREAK
+
+
+class _Node:
+    __slots__ = ("children", "gaps", "device")
+
+    def __init__(self, gaps=TIGHT):
+        self.children = {}
+        self.gaps = gaps  # gap classes allowed before this node's token
+        self.device = None
+
+
+class DeviceMatcher:
+    """Token trie over every alias of ``devices``, matching longest-leftmost."""
+
+    def __init__(self, devices=DEVICES):
+        self.devices = [{"hardware": model, "brand": brand, "generation": generation, "device_type": device_type}
+                        for model, brand, generation, device_type, _ in devices]
+        self.root = _Node()
+        for index, (_, brand, _, _, aliases) in enumerate(devices):
+            prefix = BRAND_PREFIXES.get(brand)
+            for alias in aliases:
+                self.add(alias, index)
+                if prefix and not alias.startswith(prefix):
+                    self.add(f"{prefix} {alias}", index)
+
+    def add(self, alias, index):
+        """Add an alias of the device at ``index``; where it is written joined, the text must be too."""
+        alias = alias.lower()
+        node, end = self.root, None
+        for match in TOKEN.finditer(alias):
+            gaps = LOOSE if end is None or _gap(alias, end, match.start()) != JOINED else TIGHT
+            child = node.children.get(match.group())
+            if child is None:
+                child = node.children[match.group()] = _Node(gaps)
+            else:
+                child.gaps = child.gaps | gaps
+            node, end = child, match.end()
+        # The first alias listed wins where two devices share one
+        if node.device is None:
+            node.device = index
+
+    def find(self, text):
+        """``[(start, end, device index, memory_gb, count)]`` of the devices mentioned in ``text``."""
+        text = text.lower()
+        tokens = list(TOKEN.finditer(text))
+        children = self.root.children
+        found = []
+        i, n = 0, len(tokens)
+        while i < n:
+            node = children.get(tokens[i][0])
+            if node is None:
+                i += 1
+                continue
+            best = (i, node.device) if node.device is not None else None
+            j = i + 1
+            while j < n:
+                child = node.children.get(tokens[j][0])
+                if child is None or _gap(text, tokens[j - 1].end(), tokens[j].start()) not in child.gaps:
+                    break
+                node = child
+                if node.device is not None:
+                    best = (j, node.device)
+                j += 1
+            if best is None:
+                i += 1
+                continue
+            last, device = best
+            memory, count = _context(text, tokens, i, last)
+            found.append((tokens[i].start(), tokens[last].end(), device, memory, count))
+            i = last + 1
+        return found
+
+    def extract(self, text):
+        """Distinct ``{"hardware", "brand", "generation", "device_type", "memory", "count"}`` mentions.
+
+        A device's bare mentions are dropped when another mention of it
+        carries a memory size or count.
+        """
+        mentions = {}
+        for _, _, device, memory, count in self.find(text):
+            mentions.setdefault(device, set()).add((memory, count))
+        records = []
+        for device, details in mentions.items():
+            if len(details) > 1:
+                details.discard((None, None))
+            for memory, count in sorted(details, key=lambda detail: (detail[0] or 0, detail[1] or 0)):
+                records.append(dict(self.devices[device], memory=None if memory is None else f"{memory}GB",
+                                    count=count))
+        return records
+
+
+def _number(token):
+    if token.isdigit():
+        return int(token)
+    return NUMBER_WORDS.get(token)
+
+
+def _memory(tokens, k, text):
+    """Memory in GB of the "<number> <unit>" starting at token ``k``, or None."""
+    if k + 1 >= len(tokens) or not tokens[k][0].replace(".", "", 1).isdigit():
+        return None
+    unit = MEMORY_UNITS.get(tokens[k + 1][0])
+    if unit is None or _gap(text, tokens[k].end(), tokens[k + 1].start()) not in (JOINED, SPACE):
+        return None
+    gb = float(tokens[k][0]) * unit
+    return int(gb) if 0 < gb <= MAX_MEMORY_GB and gb == int(gb) else None
+
+
+def _context(text, tokens, first, last):
+    """``(memory_gb, count)`` written around the match of tokens ``first`` to ``last``."""
+    n = len(tokens)
+    memory = count = None
+    after = last + 1
+    # "A100 80GB", "A100-80GB", "A100 (80 GB)"
+    if after < n and _gap(text, tokens[last].end(), tokens[after].start()) != BREAK:
+        memory = _memory(tokens, after, text)
+        if memory is not None:
+            after += 2
+    # "V100 x8", "V100 × 8"
+    if after + 1 < n and tokens[after][0] in TIMES and tokens[after + 1][0].isdigit() and \
+            _gap(text, tokens[after - 1].end(), tokens[after].start()) in (JOINED, SPACE):
+        count = int(tokens[after + 1][0])
+
+    before = first
+    # "32GB V100"
+    if memory is None and before >= 2 and _gap(text, tokens[before - 1].end(), tokens[before].start()) in LOOSE:
+        memory = _memory(tokens, before - 2, text)
+        if memory is not None:
+            before -= 2
+    # "8x V100", "8 × V100", "8 V100", "dual RTX 3090"
+    if count is None and before >= 1 and _gap(text, tokens[before - 1].end(), tokens[before].start()) in LOOSE:
+        previous = tokens[before - 1][0]
+        if previous in TIMES and before >= 2 and \
+                _gap(text, tokens[before - 2].end(), tokens[before - 1].start()) in (JOINED, SPACE):
+            count = _number(tokens[before - 2][0])
+        elif previous not in TIMES and (before < 2 or
+                                        _gap(text, tokens[before - 2].end(), tokens[before - 1].start()) != HYPHEN):
+            count = _number(previous)
+            # A bare number in front may be a year ("in 2020 V100 GPUs were ...") or a reference
+            if count is not None and previous.isdigit() and (
+                    1900 <= count <= 2100 or (before >= 2 and tokens[before - 2][0] in REFERENCE_WORDS)):
+                count = None
+    if count is not None and not 1 <= count <= MAX_COUNT:
+        count = None
+    return memory, count
+
+
+# One matcher per worker process, built by the pool initializer
+_matcher = None
+
+
+def _init_worker():
+    global _matcher
+    _matcher = DeviceMatcher()
+
+
+def extract_records(documents, matcher):
+    """Entity records of ``[(paper_id, passthrough fields, text)]``."""
+    records = []
+    for paper_id, fields, text in documents:
+        for mention in matcher.extract(text):
+            records.append(dict(fields, paper_id=paper_id, **mention))
+    return records
+
+
+def _extract_batch(documents):
+    return extract_records(documents, _matcher)
+
+
+def _read_rows(source_path):
+    extension = os.path.splitext(source_path)[1].lower()
+    if extension == ".parquet":
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(source_path).iter_batches(batch_size=4096):
+            yield from batch.to_pylist()
+        return
+    with open(source_path, "r", encoding="utf-8", newline="") as f:
+        if extension in (".jsonl", ".json"):
+            yield from (json.loads(line) for line in f if line.strip())
+        else:
+            yield from csv.DictReader(f)
+
+
+def read_documents(source_path, text_fields):
+    """Stream ``(paper_id, passthrough fields, text)`` from a .jsonl, .csv or .parquet document file."""
+    for row in _read_rows(source_path):
+        if row.get("paper_id") in (None, ""):
+            raise ValueError(f"Document without a paper_id in {source_path}")
+        text = "\n".join(str(row[field]) for field in text_fields if row.get(field))
+        fields = {field: row[field] for field in PASSTHROUGH_FIELDS if row.get(field) not in (None, "")}
+        yield str(row["paper_id"]), fields, text
+
+
+def _batches(documents, batch_size):
+    batch = []
+    for document in documents:
+        batch.append(document)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def extract_stream(documents, workers=1, batch_size=256):
+    """Yield ``(documents, records)`` per batch of ``documents``, in input order.
+
+    With ``workers`` > 1 the batches are spread over a process pool, with at
+    most two per worker in flight so the input is streamed, not loaded.
+    """
+    if workers <= 1:
+        matcher = DeviceMatcher()
+        for batch in _batches(documents, batch_size):
+            yield len(batch), extract_records(batch, matcher)
+        return
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        pending = deque()
+        for batch in _batches(documents, batch_size):
+            pending.append((len(batch), pool.submit(_extract_batch, batch)))
+            if len(pending) >= 2 * workers:
+                size, future = pending.popleft()
+                yield size, future.result()
+        while pending:
+            size, future = pending.popleft()
+            yield size, future.result()
+
+
+class RecordWriter:
+    """Writes records to .csv or .jsonl as they come, or to .parquet on close.
+
+    The output appears only on ``close()``; ``abort()`` discards what was written.
+    """
+
+    def __init__(self, output_path):
+        self.output_path = output_path
+        self.extension = os.path.splitext(output_path)[1].lower()
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+        self._rows = []
+        self._file = None
+        if self.extension != ".parquet":
+            self._file = open(output_path + ".tmp", "w", encoding="utf-8", newline="")
+            if self.extension != ".jsonl":
+                self._csv = csv.DictWriter(self._file, fieldnames=RECORD_FIELDS)
+                self._csv.writeheader()
+
+    def write(self, records):
+        if self.extension == ".parquet":
+            self._rows.extend(records)
+        elif self.extension == ".jsonl":
+            self._file.writelines(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+        else:
+            self._csv.writerows(records)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+        else:
+            import pandas as pd
+            pd.DataFrame(self._rows, columns=RECORD_FIELDS).to_parquet(self.output_path + ".tmp", index=False)
+        os.replace(self.output_path + ".tmp", self.output_path)
+
+    def abort(self):
+        """Discard the records written so far, leaving any previous output file as it was."""
+        self._rows = []
+        if self._file is not None:
+            self._file.close()
+            if os.path.exists(self.output_path + ".tmp"):
+                os.remove(self.output_path + ".tmp")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Extract normalized hardware mentions from paper text.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    extract_parser = subparsers.add_parser("extract", help="extract entity records from a document file")
+    extract_parser.add_argument("source", help="documents as .jsonl, .csv or .parquet")
+    extract_parser.add_argument("--output", default=os.path.join("build", "hardware_records.csv"),
+                                help="records file (.csv, .jsonl or .parquet)")
+    extract_parser.add_argument("--text", nargs="+", default=DEFAULT_TEXT_FIELDS, help="document fields to scan")
+    extract_parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1, help="worker processes")
+    extract_parser.add_argument("--batch-size", type=int, default=256, help="documents per worker task")
+    match_parser = subparsers.add_parser("match", help="show the mentions found in a piece of text")
+    match_parser.add_argument("text")
+    args = parser.parse_args(argv)
+
+    if args.command == "match":
+        matcher = DeviceMatcher()
+        for start, end, device, memory, count in matcher.find(args.text):
+            details = ", ".join(part for part in (memory and f"{memory}GB", count and f"count {count}") if part)
+            print(f"{args.text[start:end]!r:28} -> {matcher.devices[device]['hardware']}"
+                  f"{' (' + details + ')' if details else ''}")
+        return 0
+
+    start = time.perf_counter()
+    documents = mentions = 0
+    writer = RecordWriter(args.output)
+    try:
+        for size, records in extract_stream(read_documents(args.source, args.text), args.jobs, args.batch_size):
+            writer.write(records)
+            documents += size
+            mentions += len(records)
+    except BaseException:
+        # A truncated records file must not pass for a complete one
+        writer.abort()
+        raise
+    writer.close()
+    elapsed = time.perf_counter() - start
+    print(f"Extracted {mentions:,} hardware records from {documents:,} documents in {elapsed:.1f}s "
+          f"({documents / max(elapsed, 1e-9):,.0f} documents/s) into {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
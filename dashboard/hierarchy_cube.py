@@ -0,0 +1,206 @@
+"""Hierarchy cubes: hierarchical figures stored node by node for lazy drill-down.
+
+Sunburst, treemap and icicle figures ship every node of their hierarchy up
+front. A cube keeps each node's subtree total, colour and hover data in a
+chunk holding its direct children, so a view loads only the levels around
+the node being looked at and deeper levels are read when the user drills
+in. Figures using Plotly's default ``branchvalues="remainder"`` are
+converted to totals when the cube is built, so cut-off levels still count
+toward their ancestors.
+
+Build the cubes from the repository root:
+
+    python -m dashboard.hierarchy_cube      # writes build/hierarchy.store
+
+The file uses the figure store format (see dashboard/figure_store.py); its
+keys are ``<figure key>#meta``, ``<figure key>#root`` for the top level and
+``<figure key>#<node index>`` for the children of a node.
+"""
+
+import argparse
+import os
+import sys
+
+from dashboard.figure_store import FigureStore, extract_figure, store_key, write_store
+
+HIERARCHY_TYPES = ("sunburst", "treemap", "icicle")
+ROOT = "root"
+
+# Per-node trace arrays carried into the chunks, by node field
+_NODE_FIELDS = {"id": ("ids",), "label": ("labels",), "value": ("values",), "customdata": ("customdata",),
+                "text": ("text",), "hovertext": ("hovertext",), "color": ("marker", "colors")}
+
+
+def hierarchy_trace(spec):
+    """Return the hierarchical trace of a single-trace figure with ids and parents, or None."""
+    if spec is None or len(spec["data"]) != 1:
+        return None
+    trace = spec["data"][0]
+    if trace.get("type") not in HIERARCHY_TYPES or not trace.get("ids") or not trace.get("parents"):
+        return None
+    return trace
+
+
+def _node_array(trace, path):
+    value = trace
+    for key in path:
+        value = value.get(key) if isinstance(value, dict) else None
+    return value if isinstance(value, list) and len(value) == len(trace["ids"]) else None
+
+
+def subtree_totals(values, children):
+    """Each node's value plus those of all its descendants (missing values count as 0).
+
+    ``children`` maps a node index (or ``ROOT``) to its child indices.
+    """
+    totals = [value or 0 for value in values]
+    order, level = [], children.get(ROOT, [])
+    while level:
+        order.extend(level)
+        level = [child for index in level for child in children.get(index, ())]
+    # Deepest nodes first, so every child is complete before its parent adds it
+    for index in reversed(order):
+        for child in children.get(index, ()):
+            totals[index] += totals[child]
+    return totals
+
+
+def cube_chunks(figure_key, spec):
+    """Return the ``{chunk key: chunk}`` cube of a hierarchical figure, or {} for other figures.
+
+    Node values are subtree totals (``branchvalues="total"``), so a view
+    showing only the upper levels still sizes every sector by its whole subtree.
+    """
+    trace = hierarchy_trace(spec)
+    if trace is None:
+        return {}
+    arrays = {field: _node_array(trace, path) for field, path in _NODE_FIELDS.items()}
+    arrays = {field: values for field, values in arrays.items() if values is not None}
+    index_of = {node_id: index for index, node_id in enumerate(trace["ids"])}
+
+    children = {}
+    for index, parent in enumerate(trace["parents"]):
+        # Parents missing from ids are drawn as roots by Plotly too
+        parent_index = index_of.get(parent, ROOT) if parent else ROOT
+        children.setdefault(parent_index, []).append(index)
+
+    if "value" in arrays and trace.get("branchvalues", "remainder") == "remainder":
+        # A "remainder" value excludes the node's descendants, so a view that cuts off
+        # deeper levels would lose them; store subtree totals and draw with "total"
+        arrays["value"] = subtree_totals(arrays["value"], children)
+        trace = dict(trace, branchvalues="total")
+
+    def node(index):
+        record = {field: values[index] for field, values in arrays.items()}
+        record["i"] = index
+        record["children"] = len(children.get(index, ()))
+        return record
+
+    depth, level = 0, children.get(ROOT, [])
+    while level:
+        depth += 1
+        level = [child for index in level for child in children.get(index, ())]
+
+    base_trace = {key: value for key, value in trace.items() if key not in ("ids", "labels", "parents", "values",
+                                                                            "customdata", "text", "hovertext")}
+    if "marker" in base_trace:
+        base_trace["marker"] = {key: value for key, value in trace["marker"].items() if key != "colors"}
+    chunks = {f"{figure_key}#meta": {"trace": base_trace, "layout": spec["layout"], "config": spec["config"],
+                                     "nodes": len(trace["ids"]), "depth": depth}}
+    for parent_index, child_indices in children.items():
+        chunks[f"{figure_key}#{parent_index}"] = {"children": [node(index) for index in child_indices]}
+    return chunks
+
+
+def build_cubes(file_paths, output_path):
+    """Write the cubes of every hierarchical figure in ``file_paths``; return the figure keys."""
+    chunks = {}
+    figure_keys = []
+    for file_path in file_paths:
+        if not os.path.exists(file_path):
+            continue
+        with open(file_path, "r", encoding="utf-8") as f:
+            figure_chunks = cube_chunks(store_key(file_path), extract_figure(f.read()))
+        if figure_chunks:
+            chunks.update(figure_chunks)
+            figure_keys.append(store_key(file_path))
+    write_store(chunks, output_path)
+    return figure_keys
+
+
+class HierarchyCube:
+    """Read-only view of a cube file; assembles sunburst specs around one node."""
+
+    def __init__(self, path):
+        self.path = path
+        self._store = FigureStore(path)
+
+    def __contains__(self, figure_key):
+        return f"{store_key(figure_key)}#meta" in self._store
+
+    def meta(self, figure_key):
+        return self._store.get(f"{store_key(figure_key)}#meta")
+
+    def children(self, figure_key, node_index=ROOT):
+        """Child nodes of a node (of the top level for ``ROOT``)."""
+        key = f"{store_key(figure_key)}#{node_index}"
+        return self._store.get(key)["children"] if key in self._store else []
+
+    def view(self, figure_key, root=None, node_budget=500):
+        """Build the figure spec of the hierarchy below ``root`` (a node dict, or None for the top).
+
+        Whole levels are added while the view stays within ``node_budget``
+        nodes (at least one level is always shown). Returns ``(spec, nodes)``
+        where ``nodes`` maps each shown node index to ``(node, path)`` - its
+        record and the chain of node records from below ``root`` down to it.
+        """
+        meta = self.meta(figure_key)
+        shown = [] if root is None else [(root, None)]
+        nodes = {}
+        level = [(node, [node]) for node in self.children(figure_key, ROOT if root is None else root["i"])]
+        while level:
+            for node, path in level:
+                shown.append((node, path[-2]["id"] if len(path) > 1 else (None if root is None else root["id"])))
+                nodes[node["i"]] = (node, path)
+            expandable = [(node, path) for node, path in level if node["children"]]
+            if len(shown) + sum(node["children"] for node, _ in expandable) > node_budget:
+                break
+            level = [(child, path + [child]) for node, path in expandable for child in self.children(figure_key, node["i"])]
+
+        trace = dict(meta["trace"])
+        trace["ids"] = [node["id"] for node, _ in shown]
+        trace["parents"] = [parent or "" for _, parent in shown]
+        for field, path in _NODE_FIELDS.items():
+            if field == "id" or not all(field in node for node, _ in shown):
+                continue
+            values = [node[field] for node, _ in shown]
+            if path == ("marker", "colors"):
+                trace["marker"] = dict(trace.get("marker", {}), colors=values)
+            else:
+                trace[path[0]] = values
+        return {"data": [trace], "layout": meta["layout"], "config": meta["config"]}, nodes
+
+    def close(self):
+        self._store.close()
+
+
+def main(argv=None):
+    from dashboard.config import AUTO_DISCOVER_FIGURES, BASE_PATHS, HIERARCHY_CUBE_PATH, VISUALIZATIONS
+    from dashboard.manifest import VisualizationManifest
+
+    parser = argparse.ArgumentParser(description="Build drill-down cubes of the hierarchical figures.")
+    parser.add_argument("--output", default=HIERARCHY_CUBE_PATH, help="cube file to write")
+    args = parser.parse_args(argv)
+
+    manifest = VisualizationManifest(VISUALIZATIONS, BASE_PATHS, discover=AUTO_DISCOVER_FIGURES)
+    file_paths = list(dict.fromkeys(config["file_path"] for config in manifest.visualizations.values()))
+    figure_keys = build_cubes(file_paths, args.output)
+    print(f"Built cubes for {len(figure_keys)} hierarchical figures in {args.output} "
+          f"({os.path.getsize(args.output) / 1024:.0f} KB)")
+    for figure_key in figure_keys:
+        print(f"  {figure_key}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,386 @@
+"""Concurrent-session load test: how many viewers one app process serves before reruns queue up.
+
+Starts the app on a free local port (or targets a running server with
+``--url``) and drives ``--sessions`` simulated browser tabs against it:
+
+    python -m dashboard.loadtest --sessions 20 --duration 60
+    python -m dashboard.loadtest --sessions 50 --url http://localhost:8501 --output build/loadtest.json
+
+Each session speaks Streamlit's websocket protocol (protobuf ``BackMsg`` /
+``ForwardMsg`` on ``/_stcore/stream``) the way a browser does: it reads the
+widgets each run renders and, after a think time, switches category, opens
+a figure tab, loads a figure or clicks a size preset by sending the widget
+states a browser would send. A rerun's latency runs from the request to its
+``script_finished`` message, so it includes the time spent queued behind
+other sessions' reruns.
+
+The report gives p50/p95/p99 latency per action and overall, reruns per
+second, and a timeline of throughput, latency and the server's CPU and RSS.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+try:
+    from websockets.asyncio.client import connect as websocket_connect
+except ImportError:  # installed with Streamlit's server; checked in main()
+    websocket_connect = None
+
+try:
+    import psutil
+except ImportError:  # psutil is optional; /proc is read on Linux without it
+    psutil = None
+
+# Relative frequency of each user action (when the current page offers it)
+ACTION_WEIGHTS = {"category": 3, "tab": 4, "load": 2, "size": 2}
+RERUN_TIMEOUT = 120
+SERVER_START_TIMEOUT = 60
+FINISHED = (ForwardMsg.FINISHED_SUCCESSFULLY, ForwardMsg.FINISHED_WITH_COMPILE_ERROR,
+            ForwardMsg.FINISHED_FRAGMENT_RUN_SUCCESSFULLY)
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank ``q`` percentile (0-100) of ascending values; None for no values."""
+    if not sorted_values:
+        return None
+    rank = max(int(round(q / 100 * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def latency_summary(latencies):
+    latencies = sorted(latencies)
+    return {"count": len(latencies), "p50": percentile(latencies, 50), "p95": percentile(latencies, 95),
+            "p99": percentile(latencies, 99), "max": latencies[-1] if latencies else None}
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(app_path, port, log_path):
+    """Start ``streamlit run`` on ``port`` and wait until it is healthy; return the process."""
+    command = [sys.executable, "-m", "streamlit", "run", app_path, "--server.port", str(port),
+               "--server.headless", "true", "--browser.gatherUsageStats", "false"]
+    with open(log_path, "w") as log:
+        process = subprocess.Popen(command, stdout=log, stderr=subprocess.STDOUT)
+    deadline = time.monotonic() + SERVER_START_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"streamlit exited with {process.returncode}; see {log_path}")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1) as response:
+                if response.status == 200:
+                    return process
+        except OSError:
+            pass
+        time.sleep(0.25)
+    process.terminate()
+    raise RuntimeError(f"streamlit did not become healthy within {SERVER_START_TIMEOUT}s; see {log_path}")
+
+
+class ProcessSampler:
+    """Samples a process's CPU (% of one core) and RSS on a background thread."""
+
+    def __init__(self, pid, interval=1.0):
+        self.pid = pid
+        self.interval = interval
+        self.samples = []  # (seconds since start, cpu_percent, rss_bytes)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="loadtest-sampler", daemon=True)
+        self._process = psutil.Process(pid) if psutil is not None else None
+
+    def _read(self):
+        """``(cpu_seconds, rss_bytes)`` of the process, or None when it cannot be read."""
+        if self._process is not None:
+            times = self._process.cpu_times()
+            return times.user + times.system, self._process.memory_info().rss
+        try:
+            with open(f"/proc/{self.pid}/stat", "r") as f:
+                # Fields after the parenthesized command name; utime and stime are the 12th and 13th
+                fields = f.read().rsplit(")", 1)[1].split()
+            with open(f"/proc/{self.pid}/statm", "r") as f:
+                resident_pages = int(f.read().split()[1])
+        except OSError:
+            return None
+        ticks = os.sysconf("SC_CLK_TCK")
+        return (int(fields[11]) + int(fields[12])) / ticks, resident_pages * os.sysconf("SC_PAGE_SIZE")
+
+    def _run(self):
+        start = time.monotonic()
+        previous = self._read()
+        previous_time = start
+        while not self._stop.wait(self.interval):
+            current = self._read()
+            now = time.monotonic()
+            if current is None or previous is None:
+                previous, previous_time = current, now
+                continue
+            cpu_percent = 100.0 * (current[0] - previous[0]) / (now - previous_time)
+            self.samples.append((now - start, cpu_percent, current[1]))
+            previous, previous_time = current, now
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+
+class SimulatedSession:
+    """One browser tab: renders the app and interacts with the widgets it shows."""
+
+    def __init__(self, index, url, rng, think_time):
+        self.index = index
+        self.url = url
+        self.rng = rng
+        self.think_time = think_time
+        self.page_script_hash = ""
+        self.values = {}   # widget id -> (WidgetState field, value) sent with every rerun
+        self.widgets = {}  # widget id -> {"kind", "fragment_id", "options"} rendered by the last runs
+        self._containers = {}  # delta path of a tab container -> its widget id
+
+    def _record_delta(self, message):
+        delta = message.delta
+        path = tuple(message.metadata.delta_path)
+        kind = delta.WhichOneof("type")
+        if kind == "add_block":
+            block_kind = delta.add_block.WhichOneof("type")
+            if block_kind == "tab_container" and delta.add_block.tab_container.id:
+                widget_id = delta.add_block.tab_container.id
+                self._containers[path] = widget_id
+                self.widgets[widget_id] = {"kind": "tab", "fragment_id": delta.fragment_id, "options": []}
+            elif block_kind == "tab" and path[:-1] in self._containers:
+                self.widgets[self._containers[path[:-1]]]["options"].append(delta.add_block.tab.label)
+            return None
+        if kind != "new_element":
+            return None
+        element_kind = delta.new_element.WhichOneof("type")
+        if element_kind == "exception":
+            return delta.new_element.exception.message or "exception"
+        if element_kind == "button" and "-load_" in delta.new_element.button.id:
+            self.widgets[delta.new_element.button.id] = {"kind": "load", "fragment_id": delta.fragment_id}
+        elif element_kind == "slider" and "-height_" in delta.new_element.slider.id:
+            self.widgets[delta.new_element.slider.id] = {"kind": "size", "fragment_id": delta.fragment_id,
+                                                         "options": list(delta.new_element.slider.options)}
+        return None
+
+    async def rerun(self, websocket, fragment_id="", trigger=None):
+        """Request a rerun and read its messages until it finishes; return ``(seconds, error)``."""
+        message = BackMsg()
+        state = message.rerun_script
+        state.query_string = ""
+        state.page_script_hash = self.page_script_hash
+        if fragment_id:
+            state.fragment_id = fragment_id
+        for widget_id, (field, value) in self.values.items():
+            widget = state.widget_states.widgets.add()
+            widget.id = widget_id
+            if field == "string_array_value":
+                widget.string_array_value.data.extend(value)
+            else:
+                setattr(widget, field, value)
+        if trigger is not None:
+            widget = state.widget_states.widgets.add()
+            widget.id = trigger
+            widget.trigger_value = True
+
+        # What this run renders replaces what the last run of its scope rendered
+        self.widgets = {widget_id: widget for widget_id, widget in self.widgets.items()
+                        if fragment_id and widget["fragment_id"] != fragment_id}
+        self._containers = {}
+        start = time.perf_counter()
+        await websocket.send(message.SerializeToString())
+        error = None
+        while True:
+            forward = ForwardMsg()
+            forward.ParseFromString(await asyncio.wait_for(websocket.recv(), RERUN_TIMEOUT))
+            kind = forward.WhichOneof("type")
+            if kind == "new_session":
+                self.page_script_hash = forward.new_session.page_script_hash
+            elif kind == "delta":
+                error = self._record_delta(forward) or error
+            elif kind == "script_finished" and forward.script_finished in FINISHED:
+                return time.perf_counter() - start, error
+
+    def next_action(self):
+        """``(action, fragment_id, trigger)`` for a random action the page offers, after updating ``values``."""
+        choices = {"category": [], "tab": [], "load": [], "size": []}
+        for widget_id, widget in self.widgets.items():
+            if widget["kind"] == "tab":
+                # The first tab container is the category bar; later ones hold figure tabs
+                choices["category" if widget_id.endswith("-category_tabs") else "tab"].append(widget_id)
+            else:
+                choices[widget["kind"]].append(widget_id)
+        actions = [action for action, widget_ids in choices.items() if widget_ids]
+        if not actions:
+            return "reload", "", None
+        action = self.rng.choices(actions, weights=[ACTION_WEIGHTS[action] for action in actions])[0]
+        widget_id = self.rng.choice(choices[action])
+        widget = self.widgets[widget_id]
+        if action == "load":
+            return action, widget["fragment_id"], widget_id
+        if action == "size":
+            self.values[widget_id] = ("string_array_value", [self.rng.choice(widget["options"])])
+        elif widget["options"]:
+            self.values[widget_id] = ("string_value", self.rng.choice(widget["options"]))
+        return action, widget["fragment_id"], None
+
+    async def run(self, deadline, records):
+        """Browse until ``deadline`` (monotonic), appending ``(time, session, action, seconds, error)`` to ``records``."""
+        stream_url = self.url.replace("http", "ws", 1).rstrip("/") + "/_stcore/stream"
+        async with websocket_connect(stream_url, subprotocols=["streamlit"], max_size=None) as websocket:
+            action, fragment_id, trigger = "initial", "", None
+            while True:
+                try:
+                    seconds, error = await self.rerun(websocket, fragment_id, trigger)
+                except asyncio.TimeoutError:
+                    seconds, error = RERUN_TIMEOUT, "timeout"
+                records.append((time.monotonic(), self.index, action, seconds, error))
+                if error == "timeout":
+                    return
+                think = self.rng.uniform(0.5, 1.5) * self.think_time
+                if time.monotonic() + think >= deadline:
+                    return
+                await asyncio.sleep(think)
+                action, fragment_id, trigger = self.next_action()
+
+
+async def run_sessions(url, sessions, duration, ramp_up, think_time, seed):
+    """Run the sessions (started evenly over ``ramp_up`` seconds); return ``(records, failures)``."""
+    records = []
+    deadline = time.monotonic() + duration
+
+    async def start(index):
+        await asyncio.sleep(ramp_up * index / max(sessions, 1))
+        await SimulatedSession(index, url, random.Random(seed + index), think_time).run(deadline, records)
+
+    results = await asyncio.gather(*(start(index) for index in range(sessions)), return_exceptions=True)
+    failures = [f"session {index}: {type(result).__name__}: {result}"
+                for index, result in enumerate(results) if isinstance(result, Exception)]
+    return records, failures
+
+
+def summarize(records, samples, started, elapsed, interval):
+    """Latency percentiles per action and a timeline of throughput, latency, CPU and RSS."""
+    ok = [record for record in records if record[4] is None]
+    by_action = {}
+    for record in ok:
+        by_action.setdefault(record[2], []).append(record[3])
+    timeline = []
+    for window_start in range(0, int(elapsed) + 1, interval):
+        window = [record[3] for record in ok if window_start <= record[0] - started < window_start + interval]
+        window_samples = [sample for sample in samples if window_start <= sample[0] < window_start + interval]
+        timeline.append({
+            "t": window_start,
+            "reruns_per_second": len(window) / interval,
+            "p95": percentile(sorted(window), 95),
+            "cpu_percent": max((sample[1] for sample in window_samples), default=None),
+            "rss_mb": max((sample[2] for sample in window_samples), default=0) / 1024 / 1024 or None,
+        })
+    return {
+        "elapsed": elapsed,
+        "reruns": len(ok),
+        "errors": len(records) - len(ok),
+        "throughput": len(ok) / elapsed if elapsed else 0.0,
+        "latency": latency_summary([record[3] for record in ok]),
+        "by_action": {action: latency_summary(latencies) for action, latencies in sorted(by_action.items())},
+        "timeline": timeline,
+        "peak_cpu_percent": max((sample[1] for sample in samples), default=None),
+        "peak_rss_mb": max((sample[2] for sample in samples), default=0) / 1024 / 1024 or None,
+    }
+
+
+def _ms(seconds):
+    return "      -" if seconds is None else f"{seconds * 1000:7.0f}"
+
+
+def print_report(report, sessions):
+    print(f"{sessions} sessions, {report['elapsed']:.0f}s: {report['reruns']} reruns "
+          f"({report['throughput']:.1f}/s), {report['errors']} errors")
+    print(f"{'action':10} {'count':>6} {'p50 ms':>7} {'p95 ms':>7} {'p99 ms':>7} {'max ms':>7}")
+    for action, summary in list(report["by_action"].items()) + [("all", report["latency"])]:
+        print(f"{action:10} {summary['count']:6d} {_ms(summary['p50'])} {_ms(summary['p95'])} "
+              f"{_ms(summary['p99'])} {_ms(summary['max'])}")
+    print(f"\n{'t (s)':>6} {'reruns/s':>9} {'p95 ms':>7} {'cpu %':>6} {'rss MB':>7}")
+    for row in report["timeline"]:
+        cpu = "     -" if row["cpu_percent"] is None else f"{row['cpu_percent']:6.0f}"
+        rss = "      -" if row["rss_mb"] is None else f"{row['rss_mb']:7.0f}"
+        print(f"{row['t']:6d} {row['reruns_per_second']:9.1f} {_ms(row['p95'])} {cpu} {rss}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the dashboard with concurrent simulated sessions.")
+    parser.add_argument("--sessions", type=int, default=10, help="concurrent browser sessions")
+    parser.add_argument("--duration", type=float, default=60, help="seconds to run")
+    parser.add_argument("--ramp-up", type=float, default=10, help="seconds over which sessions start")
+    parser.add_argument("--think-time", type=float, default=2.0, help="mean pause between a session's actions")
+    parser.add_argument("--url", help="target a running server instead of starting one")
+    parser.add_argument("--pid", type=int, help="server process to sample with --url")
+    parser.add_argument("--app", default="app.py", help="app script to start")
+    parser.add_argument("--interval", type=int, default=5, help="timeline resolution in seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="also write the report as JSON")
+    args = parser.parse_args(argv)
+
+    if websocket_connect is None:
+        parser.error("the load test needs the websockets package (pip install websockets)")
+
+    server = None
+    url, pid = args.url, args.pid
+    if url is None:
+        port = free_port()
+        log_path = os.path.join("build", "loadtest_server.log")
+        os.makedirs("build", exist_ok=True)
+        server = start_server(args.app, port, log_path)
+        url, pid = f"http://127.0.0.1:{port}", server.pid
+        print(f"Started {args.app} on {url} (pid {pid}, log {log_path})")
+
+    sampler = ProcessSampler(pid) if pid else None
+    try:
+        if sampler is not None:
+            sampler.start()
+        started = time.monotonic()
+        client_cpu = time.process_time()
+        records, failures = asyncio.run(run_sessions(url, args.sessions, args.duration, args.ramp_up,
+                                                     args.think_time, args.seed))
+        elapsed = time.monotonic() - started
+        client_cpu = time.process_time() - client_cpu
+    finally:
+        if sampler is not None:
+            sampler.stop()
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+
+    report = summarize(records, sampler.samples if sampler else [], started, elapsed, args.interval)
+    report.update(sessions=args.sessions, think_time=args.think_time, failures=failures,
+                  client_cpu_percent=100.0 * client_cpu / elapsed)
+    print_report(report, args.sessions)
+    for failure in failures:
+        print(f"  {failure}")
+    if report["client_cpu_percent"] > 80:
+        print(f"  warning: the load generator used {report['client_cpu_percent']:.0f}% CPU and may itself "
+              "be the bottleneck; run fewer sessions per load-test process")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=1)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,238 @@
+"""Visualization manifest: built once at startup and kept current by a background watcher.
+
+The manifest merges the registered VISUALIZATIONS with every HTML figure found
+under BASE_PATHS, and records each file's size, mtime and content hashes. Script
+reruns read it from memory, so rendering a page does no filesystem stat calls.
+
+Figures are also identified by a normalized content hash (see
+``figure_html.normalized_content_hash``), so byte-identical copies and exports
+that differ only in their random div ids are loaded and cached once.
+
+Unregistered figures can carry a sidecar ``<name>.meta.json`` next to the
+HTML file with any of ``title``, ``description``, ``icon`` and ``category``.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+
+from dashboard.figure_html import normalized_content_hash
+
+SIDECAR_SUFFIX = ".meta.json"
+
+logger = logging.getLogger(__name__)
+
+
+def file_hashes(path):
+    """Return ``(sha256, content_hash)`` of a file or directory; they differ only for HTML figures."""
+    if os.path.isdir(path):
+        # A directory of parts (e.g. an appended entity store) is versioned as a whole
+        digest = hashlib.sha256()
+        for name in sorted(os.listdir(path)):
+            digest.update(name.encode("utf-8") + file_hashes(os.path.join(path, name))[0].encode("ascii"))
+        sha256 = digest.hexdigest()
+        return sha256, sha256
+    with open(path, "rb") as f:
+        raw = f.read()
+    sha256 = hashlib.sha256(raw).hexdigest()
+    if not path.endswith(".html"):
+        return sha256, sha256
+    return sha256, normalized_content_hash(raw.decode("utf-8", errors="replace"))
+
+
+def path_version(path):
+    """Return ``(mtime_ns, size)`` of a file, or of a directory's files (latest mtime, total size)."""
+    stat = os.stat(path)
+    if not os.path.isdir(path):
+        return stat.st_mtime_ns, stat.st_size
+    stats = [os.stat(os.path.join(path, name)) for name in os.listdir(path)]
+    return max([stat.st_mtime_ns] + [s.st_mtime_ns for s in stats]), sum(s.st_size for s in stats)
+
+
+def title_from_filename(file_path):
+    """Derive a display title from a figure file name, e.g. 'gpu_usage_by_topic' -> 'Gpu Usage By Topic'."""
+    stem = os.path.splitext(os.path.basename(file_path))[0]
+    words = re.split(r"[_\-\s]+", stem)
+    # Keep acronyms and model names (NVIDIA, RTX, A100) as written
+    return " ".join(word if word.isupper() or any(c.isdigit() for c in word) else word.capitalize()
+                    for word in words if word)
+
+
+def read_sidecar(file_path):
+    """Return the sidecar metadata for ``file_path``, or {} when there is none or it is unreadable."""
+    sidecar_path = os.path.splitext(file_path)[0] + SIDECAR_SUFFIX
+    if not os.path.exists(sidecar_path):
+        return {}
+    try:
+        with open(sidecar_path, "r", encoding="utf-8") as f:
+            metadata = json.load(f)
+    except (OSError, ValueError) as e:
+        # Malformed, or half-written by an editor; the watcher rereads it once it changes
+        logger.warning("Ignoring sidecar %s: %s", sidecar_path, e)
+        return {}
+    if not isinstance(metadata, dict):
+        logger.warning("Ignoring sidecar %s: expected a JSON object", sidecar_path)
+        return {}
+    return metadata
+
+
+class VisualizationManifest:
+    """In-memory registry of every visualization and the state of its file."""
+
+    def __init__(self, visualizations, base_paths, discover=True, tracked_paths=()):
+        self._registered = visualizations
+        self._base_paths = base_paths
+        self._discover = discover
+        self._tracked_paths = list(tracked_paths)
+        self._file_states = {}  # normalized path -> {"size", "mtime_ns", "sha256", "content_hash"}
+        self._lock = threading.Lock()
+        self._watcher = None
+        self._stop = threading.Event()
+        self.visualizations = {}
+        self.version = 0
+        self.scan()
+
+    # -------------------------------------------------------------------------
+    # Queries (no filesystem access)
+    # -------------------------------------------------------------------------
+
+    def file_state(self, file_path):
+        """Return the last scanned ``{"size", "mtime_ns", "sha256", "content_hash"}`` of a file, or None if missing."""
+        return self._file_states.get(os.path.normpath(file_path))
+
+    def file_version(self, file_path):
+        """Return ``(mtime_ns, size)`` of a file from the last scan, or None if missing."""
+        state = self.file_state(file_path)
+        return None if state is None else (state["mtime_ns"], state["size"])
+
+    def dedup_summary(self):
+        """Summarize figures that share content with another visualization.
+
+        Returns the number of unique figures, the groups of visualization
+        names sharing one copy, and the file bytes that are not loaded twice.
+        """
+        groups = {}
+        for viz_name, config in self.visualizations.items():
+            if config["exists"]:
+                groups.setdefault(config["content_hash"], []).append((viz_name, config["size"]))
+        duplicate_groups = [group for group in groups.values() if len(group) > 1]
+        return {
+            "figures": sum(len(group) for group in groups.values()),
+            "unique": len(groups),
+            "duplicate_groups": [[viz_name for viz_name, _ in group] for group in duplicate_groups],
+            "bytes_saved": sum(size for group in duplicate_groups for _, size in group[1:]),
+        }
+
+    def by_category(self):
+        """Return ``{category: [(name, config), ...]}`` in registration order."""
+        categories = {}
+        for viz_name, config in self.visualizations.items():
+            categories.setdefault(config.get("category", "other"), []).append((viz_name, config))
+        return categories
+
+    # -------------------------------------------------------------------------
+    # Scanning
+    # -------------------------------------------------------------------------
+
+    def _candidate_paths(self):
+        paths = [config["file_path"] for config in self._registered.values()]
+        if self._discover:
+            for base_path in self._base_paths.values():
+                if not os.path.isdir(base_path):
+                    continue
+                # Sidecars are tracked too, so metadata edits are picked up by the watcher
+                paths.extend(sorted(os.path.join(base_path, name) for name in os.listdir(base_path)
+                                    if name.endswith((".html", SIDECAR_SUFFIX))))
+        paths.extend(self._tracked_paths)
+        return list(dict.fromkeys(os.path.normpath(path) for path in paths))
+
+    def _stat_files(self):
+        """Stat every candidate file, re-hashing only those whose size or mtime changed."""
+        states = {}
+        for path in self._candidate_paths():
+            try:
+                mtime_ns, size = path_version(path)
+            except OSError:
+                continue
+            previous = self._file_states.get(path)
+            if previous is not None and (previous["mtime_ns"], previous["size"]) == (mtime_ns, size):
+                states[path] = previous
+            else:
+                sha256, content_hash = file_hashes(path)
+                states[path] = {"size": size, "mtime_ns": mtime_ns,
+                                "sha256": sha256, "content_hash": content_hash}
+        return states
+
+    def _build_visualizations(self, states):
+        visualizations = {}
+        registered_paths = set()
+        for viz_name, config in self._registered.items():
+            path = os.path.normpath(config["file_path"])
+            registered_paths.add(path)
+            visualizations[viz_name] = dict(config, **self._state_fields(states.get(path)), source="registered")
+
+        if self._discover:
+            path_categories = {os.path.normpath(base_path): category for category, base_path in self._base_paths.items()}
+            for path, state in states.items():
+                category = path_categories.get(os.path.dirname(path))
+                if path in registered_paths or category is None or not path.endswith(".html"):
+                    continue
+                sidecar = read_sidecar(path)
+                title = sidecar.get("title") or title_from_filename(path)
+                if title in visualizations:
+                    title = f"{title} ({os.path.basename(os.path.dirname(path))})"
+                visualizations[title] = {
+                    "file_path": path,
+                    "description": sidecar.get("description", title),
+                    "icon": sidecar.get("icon", "📊"),
+                    "category": sidecar.get("category", category),
+                    **self._state_fields(state),
+                    "source": "discovered",
+                }
+        return visualizations
+
+    @staticmethod
+    def _state_fields(state):
+        if state is None:
+            return {"exists": False, "size": 0, "mtime_ns": None, "sha256": None, "content_hash": None}
+        return {"exists": True, **state}
+
+    def scan(self):
+        """Rescan the figure directories; return True when anything changed."""
+        with self._lock:
+            states = self._stat_files()
+            if states == self._file_states and self.visualizations:
+                return False
+            self._file_states = states
+            # Swap in a new dict so readers always see a complete manifest
+            self.visualizations = self._build_visualizations(states)
+            self.version += 1
+            return True
+
+    # -------------------------------------------------------------------------
+    # Background watcher
+    # -------------------------------------------------------------------------
+
+    def start_watcher(self, interval):
+        """Rescan every ``interval`` seconds on a daemon thread (no-op if already running)."""
+        if self._watcher is not None or interval <= 0:
+            return
+        self._watcher = threading.Thread(target=self._watch, args=(interval,), name="manifest-watcher", daemon=True)
+        self._watcher.start()
+
+    def _watch(self, interval):
+        while not self._stop.wait(interval):
+            try:
+                self.scan()
+            except OSError:
+                # A figure being rewritten mid-scan; the next pass picks it up
+                continue
+            except Exception:
+                # Never let one bad pass stop the watcher for the rest of the process
+                logger.exception("Manifest rescan failed; retrying in %ss", interval)
+
+    def stop_watcher(self):
+        self._stop.set()
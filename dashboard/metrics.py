@@ -0,0 +1,182 @@
+"""Process-wide render metrics: histograms and counters with a Prometheus text export.
+
+The app records where each figure render spends its time (``stage`` label:
+read/load, wrap, emit), how many bytes it sends, and how often sessions
+rerun. ``MetricsRegistry.prometheus_text()`` renders everything in the
+Prometheus text exposition format; ``serve_metrics`` exposes it on
+``/metrics`` from a daemon thread so it can be scraped.
+"""
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Upper bounds of the histogram buckets (+Inf is implicit)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BYTES_BUCKETS = tuple(1024 * 4 ** power for power in range(8))  # 1 KB .. 16 MB
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Histogram:
+    """Cumulative-bucket histogram of one label set."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q):
+        """Estimate a quantile by linear interpolation inside its bucket (like histogram_quantile)."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if seen + count >= rank and count:
+                lower = self.buckets[index - 1] if index > 0 else 0.0
+                if index == len(self.buckets):
+                    return lower
+                return lower + (self.buckets[index] - lower) * (rank - seen) / count
+            seen += count
+        return self.buckets[-1]
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in labels)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(labels, escaped)) + "}"
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class MetricsRegistry:
+    """Thread-safe store of named histograms, counters and gauge callbacks."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}  # name -> {"help", "buckets", "series": {labels: Histogram}}
+        self._counters = {}  # name -> {"help", "series": {labels: value}}
+        self._gauges = {}  # name -> (help, callback returning {labels dict as tuple: value})
+
+    def histogram(self, name, help_text, buckets=LATENCY_BUCKETS):
+        with self._lock:
+            self._histograms.setdefault(name, {"help": help_text, "buckets": buckets, "series": {}})
+
+    def counter(self, name, help_text):
+        with self._lock:
+            self._counters.setdefault(name, {"help": help_text, "series": {}})
+
+    def gauge(self, name, help_text, callback):
+        """Register a gauge read at export time; ``callback()`` returns ``{labels tuple: value}``."""
+        with self._lock:
+            self._gauges[name] = (help_text, callback)
+
+    def observe(self, name, value, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            metric = self._histograms[name]
+            series = metric["series"].get(key)
+            if series is None:
+                series = metric["series"][key] = Histogram(metric["buckets"])
+            series.observe(value)
+
+    def inc(self, name, amount=1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._counters[name]["series"]
+            series[key] = series.get(key, 0) + amount
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """Observe the wall time of the ``with`` block in seconds."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def summary(self, name, by):
+        """Merge a histogram's series by the ``by`` labels.
+
+        Returns ``{values of the by labels: {"count", "sum", "p50", "p95"}}``.
+        """
+        merged = {}
+        with self._lock:
+            metric = self._histograms[name]
+            for labels, series in metric["series"].items():
+                label_values = dict(labels)
+                group = tuple(label_values.get(label, "") for label in by)
+                total = merged.get(group)
+                if total is None:
+                    total = merged[group] = Histogram(metric["buckets"])
+                total.counts = [a + b for a, b in zip(total.counts, series.counts)]
+                total.sum += series.sum
+                total.count += series.count
+        return {group: {"count": total.count, "sum": total.sum,
+                        "p50": total.quantile(0.5), "p95": total.quantile(0.95)}
+                for group, total in merged.items()}
+
+    def counter_series(self, name):
+        with self._lock:
+            return dict(self._counters[name]["series"])
+
+    def prometheus_text(self):
+        """Render every metric in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            for name, metric in self._counters.items():
+                lines += [f"# HELP {name} {metric['help']}", f"# TYPE {name} counter"]
+                for labels, value in metric["series"].items():
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+            for name, metric in self._histograms.items():
+                lines += [f"# HELP {name} {metric['help']}", f"# TYPE {name} histogram"]
+                for labels, series in metric["series"].items():
+                    cumulative = 0
+                    for bound, count in zip(metric["buckets"] + ("+Inf",), series.counts):
+                        cumulative += count
+                        le = bound if bound == "+Inf" else _format_value(float(bound))
+                        lines.append(f"{name}_bucket{_format_labels(labels + (('le', le),))} {cumulative}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(series.sum)}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {series.count}")
+            gauges = list(self._gauges.items())
+        # Callbacks run outside the lock; they may take locks of their own
+        for name, (help_text, callback) in gauges:
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+            for labels, value in callback().items():
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def serve_metrics(registry, host, port):
+    """Serve ``registry`` on ``http://host:port/metrics`` from a daemon thread; return the server."""
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.prometheus_text().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", PROMETHEUS_CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # scrapes would flood the Streamlit log
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-endpoint", daemon=True).start()
+    return server
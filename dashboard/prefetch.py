@@ -0,0 +1,91 @@
+"""Background warming of the figures a user is likely to open next.
+
+The app predicts the next figures (the tabs after the open one in its
+category) and hands their warm-up functions to a ``Prefetcher``, which runs
+them on a small thread pool off the script thread. Renders report the
+figures they serve through ``record``, so the prefetch hit rate - the share
+of prefetched figures that were then opened while still cached - can be
+watched. Whether a warmed figure is still cached is asked of the cache
+itself, so an entry evicted before it was opened is warmed again and does
+not count as a hit.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class Prefetcher:
+    """Bounded thread pool of warm-up jobs, at most one per key at a time."""
+
+    def __init__(self, max_workers=2, max_pending=8):
+        self.max_pending = max_pending
+        self.scheduled = 0
+        self.completed = 0
+        self.failed = 0
+        self.dropped = 0
+        self.hits = 0
+        self._pending = set()
+        self._warm = {}  # key warmed and not opened yet -> whether its entry is still cached
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="prefetch")
+
+    def schedule(self, key, warm, is_cached):
+        """Run ``warm()`` in the background unless ``key`` is queued, cached already, or the queue is full.
+
+        ``is_cached()`` tells whether the entry ``warm()`` fills is in its cache.
+        Returns whether the job was queued.
+        """
+        if is_cached():
+            return False
+        with self._lock:
+            # A warmed entry evicted before it was opened is warmed again
+            self._warm.pop(key, None)
+            if key in self._pending:
+                return False
+            if len(self._pending) >= self.max_pending:
+                self.dropped += 1
+                return False
+            self._pending.add(key)
+            self.scheduled += 1
+        self._pool.submit(self._run, key, warm, is_cached)
+        return True
+
+    def _run(self, key, warm, is_cached):
+        try:
+            warm()
+        except Exception:
+            # Prefetching is best effort; the render reports the error if it recurs
+            with self._lock:
+                self._pending.discard(key)
+                self.failed += 1
+            return
+        with self._lock:
+            self._pending.discard(key)
+            self._warm[key] = is_cached
+            self.completed += 1
+
+    def record(self, key):
+        """Note that ``key`` is being rendered; return whether a prefetch had warmed it and it is still cached."""
+        with self._lock:
+            is_cached = self._warm.pop(key, None)
+        if is_cached is None or not is_cached():
+            return False
+        with self._lock:
+            self.hits += 1
+        return True
+
+    def stats(self):
+        with self._lock:
+            return {
+                "scheduled": self.scheduled,
+                "completed": self.completed,
+                "failed": self.failed,
+                "dropped": self.dropped,
+                "pending": len(self._pending),
+                "hits": self.hits,
+                # Share of the completed prefetches that were then opened
+                "hit_rate": self.hits / self.completed if self.completed else 0.0,
+            }
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
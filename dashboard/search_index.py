@@ -0,0 +1,216 @@
+"""Inverted index over the visualizations' titles, descriptions and figure contents.
+
+Every visualization is a document whose fields are its title, category,
+description and - read from the figure JSON when the index is built - the
+figure title, axis titles, trace names and category labels (or the column
+names of exported tables). Queries only look terms up in the index, so
+searching never reads the figure files.
+
+Build it from the repository root (next to the figure store):
+
+    python -m dashboard.search_index                 # writes build/search_index.json
+    python -m dashboard.search_index --query "h100 memory"
+"""
+
+import argparse
+import bisect
+import json
+import os
+import re
+import sys
+
+from dashboard.figure_preview import summarize_table
+from dashboard.figure_store import extract_figure, store_key
+
+# Score of a term found in each field; a document scores its best field per term
+FIELD_WEIGHTS = {"title": 8, "category": 4, "description": 4, "figure": 3, "axis": 2, "trace": 2, "label": 1,
+                 "column": 1}
+MAX_LABELS_PER_FIGURE = 500
+
+_TOKEN = re.compile(r"[0-9a-z]+")
+_TAG = re.compile(r"<[^>]+>")
+
+
+def tokenize(text):
+    """Lowercase alphanumeric terms of ``text``, e.g. 'NVIDIA H100 (80GB)' -> ['nvidia', 'h100', '80gb']."""
+    return _TOKEN.findall(str(text).casefold())
+
+
+def _text(value):
+    """Plain text of a Plotly title (a string or ``{"text": ...}``) without markup."""
+    text = value.get("text", "") if isinstance(value, dict) else value
+    return " ".join(_TAG.sub(" ", str(text or "")).split())
+
+
+def _labels(values):
+    if not isinstance(values, list):
+        return []
+    return [value for value in values if isinstance(value, str) and value.strip() and not _is_number(value)]
+
+
+def _is_number(text):
+    try:
+        float(text)
+    except ValueError:
+        return False
+    return True
+
+
+def figure_fields(spec):
+    """``[(field, text), ...]`` of what a figure shows: titles, trace names and category labels."""
+    layout = spec.get("layout", {})
+    fields = [("figure", _text(layout.get("title")))]
+    for name in sorted(key for key in layout if re.match(r"^[xy]axis\d*$", key)):
+        fields.append(("axis", _text(layout[name].get("title"))))
+    labels = []
+    for trace in spec.get("data", []):
+        fields.append(("trace", _text(trace.get("name"))))
+        for key in ("labels", "x", "y"):
+            labels.extend(_labels(trace.get(key)))
+    fields.extend(("label", label) for label in list(dict.fromkeys(labels))[:MAX_LABELS_PER_FIGURE])
+    return [(field, text) for field, text in fields if text]
+
+
+def file_fields(file_path):
+    """Fields of a figure file (figure or exported table), or [] when it cannot be read."""
+    if not os.path.exists(file_path):
+        return []
+    with open(file_path, "r", encoding="utf-8") as f:
+        html_content = f.read()
+    spec = extract_figure(html_content)
+    if spec is not None:
+        return figure_fields(spec)
+    table = summarize_table(html_content)
+    return [("column", column) for column in table["columns"] if column] if table else []
+
+
+class SearchIndex:
+    """Term -> ``{document: score}`` postings with prefix lookups over the sorted vocabulary."""
+
+    def __init__(self, data=None):
+        data = data or {}
+        self.documents = data.get("documents", [])
+        self.postings = {term: {int(doc): score for doc, score in entries.items()}
+                         for term, entries in data.get("postings", {}).items()}
+        self._names = {document["name"]: index for index, document in enumerate(self.documents)}
+        self._vocabulary = None  # sorted on the first lookup after a change
+
+    @classmethod
+    def load(cls, path):
+        """Read an index file; an empty index when it is not built."""
+        if not os.path.exists(path):
+            return cls()
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def __contains__(self, name):
+        return name in self._names
+
+    def __len__(self):
+        return len(self.documents)
+
+    def add(self, name, category, fields, file_key=None):
+        """Index a document from its ``[(field, text), ...]``."""
+        doc = len(self.documents)
+        self.documents.append({"name": name, "category": category, "file_key": file_key, "fields": fields})
+        self._names[name] = doc
+        for field, text in fields:
+            for term in tokenize(text):
+                entries = self.postings.setdefault(term, {})
+                entries[doc] = max(entries.get(doc, 0), FIELD_WEIGHTS[field])
+        self._vocabulary = None
+
+    def _prefix_scores(self, prefix):
+        """``{document: score}`` over every term starting with ``prefix`` (exact matches score double)."""
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self.postings)
+        scores = {}
+        start = bisect.bisect_left(self._vocabulary, prefix)
+        for term in self._vocabulary[start:]:
+            if not term.startswith(prefix):
+                break
+            boost = 2 if term == prefix else 1
+            for doc, score in self.postings[term].items():
+                scores[doc] = max(scores.get(doc, 0), score * boost)
+        return scores
+
+    def search(self, query, limit=10):
+        """Documents matching every term of ``query`` (as a word prefix), best first.
+
+        Returns ``[{"name", "category", "score", "matches"}]`` where
+        ``matches`` lists the ``(field, text)`` entries that contain a term.
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+        scores = None
+        for term in terms:
+            term_scores = self._prefix_scores(term)
+            scores = term_scores if scores is None else {
+                doc: score + term_scores[doc] for doc, score in scores.items() if doc in term_scores
+            }
+            if not scores:
+                return []
+
+        results = []
+        for doc, score in sorted(scores.items(), key=lambda item: (-item[1], self.documents[item[0]]["name"]))[:limit]:
+            document = self.documents[doc]
+            matches = [(field, text) for field, text in document["fields"]
+                       if field not in ("title", "category") and
+                       any(word.startswith(term) for word in tokenize(text) for term in terms)]
+            results.append({"name": document["name"], "category": document["category"], "score": score,
+                            "matches": matches[:3]})
+        return results
+
+    def to_dict(self):
+        return {"documents": self.documents,
+                "postings": {term: {str(doc): score for doc, score in entries.items()}
+                             for term, entries in self.postings.items()}}
+
+
+def metadata_fields(viz_name, config, category_names):
+    """Fields known without reading the figure: title, category and description."""
+    category = config.get("category", "other")
+    return [("title", viz_name), ("category", category_names.get(category, category)),
+            ("description", config.get("description", ""))]
+
+
+def build_index(visualizations, category_names, output_path):
+    """Index every visualization with its figure contents and write the index; return it."""
+    index = SearchIndex()
+    for viz_name, config in visualizations.items():
+        fields = metadata_fields(viz_name, config, category_names) + file_fields(config["file_path"])
+        index.add(viz_name, config.get("category", "other"), fields, file_key=store_key(config["file_path"]))
+
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    with open(output_path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(index.to_dict(), f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(output_path + ".tmp", output_path)
+    return index
+
+
+def main(argv=None):
+    from dashboard.config import AUTO_DISCOVER_FIGURES, BASE_PATHS, CATEGORY_CONFIG, SEARCH_INDEX_PATH, VISUALIZATIONS
+    from dashboard.manifest import VisualizationManifest
+
+    parser = argparse.ArgumentParser(description="Build or query the visualization search index.")
+    parser.add_argument("--output", default=SEARCH_INDEX_PATH, help="index file to write (or query)")
+    parser.add_argument("--query", help="search the built index instead of building it")
+    args = parser.parse_args(argv)
+
+    if args.query is not None:
+        for result in SearchIndex.load(args.output).search(args.query):
+            print(f"{result['score']:3d}  {result['name']} [{result['category']}]  "
+                  + "; ".join(f"{field}: {text}" for field, text in result["matches"]))
+        return 0
+
+    manifest = VisualizationManifest(VISUALIZATIONS, BASE_PATHS, discover=AUTO_DISCOVER_FIGURES)
+    category_names = {category: config["name"] for category, config in CATEGORY_CONFIG.items()}
+    index = build_index(manifest.visualizations, category_names, args.output)
+    print(f"Indexed {len(index)} visualizations ({len(index.postings):,} terms) into {args.output} "
+          f"({os.path.getsize(args.output) / 1024:.0f} KB)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
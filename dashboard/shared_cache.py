@@ -0,0 +1,192 @@
+"""Disk-backed figure payload cache shared by every app process on a host.
+
+Prepared figure payloads (the wrapped HTML a render sends) are written once
+to ``<directory>/<key>.bin`` and memory-mapped read-only by each process, so
+the bytes live once in the OS page cache instead of once per server process.
+Keys are content hashes plus a hash of the settings the payload was
+prepared under (see ``payload_settings``), so a rebuilt figure, or a
+process configured differently, gets a new key. Each entry is
+published with an atomic rename, so readers see either no entry or a
+complete one and never a half-written file. Superseded entries stay valid
+for processes that still map them until ``prune`` removes them.
+
+    python -m dashboard.shared_cache stats
+    python -m dashboard.shared_cache prune      # drop entries of figures or settings that changed
+"""
+
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+# Bumped whenever the payload preparation changes, so old entries are not reused
+PAYLOAD_FORMAT = 4
+SUFFIX = ".bin"
+# Temporary files older than this are left over from a crashed writer
+STALE_TMP_SECONDS = 3600
+
+
+def payload_settings():
+    """The configuration the app's payload preparation depends on (see ``load_figure_html`` in app.py).
+
+    Each of these can differ between processes through the environment.
+    """
+    from dashboard.config import (
+        BINARY_ARRAY_MIN_LENGTH, BINARY_ARRAYS, FIGURE_FLOAT_DIGITS, FIGURE_MINIFICATION, PLOTLY_JS_PATH, PLOTLY_JS_URL
+    )
+    return {
+        "float_digits": FIGURE_FLOAT_DIGITS if FIGURE_MINIFICATION else None,
+        "binary_min_length": BINARY_ARRAY_MIN_LENGTH if BINARY_ARRAYS else None,
+        "plotly_js_url": PLOTLY_JS_URL,
+        # The runtime is only swapped for the shared bundle when it exists
+        "local_runtime": os.path.exists(PLOTLY_JS_PATH),
+    }
+
+
+def settings_hash(settings):
+    return hashlib.sha256(json.dumps(settings, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+
+
+def entry_key(kind, content_hash, settings):
+    """Key of a payload: its kind, the figure's content hash and the ``settings_hash`` it was prepared under."""
+    return f"{kind}-{content_hash}-{settings}-v{PAYLOAD_FORMAT}"
+
+
+class SharedFigureCache:
+    """Memory-mapped payload files in ``directory``, published atomically.
+
+    Each process keeps at most ``max_open`` mappings open; a mapping costs
+    address space, not memory, until its pages are read. The settings hash of
+    this process is computed once here; ``key`` builds entry keys with it.
+    """
+
+    def __init__(self, directory, max_open=256):
+        self.directory = directory
+        self.max_open = max_open
+        self.settings = settings_hash(payload_settings())
+        self.hits = 0
+        self.misses = 0
+        self._maps = OrderedDict()  # key -> mmap
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + SUFFIX)
+
+    def key(self, kind, content_hash):
+        """``entry_key`` of a payload prepared under this process's settings."""
+        return entry_key(kind, content_hash, self.settings)
+
+    def contains(self, key):
+        """Whether ``key`` is mapped by this process or published by any, without counting a lookup."""
+        with self._lock:
+            if key in self._maps:
+                return True
+        return os.path.exists(self._path(key))
+
+    def get(self, key, producer):
+        """Return the payload of ``key`` as a read-only buffer, writing ``producer()`` bytes on a miss."""
+        with self._lock:
+            payload = self._maps.get(key)
+            if payload is not None:
+                self._maps.move_to_end(key)
+                self.hits += 1
+                return payload
+
+        path = self._path(key)
+        try:
+            f = open(path, "rb")
+            published_here = False
+        except FileNotFoundError:
+            self.publish(key, producer())
+            f = open(path, "rb")
+            published_here = True
+        with f:
+            # An empty file cannot be mapped
+            payload = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if os.fstat(f.fileno()).st_size else b""
+
+        with self._lock:
+            if published_here:
+                self.misses += 1
+            else:
+                self.hits += 1  # written by this or another process earlier
+            self._maps[key] = payload
+            while len(self._maps) > self.max_open:
+                # Not closed here: a render may still be reading it; it closes once unreferenced
+                self._maps.popitem(last=False)
+        return payload
+
+    def publish(self, key, payload):
+        """Write an entry atomically; concurrent writers of one key write identical bytes."""
+        tmp_path = f"{self._path(key)}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(payload)
+        os.replace(tmp_path, self._path(key))
+
+    def keys(self):
+        return [name[:-len(SUFFIX)] for name in os.listdir(self.directory) if name.endswith(SUFFIX)]
+
+    def prune(self, keep):
+        """Delete the entries (and stale temporary files) whose key is not in ``keep``; return their bytes.
+
+        Processes that still map a deleted entry keep reading it until they
+        drop the mapping.
+        """
+        freed = 0
+        for name in os.listdir(self.directory):
+            if name.endswith(SUFFIX) and name[:-len(SUFFIX)] in keep:
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+                if not name.endswith(SUFFIX) and time.time() - stat.st_mtime < STALE_TMP_SECONDS:
+                    continue  # being written
+                size = stat.st_size
+                os.remove(path)
+            except OSError:
+                continue  # pruned by another process
+            freed += size
+        return freed
+
+    def disk_usage(self):
+        """``(entries, bytes)`` of the cache directory."""
+        sizes = [os.path.getsize(self._path(key)) for key in self.keys()]
+        return len(sizes), sum(sizes)
+
+    def stats(self):
+        """Counters of this process (no filesystem access)."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {"mapped": len(self._maps), "mapped_bytes": sum(len(payload) for payload in self._maps.values()),
+                    "hits": self.hits, "misses": self.misses, "hit_rate": self.hits / lookups if lookups else 0.0}
+
+
+def main(argv=None):
+    from dashboard.config import AUTO_DISCOVER_FIGURES, BASE_PATHS, SHARED_CACHE_DIR, VISUALIZATIONS
+    from dashboard.manifest import VisualizationManifest
+
+    parser = argparse.ArgumentParser(description="Inspect or prune the shared figure payload cache.")
+    parser.add_argument("command", choices=("stats", "prune"))
+    parser.add_argument("--directory", default=SHARED_CACHE_DIR)
+    args = parser.parse_args(argv)
+
+    cache = SharedFigureCache(args.directory)
+    if args.command == "prune":
+        manifest = VisualizationManifest(VISUALIZATIONS, BASE_PATHS, discover=AUTO_DISCOVER_FIGURES)
+        # Entries prepared under other settings (e.g. by a differently configured replica) are dropped too
+        keep = {cache.key("html", config["content_hash"]) for config in manifest.visualizations.values()
+                if config["exists"]}
+        freed = cache.prune(keep)
+        print(f"Pruned {freed / 1024 / 1024:.1f} MB of superseded payloads")
+    entries, size = cache.disk_usage()
+    print(f"{entries} payloads, {size / 1024 / 1024:.1f} MB in {args.directory}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,273 @@
+"""Cacheable static figure assets: content-hashed names, precompressed variants, ETag server.
+
+Build the assets from the repository root, then either let Streamlit serve
+them from /app/static/ or run the bundled asset server, which adds
+precompressed responses, content-hash ETags and long-lived cache headers:
+
+    python -m dashboard.static_assets build
+    python -m dashboard.static_assets serve --port 8600
+
+Each figure becomes a standalone document ``figures/<name>.<hash>.html`` whose
+name changes whenever its content does, so it can be cached forever. When
+minified, documents load their layout template from a shared, hashed
+``figures/template.<hash>.js`` instead of embedding it, so the browser fetches
+each template once.
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+import sys
+from http import HTTPStatus
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+from dashboard.figure_html import figure_document, normalized_content_hash
+from dashboard.figure_minify import minify_figure_html, round_floats, template_hash
+from dashboard.figure_store import extract_figure, store_key
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip variants are always written
+    brotli = None
+
+FIGURES_DIR = "figures"
+ASSET_MAP_NAME = "assets.json"
+HASH_LENGTH = 12
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+_HASHED_NAME = re.compile(r"\.[0-9a-f]{%d}\.[a-z]+$" % HASH_LENGTH)
+
+# Preferred first; each maps to the suffix of its precompressed variant
+ENCODINGS = [("br", ".br"), ("gzip", ".gz")]
+
+
+def precompress(path):
+    """Write ``path.gz`` (and ``path.br`` when brotli is installed); return their sizes."""
+    with open(path, "rb") as f:
+        raw = f.read()
+    sizes = {}
+    # mtime=0 keeps the gzip output reproducible across builds
+    gz = gzip.compress(raw, compresslevel=9, mtime=0)
+    with open(path + ".gz", "wb") as f:
+        f.write(gz)
+    sizes["gzip"] = len(gz)
+    if brotli is not None:
+        br = brotli.compress(raw, quality=11)
+        with open(path + ".br", "wb") as f:
+            f.write(br)
+        sizes["br"] = len(br)
+    return sizes
+
+
+def write_template_script(template, figures_dir):
+    """Write a script registering ``template`` as ``window.PLOTLY_TEMPLATES[<hash>]``; return ``(name, hash)``."""
+    digest = template_hash(template)
+    template_json = json.dumps(template, separators=(",", ":"))
+    source = (f"window.PLOTLY_TEMPLATES = window.PLOTLY_TEMPLATES || {{}};\n"
+              f"window.PLOTLY_TEMPLATES[{json.dumps(digest)}] = {template_json};\n").encode("utf-8")
+    name = f"template.{digest[:HASH_LENGTH]}.js"
+    output_path = os.path.join(figures_dir, name)
+    if not os.path.exists(output_path):
+        with open(output_path, "wb") as f:
+            f.write(source)
+        precompress(output_path)
+    return name, digest
+
+
+def minified_document_html(html_content, figures_dir, float_digits, templates, binary_min_length=None):
+    """Minify a figure export and point it at its shared template script (recorded in ``templates``)."""
+    spec = extract_figure(html_content)
+    template = spec["layout"].get("template") if spec is not None else None
+    if not isinstance(template, dict):
+        return minify_figure_html(html_content, float_digits, binary_min_length=binary_min_length)
+    if float_digits is not None:
+        template = round_floats(template, float_digits)
+    name, digest = write_template_script(template, figures_dir)
+    templates[name] = os.path.getsize(os.path.join(figures_dir, name))
+    # Loaded synchronously, so the template is defined before the figure's own script runs
+    return (f'<script type="text/javascript" src="{name}"></script>'
+            + minify_figure_html(html_content, float_digits, f"window.PLOTLY_TEMPLATES[{json.dumps(digest)}]",
+                                 binary_min_length=binary_min_length))
+
+
+def build_assets(file_paths, asset_dir, runtime_name, float_digits=None, binary_min_length=None):
+    """Write hashed, precompressed figure documents under ``asset_dir/figures``.
+
+    ``runtime_name`` is the shared Plotly.js bundle's file name inside
+    ``asset_dir``. With ``float_digits`` the figures are minified and their
+    templates shared (see dashboard/figure_minify.py); with
+    ``binary_min_length`` large numeric arrays are shipped as binary typed
+    arrays (see dashboard/typed_arrays.py). Returns the asset map, which is
+    also written to ``figures/assets.json``; files from earlier builds that
+    are no longer referenced are removed.
+    """
+    figures_dir = os.path.join(asset_dir, FIGURES_DIR)
+    os.makedirs(figures_dir, exist_ok=True)
+
+    figures = {}
+    templates = {}  # template script name -> bytes
+    by_content = {}  # normalized content hash -> asset entry, so duplicates ship once
+    for file_path in file_paths:
+        if not os.path.exists(file_path):
+            continue
+        with open(file_path, "r", encoding="utf-8") as f:
+            html_content = f.read()
+        content_hash = normalized_content_hash(html_content)
+        if content_hash in by_content:
+            figures[store_key(file_path)] = by_content[content_hash]
+            continue
+        if float_digits is not None or binary_min_length is not None:
+            html_content = minified_document_html(html_content, figures_dir, float_digits, templates,
+                                                  binary_min_length)
+        document = figure_document(html_content, runtime_url=f"../{runtime_name}").encode("utf-8")
+        sha256 = hashlib.sha256(document).hexdigest()
+        stem = os.path.splitext(os.path.basename(file_path))[0]
+        name = f"{stem}.{sha256[:HASH_LENGTH]}.html"
+        output_path = os.path.join(figures_dir, name)
+        if not os.path.exists(output_path):
+            with open(output_path, "wb") as f:
+                f.write(document)
+        figures[store_key(file_path)] = by_content[content_hash] = {
+            "path": f"{FIGURES_DIR}/{name}",
+            "sha256": sha256,
+            "bytes": len(document),
+            "compressed_bytes": precompress(output_path),
+        }
+
+    runtime_path = os.path.join(asset_dir, runtime_name)
+    runtime = None
+    if os.path.exists(runtime_path):
+        runtime = {"path": runtime_name, "bytes": os.path.getsize(runtime_path),
+                   "compressed_bytes": precompress(runtime_path)}
+
+    asset_map = {"figures": figures, "runtime": runtime, "templates": templates}
+    referenced = {os.path.basename(entry["path"]) for entry in figures.values()} | set(templates)
+    for name in os.listdir(figures_dir):
+        base = name[:-3] if name.endswith((".gz", ".br")) else name
+        if base != ASSET_MAP_NAME and base not in referenced:
+            os.remove(os.path.join(figures_dir, name))
+
+    map_path = os.path.join(figures_dir, ASSET_MAP_NAME)
+    with open(map_path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(asset_map, f, indent=1)
+    os.replace(map_path + ".tmp", map_path)
+    return asset_map
+
+
+def load_asset_map(map_path):
+    """Return the ``{key: entry}`` figure asset map, or {} when assets are not built."""
+    if not os.path.exists(map_path):
+        return {}
+    with open(map_path, "r", encoding="utf-8") as f:
+        return json.load(f)["figures"]
+
+
+class AssetRequestHandler(SimpleHTTPRequestHandler):
+    """Static handler with precompressed variants, content-hash ETags and cache headers."""
+
+    _etags = {}  # (path, mtime_ns, size) -> sha256 of the uncompressed file
+
+    def end_headers(self):
+        self.send_header("Access-Control-Allow-Origin", "*")
+        super().end_headers()
+
+    def send_head(self):
+        path = self.translate_path(self.path)
+        if os.path.isdir(path) or not os.path.isfile(path) or path.endswith((".gz", ".br")):
+            self.send_error(HTTPStatus.NOT_FOUND, "File not found")
+            return None
+
+        stat = os.stat(path)
+        etag_key = (path, stat.st_mtime_ns, stat.st_size)
+        digest = self._etags.get(etag_key)
+        if digest is None:
+            with open(path, "rb") as f:
+                digest = hashlib.sha256(f.read()).hexdigest()
+            self._etags[etag_key] = digest
+
+        accepted = {value.split(";")[0].strip() for value in self.headers.get("Accept-Encoding", "").split(",")}
+        encoding, body_path = None, path
+        for candidate, suffix in ENCODINGS:
+            if candidate in accepted and os.path.exists(path + suffix):
+                encoding, body_path = candidate, path + suffix
+                break
+        etag = f'"{digest[:32]}{"-" + encoding if encoding else ""}"'
+        cache_control = IMMUTABLE_CACHE_CONTROL if _HASHED_NAME.search(path) else REVALIDATE_CACHE_CONTROL
+
+        if etag in [tag.strip() for tag in self.headers.get("If-None-Match", "").split(",")]:
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", cache_control)
+            self.send_header("Vary", "Accept-Encoding")
+            self.end_headers()
+            return None
+
+        f = open(body_path, "rb")
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", self.guess_type(path))
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
+        self.send_header("Content-Length", str(os.fstat(f.fileno()).st_size))
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", cache_control)
+        self.send_header("Vary", "Accept-Encoding")
+        self.end_headers()
+        return f
+
+
+def serve(asset_dir, host, port):
+    """Serve ``asset_dir`` until interrupted."""
+    def handler(*args, **kwargs):
+        return AssetRequestHandler(*args, directory=asset_dir, **kwargs)
+
+    with ThreadingHTTPServer((host, port), handler) as server:
+        print(f"Serving {asset_dir} on http://{host}:{port}/")
+        server.serve_forever()
+
+
+def main(argv=None):
+    from dashboard.config import (
+        AUTO_DISCOVER_FIGURES, BASE_PATHS, BINARY_ARRAY_MIN_LENGTH, BINARY_ARRAYS, FIGURE_FLOAT_DIGITS,
+        FIGURE_MINIFICATION, PLOTLY_JS_PATH, STATIC_ASSET_DIR, VISUALIZATIONS
+    )
+    from dashboard.manifest import VisualizationManifest
+
+    parser = argparse.ArgumentParser(description="Build or serve the static figure assets.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build_parser = subparsers.add_parser("build", help="write hashed, precompressed figure documents")
+    build_parser.add_argument("--asset-dir", default=STATIC_ASSET_DIR)
+    serve_parser = subparsers.add_parser("serve", help="serve the assets with caching headers")
+    serve_parser.add_argument("--asset-dir", default=STATIC_ASSET_DIR)
+    serve_parser.add_argument("--host", default="0.0.0.0")
+    serve_parser.add_argument("--port", type=int, default=8600)
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        serve(args.asset_dir, args.host, args.port)
+        return 0
+
+    manifest = VisualizationManifest(VISUALIZATIONS, BASE_PATHS, discover=AUTO_DISCOVER_FIGURES)
+    file_paths = list(dict.fromkeys(config["file_path"] for config in manifest.visualizations.values()))
+    asset_map = build_assets(file_paths, args.asset_dir, os.path.basename(PLOTLY_JS_PATH),
+                             float_digits=FIGURE_FLOAT_DIGITS if FIGURE_MINIFICATION else None,
+                             binary_min_length=BINARY_ARRAY_MIN_LENGTH if BINARY_ARRAYS else None)
+
+    figures = list({entry["path"]: entry for entry in asset_map["figures"].values()}.values())
+    raw_bytes = sum(entry["bytes"] for entry in figures)
+    gzip_bytes = sum(entry["compressed_bytes"]["gzip"] for entry in figures)
+    print(f"Built {len(figures)} unique figure assets for {len(asset_map['figures'])} figures "
+          f"in {os.path.join(args.asset_dir, FIGURES_DIR)}")
+    print(f"  {raw_bytes / 1024:.0f} KB -> {gzip_bytes / 1024:.0f} KB gzip"
+          + ("" if brotli is not None else " (install brotli for .br variants)"))
+    if asset_map["templates"]:
+        print(f"  {len(asset_map['templates'])} shared layout templates, "
+              f"{sum(asset_map['templates'].values()) / 1024:.0f} KB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,217 @@
+"""Static-site export of the dashboard for read-only audiences.
+
+Renders the category and visualization layout as plain HTML pages - an
+index plus one page per category - with every figure in a lazy-loading
+iframe. Figure documents, the shared Plotly.js runtime and the stylesheet
+get content-hashed names (see dashboard/static_assets.py) and gzip
+variants, so any file server can serve the site with long-lived caching and
+no Python process:
+
+    python -m dashboard.static_site                 # writes build/site/
+    python -m dashboard.static_assets serve --asset-dir build/site --port 8700
+
+Pages keep fixed names so links stay stable; only they need revalidating.
+"""
+
+import argparse
+import hashlib
+import html
+import os
+import shutil
+import sys
+
+from dashboard.figure_store import store_key
+from dashboard.static_assets import ASSET_MAP_NAME, FIGURES_DIR, HASH_LENGTH, build_assets, precompress
+
+FIGURE_HEIGHT = 1000
+CURRENT_CLASS = ' class="current"'
+
+STYLESHEET = """
+body { margin: 0; font-family: -apple-system, "Segoe UI", Roboto, sans-serif; color: #2c3e50; background: #fafbfc; }
+header { padding: 1.5rem 2rem 1rem; background: linear-gradient(90deg, #667eea 0%, #764ba2 100%); color: white; }
+header h1 { margin: 0; font-size: 1.8rem; }
+header a { color: white; text-decoration: none; }
+nav.categories { display: flex; flex-wrap: wrap; gap: 0.5rem; padding: 0.75rem 2rem; background: white;
+                 border-bottom: 1px solid #e0e0e0; position: sticky; top: 0; z-index: 1; }
+nav.categories a, nav.figures a { padding: 0.35rem 0.8rem; border-radius: 6px; text-decoration: none; color: #2c3e50;
+                                  background: #f0f2f6; font-size: 0.9rem; }
+nav.categories a.current { background: #2c3e50; color: white; }
+nav.figures { display: flex; flex-wrap: wrap; gap: 0.4rem; margin: 1rem 0; }
+main { padding: 1rem 2rem 3rem; }
+.category-header { border-left: 5px solid; padding: 0.5rem 1rem; margin: 1rem 0; background: white; border-radius: 6px; }
+.category-header h2 { margin: 0; }
+.category-header p, .card p, section p { margin: 0.4rem 0 0; color: #666; font-size: 0.9rem; }
+.cards { display: grid; grid-template-columns: repeat(auto-fill, minmax(260px, 1fr)); gap: 1rem; margin-top: 1rem; }
+.card { display: block; padding: 1rem; background: white; border-radius: 10px; border-left: 5px solid;
+        box-shadow: 0 2px 8px rgba(0,0,0,0.08); text-decoration: none; color: inherit; }
+.card h3 { margin: 0; }
+section { margin: 2rem 0; scroll-margin-top: 4rem; }
+section h3 { margin: 0; }
+iframe { width: 100%; border: 0; margin-top: 0.75rem; }
+.missing { padding: 1rem; background: #fdecea; border-radius: 6px; color: #b03a2e; }
+footer { text-align: center; padding: 1rem 0 2rem; color: #666; font-size: 0.9rem; }
+"""
+
+
+def hashed_copy(source_path, output_dir, stem, extension):
+    """Copy a file to ``output_dir/<stem>.<hash>.<extension>`` with a gzip variant; return its name."""
+    with open(source_path, "rb") as f:
+        digest = hashlib.sha256(f.read()).hexdigest()
+    name = f"{stem}.{digest[:HASH_LENGTH]}.{extension}"
+    output_path = os.path.join(output_dir, name)
+    if not os.path.exists(output_path):
+        shutil.copyfile(source_path, output_path)
+        precompress(output_path)
+    return name
+
+
+def write_hashed(content, output_dir, stem, extension):
+    """Write text to a content-hashed file with a gzip variant; return its name."""
+    data = content.encode("utf-8")
+    name = f"{stem}.{hashlib.sha256(data).hexdigest()[:HASH_LENGTH]}.{extension}"
+    output_path = os.path.join(output_dir, name)
+    if not os.path.exists(output_path):
+        with open(output_path, "wb") as f:
+            f.write(data)
+        precompress(output_path)
+    return name
+
+
+def page_name(category):
+    return f"{category}.html"
+
+
+def render_page(title, stylesheet, categories, category_configs, current, body):
+    """A complete page: header, category navigation and ``body``."""
+    nav = "".join(
+        f'<a href="{page_name(category)}"{CURRENT_CLASS if category == current else ""}>'
+        f'{html.escape(category_configs[category]["icon"])} {html.escape(category_configs[category]["name"])}</a>'
+        for category in categories
+    )
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8" />
+<meta name="viewport" content="width=device-width, initial-scale=1" />
+<title>{html.escape(title)}</title>
+<link rel="stylesheet" href="{stylesheet}" />
+</head>
+<body>
+<header><h1><a href="index.html">🖥️ Computational Infrastructure Entities Usage Analytics</a></h1></header>
+<nav class="categories">{nav}</nav>
+<main>
+{body}
+</main>
+<footer>GPU Usage Analytics Dashboard • static export</footer>
+</body>
+</html>
+"""
+
+
+def category_body(category_config, visualizations, assets):
+    """Header, figure links and one lazy-loading iframe per visualization of a category."""
+    color = html.escape(category_config["color"])
+    description = category_config.get("description")
+    parts = [f"""<div class="category-header" style="border-left-color: {color}">
+<h2 style="color: {color}">{html.escape(category_config["icon"])} {html.escape(category_config["name"])}</h2>
+<p>{len(visualizations)} visualizations available</p>
+{"<p>" + html.escape(description) + "</p>" if description else ""}
+</div>"""]
+    anchors = [f"figure-{index}" for index in range(len(visualizations))]
+    parts.append('<nav class="figures">' + "".join(
+        f'<a href="#{anchor}">{html.escape(config.get("icon", "📊"))} {html.escape(viz_name)}</a>'
+        for anchor, (viz_name, config) in zip(anchors, visualizations)
+    ) + "</nav>")
+    for anchor, (viz_name, config) in zip(anchors, visualizations):
+        asset = assets.get(store_key(config["file_path"]))
+        if asset is None:
+            figure = f'<div class="missing">❌ Not found: {html.escape(config["file_path"])}</div>'
+        else:
+            # Off-screen figures are only fetched as the reader scrolls to them
+            figure = (f'<iframe src="{asset["path"]}" loading="lazy" height="{FIGURE_HEIGHT}" '
+                      f'title="{html.escape(viz_name)}"></iframe>')
+        parts.append(f"""<section id="{anchor}">
+<h3>{html.escape(config.get("icon", "📊"))} {html.escape(viz_name)}</h3>
+<p>{html.escape(config.get("description", ""))}</p>
+{figure}
+</section>""")
+    return "\n".join(parts)
+
+
+def index_body(categories, category_configs):
+    cards = "".join(
+        f"""<a class="card" href="{page_name(category)}" style="border-left-color: {html.escape(category_configs[category]["color"])}">
+<h3>{html.escape(category_configs[category]["icon"])} {html.escape(category_configs[category]["name"])}</h3>
+<p>{len(visualizations)} visualizations</p></a>"""
+        for category, visualizations in categories.items()
+    )
+    return f'<div class="cards">{cards}</div>'
+
+
+def export_site(categories, category_configs, runtime_path, output_dir, float_digits=None, binary_min_length=None):
+    """Write the static site for ``{category: [(name, config), ...]}``; return ``(pages, asset map)``.
+
+    ``float_digits`` and ``binary_min_length`` minify the figure documents
+    (see ``build_assets``).
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    runtime_stem, runtime_extension = os.path.basename(runtime_path).rsplit(".min.", 1)
+    runtime_name = hashed_copy(runtime_path, output_dir, runtime_stem + ".min", runtime_extension) \
+        if os.path.exists(runtime_path) else os.path.basename(runtime_path)
+    file_paths = list(dict.fromkeys(config["file_path"] for visualizations in categories.values()
+                                    for _, config in visualizations))
+    asset_map = build_assets(file_paths, output_dir, runtime_name, float_digits=float_digits,
+                             binary_min_length=binary_min_length)
+    stylesheet = write_hashed(STYLESHEET, output_dir, "site", "css")
+
+    pages = {"index.html": render_page("Analytics Dashboard", stylesheet, categories, category_configs, None,
+                                       index_body(categories, category_configs))}
+    for category, visualizations in categories.items():
+        pages[page_name(category)] = render_page(
+            category_configs[category]["name"], stylesheet, categories, category_configs, category,
+            category_body(category_configs[category], visualizations, asset_map["figures"])
+        )
+    for name, content in pages.items():
+        path = os.path.join(output_dir, name)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(path + ".tmp", path)
+        precompress(path)
+
+    # Hashed files from earlier exports that nothing references any more
+    referenced = {runtime_name, stylesheet, *pages, FIGURES_DIR}
+    for name in os.listdir(output_dir):
+        base = name[:-3] if name.endswith((".gz", ".br")) else name
+        if base not in referenced and os.path.isfile(os.path.join(output_dir, name)):
+            os.remove(os.path.join(output_dir, name))
+    return pages, asset_map
+
+
+def main(argv=None):
+    from dashboard.config import AUTO_DISCOVER_FIGURES, BASE_PATHS, BINARY_ARRAY_MIN_LENGTH, BINARY_ARRAYS, \
+        CATEGORY_CONFIG, FIGURE_FLOAT_DIGITS, FIGURE_MINIFICATION, PLOTLY_JS_PATH, STATIC_SITE_DIR, VISUALIZATIONS
+    from dashboard.manifest import VisualizationManifest
+
+    parser = argparse.ArgumentParser(description="Export the dashboard as a static multi-page site.")
+    parser.add_argument("--output", default=STATIC_SITE_DIR, help="directory to write the site to")
+    args = parser.parse_args(argv)
+
+    categories = VisualizationManifest(VISUALIZATIONS, BASE_PATHS, discover=AUTO_DISCOVER_FIGURES).by_category()
+    category_configs = {
+        category: CATEGORY_CONFIG.get(category, {"name": category.replace("_", " ").title(), "icon": "📊",
+                                                 "color": "#95a5a6"})
+        for category in categories
+    }
+    pages, asset_map = export_site(categories, category_configs, PLOTLY_JS_PATH, args.output,
+                                   float_digits=FIGURE_FLOAT_DIGITS if FIGURE_MINIFICATION else None,
+                                   binary_min_length=BINARY_ARRAY_MIN_LENGTH if BINARY_ARRAYS else None)
+
+    total = sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(args.output)
+                for name in names if not name.endswith((".gz", ".br", ASSET_MAP_NAME)))
+    figures = len({entry["path"] for entry in asset_map["figures"].values()})
+    print(f"Exported {len(pages)} pages and {figures} figure documents to {args.output} ({total / 1024 / 1024:.1f} MB)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
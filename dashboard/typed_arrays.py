@@ -0,0 +1,137 @@
+"""Binary typed-array encoding of large numeric trace arrays.
+
+A numeric array of ``min_length`` or more values (a trace's ``x``, ``y``,
+``values``, ``marker.size`` ... or a heatmap's ``z`` matrix) is shipped as
+little-endian binary in the smallest fitting dtype, base64-encoded, instead of
+a JSON number literal, so the browser decodes it without per-element parsing.
+Arrays whose JSON is shorter than their base64 (small integers, floats
+rounded to few digits) stay JSON, so no payload grows:
+
+    {"dtype": "u2", "bdata": "AQACAAMA...", "shape": "40, 12"}
+
+This is the typed-array spec of plotly.js 2.28+ (and of plotly.py 6+), which
+Streamlit's bundled plotly.js reads natively: ``numpy_arrays`` hands plotly
+numpy arrays and plotly.py writes them this way. The exported HTML figures
+run the pinned plotly.js 2.9.0, which predates the spec, so ``DECODER_SCRIPT``
+turns the encoded arrays into JavaScript typed arrays before ``Plotly.newPlot``.
+"""
+
+import base64
+import json
+
+import numpy as np
+
+DEFAULT_MIN_LENGTH = 128
+
+# Smallest first; floats use f4 only when it keeps the significant digits shown
+_INT_DTYPES = ("i1", "u1", "i2", "u2", "i4", "u4")
+# float32 holds about 7 significant digits
+_F4_MAX_DIGITS = 6
+# Shown as text, not plotted as values; numbers here stay JSON. customdata is
+# printed unformatted by %{customdata} in hover templates, where float32 would
+# show as e.g. 0.10000000149011612.
+LABEL_KEYS = ("text", "hovertext", "ids", "labels", "parents", "texttemplate", "hovertemplate", "customdata")
+
+DECODE_FUNCTION = "window.decodeTypedArrays"
+# Walks the figure data, replacing each {dtype, bdata[, shape]} with a typed
+# array (a 2-D shape becomes an array of typed-array rows). Kept compact: it is
+# inlined into every figure that needs it.
+DECODER_SCRIPT = (
+    '<script type="text/javascript">window.decodeTypedArrays=window.decodeTypedArrays||function(v){'
+    'var T={i1:Int8Array,u1:Uint8Array,i2:Int16Array,u2:Uint16Array,i4:Int32Array,u4:Uint32Array,'
+    'f4:Float32Array,f8:Float64Array};function d(v){var i,k;if(Array.isArray(v)){for(i=0;i<v.length;i++)'
+    'v[i]=d(v[i]);}else if(v&&typeof v==="object"){if(typeof v.bdata==="string"&&T[v.dtype]){'
+    'var s=atob(v.bdata),b=new Uint8Array(s.length);for(i=0;i<s.length;i++)b[i]=s.charCodeAt(i);'
+    'var a=new T[v.dtype](b.buffer);if(!v.shape)return a;var c=+String(v.shape).split(",")[1],r=[];'
+    'for(i=0;i<a.length;i+=c)r.push(a.subarray(i,i+c));return r;}for(k in v)'
+    'if(Object.prototype.hasOwnProperty.call(v,k))v[k]=d(v[k]);}return v;}return d(v);};</script>'
+)
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def numeric_array(values, min_length=DEFAULT_MIN_LENGTH, float_digits=None):
+    """The list ``values`` (1-D, or 2-D with equal rows) as a compact numpy array, or None.
+
+    None when it holds anything but numbers, is ragged or has fewer than
+    ``min_length`` values. Integers get the smallest integer dtype that holds
+    them (float64 beyond 32 bits, e.g. epoch milliseconds); floats get
+    float32 when ``float_digits`` (the significant digits they were rounded
+    to) survive it, float64 otherwise.
+    """
+    if not isinstance(values, list) or not values:
+        return None
+    if isinstance(values[0], list):
+        width = len(values[0])
+        if width == 0 or any(not isinstance(row, list) or len(row) != width for row in values):
+            return None
+        flat = [value for row in values for value in row]
+    else:
+        flat = values
+    if len(flat) < min_length or not all(_is_number(value) for value in flat):
+        return None
+
+    if all(isinstance(value, int) for value in flat):
+        low, high = min(flat), max(flat)
+        for dtype in _INT_DTYPES:
+            info = np.iinfo(np.dtype(dtype))
+            if info.min <= low and high <= info.max:
+                return np.array(values, dtype="<" + dtype)
+        if max(-low, high) >= 2 ** 53:
+            return None  # not exact as a double
+        # Exact as a double; float_digits is about rounded floats, so integers never go to float32
+        return np.array(values, dtype="<f8")
+    array = np.array(values, dtype="<f8")
+    if not np.isfinite(array).all():
+        return None
+    # Integers mixed into float data (e.g. whole numbers minified to "3") must stay exact too
+    if float_digits is not None and float_digits <= _F4_MAX_DIGITS and all(
+            abs(value) <= 2 ** 24 for value in flat if isinstance(value, int)):
+        single = array.astype("<f4")
+        if np.allclose(single, array, rtol=0.5 * 10.0 ** (1 - float_digits), atol=0):
+            return single
+    return array
+
+
+def _binary_array(values, min_length, float_digits):
+    """``numeric_array`` of ``values`` when its base64 is shorter than its JSON, else None."""
+    array = numeric_array(values, min_length, float_digits)
+    if array is None or 4 * -(-array.nbytes // 3) >= len(json.dumps(values, separators=(",", ":"))):
+        return None
+    return array
+
+
+def numpy_arrays(value, min_length=DEFAULT_MIN_LENGTH, float_digits=None):
+    """Copy of trace data with every large numeric array as a numpy array (see ``numeric_array``)."""
+    if isinstance(value, list):
+        array = _binary_array(value, min_length, float_digits)
+        if array is not None:
+            return array
+        return [numpy_arrays(item, min_length, float_digits) for item in value]
+    if isinstance(value, dict):
+        return {key: item if key in LABEL_KEYS else numpy_arrays(item, min_length, float_digits)
+                for key, item in value.items()}
+    return value
+
+
+def encode_array(array):
+    """Typed-array spec of a numpy array."""
+    encoded = {"dtype": array.dtype.str[1:], "bdata": base64.b64encode(array.tobytes()).decode("ascii")}
+    if array.ndim == 2:
+        encoded["shape"] = f"{array.shape[0]}, {array.shape[1]}"
+    return encoded
+
+
+def encode_typed_arrays(value, min_length=DEFAULT_MIN_LENGTH, float_digits=None):
+    """Copy of trace data with every large numeric array as a typed-array spec."""
+    if isinstance(value, list):
+        array = _binary_array(value, min_length, float_digits)
+        if array is not None:
+            return encode_array(array)
+        return [encode_typed_arrays(item, min_length, float_digits) for item in value]
+    if isinstance(value, dict):
+        return {key: item if key in LABEL_KEYS else encode_typed_arrays(item, min_length, float_digits)
+                for key, item in value.items()}
+    return value